@@ -6,12 +6,12 @@
 
 using namespace std;
 
-void Day1() {
+void Day1(const string& input_file) {
     // Create vector for elf sums and start the first elf at zero
-    vector<int> elves;
-    int sum{0};
+    vector<long long> elves;
+    long long sum{0};
     string line;
-    ifstream myfile("../Inputs/Day1_Inputs.txt");
+    ifstream myfile(input_file);
     // Read data from input file
     if (myfile.is_open())
     {
@@ -23,12 +23,17 @@ void Day1() {
                 sum = 0;
             } else {
                 // Else add the new calories to the current elf's total
-                sum += stoi(line);
+                sum += stoll(line);
             }
         }
+        // The last elf isn't followed by a blank line
+        if (sum > 0) {
+            elves.push_back(sum);
+        }
         myfile.close();
     } else {
         cout << "Unable to open file" << endl;
+        return;
     }
     // Sort totals in ascending order
     sort(elves.begin(), elves.end());
@@ -37,9 +42,15 @@ void Day1() {
     cout << "Part 1: " << elves.at(elves.size()-1) << endl;
     //#### Part 2 ####//
     // Add the final 3 values in the sorted list
-    int highest_3_total = 0;
+    long long highest_3_total = 0;
     for (int i = 1; i < 4; i++) {
         highest_3_total += elves.at(elves.size()-i);
     }
     cout << "Part 2: " << highest_3_total << endl;
 }
+
+int main(int argc, char* argv[]) {
+    // Input file can be given as the first argument
+    Day1(argc > 1 ? argv[1] : "../Inputs/Day1_Inputs.txt");
+    return 0;
+}
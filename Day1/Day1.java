@@ -5,11 +5,11 @@ import java.util.*;
 public class Day1 {
 	public static void main(String[] args) {
 		// Create list for elf sums and start the first elf at zero
-		List<Integer> elves = new ArrayList<Integer>();
-		int sum = 0;
+		List<Long> elves = new ArrayList<Long>();
+		long sum = 0;
 		try {
-			// Read data from input file
-			File myObj = new File("Inputs/Day1_Inputs.txt");
+			// Read data from input file, which can be given as the first argument
+			File myObj = new File(args.length > 0 ? args[0] : "Inputs/Day1_Inputs.txt");
 			Scanner myReader = new Scanner(myObj);
 			while (myReader.hasNextLine()) {
 				String data = myReader.nextLine();
@@ -19,9 +19,13 @@ public class Day1 {
 					sum = 0;
 				} else {
 					// Else add the new calories to the current elf's total
-					sum +=  Integer.parseInt(data);
+					sum +=  Long.parseLong(data);
 				}
 			}
+			// The last elf isn't followed by a blank line
+			if (sum > 0) {
+				elves.add(sum);
+			}
 			myReader.close();
 		} catch (FileNotFoundException e) {
 			System.out.println("An error occurred.");
@@ -34,7 +38,7 @@ public class Day1 {
 		System.out.println("Part 1: " + elves.get(elves.size()-1));
 		//#### Part 2 ####//
 		// Add the final 3 values in the sorted list
-		Integer highest_3_total = 0;
+		Long highest_3_total = 0L;
 		for (int i = 1; i <= 3; i++) {
 			highest_3_total += elves.get(elves.size()-i);
 		}
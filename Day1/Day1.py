@@ -1,3 +1,17 @@
+import os
+import sys
+# The shared modules live in the top directory, one level above this one
+if os.path.dirname(os.path.dirname(os.path.abspath(__file__))) not in sys.path:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from input_cache import cached_parser
+from lazy import lazy_import
+import inputs
+from inputs import read_text
+import ingest
+from memo import memoized
+np = lazy_import('numpy')
+
+@cached_parser
 def get_elf_totals(input_file: str='Inputs/Day1_Inputs.txt') -> list:
     """
     Parse input file containing the Calories of each item of food carried by each of a group of
@@ -5,7 +19,7 @@ def get_elf_totals(input_file: str='Inputs/Day1_Inputs.txt') -> list:
 
     Parameters
     ----------
-    input_file : str, optional
+    input_file : str, stream or iterable, optional
         Input file giving the calories of the food carried by each elf.
         The default is 'Inputs/Day1_Inputs.txt'.
 
@@ -15,21 +29,17 @@ def get_elf_totals(input_file: str='Inputs/Day1_Inputs.txt') -> list:
         List of the total Calories carried by each elf.
 
     """
-    # Parse input file
-    file = open(input_file)
-    elves = [0]
-    for line in file:
-        line = line.strip().split()
-        if len(line) == 0:
-            elves.append(0)
-        else:
-            # Add up calories for each elf
-            elves[-1] += int(line[0])
-    file.close()
+    # Parse input file, with a new elf starting at each blank line
+    calories, offsets = ingest.read_int_groups(input_file)
+    # Add up calories for each elf, as differences of the running total so elves with no food
+    # have 0 Calories
+    running_total = np.concatenate(([0], calories.cumsum()))
+    elves = (running_total[offsets[1:]] - running_total[offsets[:-1]]).tolist()
 
     return elves
 
-def Day1_Part1(input_file: str='Inputs/Day1_Inputs.txt') -> int:
+@memoized
+def Day1_Part1(input_file: str='Inputs/Day1_Inputs.txt', workers: int=None) -> int:
     """
     Calculates the maximum total number of Calories carried by a single elf, where the calories
     of each item of food carried by each elf are given in an input file.
@@ -39,6 +49,10 @@ def Day1_Part1(input_file: str='Inputs/Day1_Inputs.txt') -> int:
     input_file : str, optional
         Input file giving the calories of the food carried by each elf.
         The default is 'Inputs/Day1_Inputs.txt'.
+    workers : int or NoneType, optional
+        Number of worker processes to split the input file between (see top_k_elves), if None
+        then the input is parsed in this process.
+        The default is None.
 
     Returns
     -------
@@ -46,6 +60,10 @@ def Day1_Part1(input_file: str='Inputs/Day1_Inputs.txt') -> int:
         The maximum total number of Calories carried by a single elf.
 
     """
+    if workers:
+        # The maximum is just the top 1
+        return top_k_elves(input_file, 1, workers)[0]
+
     # Parse input file
     elves = get_elf_totals(input_file)
 
@@ -54,39 +72,307 @@ def Day1_Part1(input_file: str='Inputs/Day1_Inputs.txt') -> int:
 
     return max_calories
 
-def Day1_Part2(input_file: str='Inputs/Day1_Inputs.txt') -> int:
+import heapq
+
+def _iter_total_chunks(source, start: int=0, end: int=None):
+    """
+    Add up the calories carried by each elf, one large piece of the input at a time (see
+    inputs.iter_chunks), yielding an array of the totals of the elves in each piece. For
+    uncompressed files, only the elves between the byte offsets start and end are read.
+    """
+    # Cut the input only at blank lines, so no elf is split between pieces
+    for chunk in inputs.iter_chunks(source, separator=b'\n\n', start=start, end=end):
+        calories, offsets = ingest.int_groups(chunk)
+        # Add up calories for each elf in this piece, as differences of the running total so
+        # elves with no food have 0 Calories
+        running_total = np.concatenate(([0], calories.cumsum()))
+        yield running_total[offsets[1:]] - running_total[offsets[:-1]]
+
+def iter_elf_totals(source: str='Inputs/Day1_Inputs.txt'):
+    """
+    Stream the total Calories carried by each elf, without ever holding more than one piece of the
+    input (or the totals of more than one piece) in memory, so the input can be larger than the
+    available memory.
+
+    Parameters
+    ----------
+    source : str, stream or iterable, optional
+        Input file giving the calories of the food carried by each elf, in any form accepted by
+        inputs.iter_chunks.
+        The default is 'Inputs/Day1_Inputs.txt'.
+
+    Yields
+    ------
+    total : int
+        The total Calories carried by each elf, in order.
+
+    """
+    for totals in _iter_total_chunks(source):
+        yield from totals.tolist()
+
+def _range_top_k(source, k: int, start: int=0, end: int=None) -> list:
+    """
+    Find the k largest totals of the elves in one byte range of the input, keeping only a heap of
+    the k largest so far, run by each worker process of top_k_elves.
+    """
+    # Min-heap of the largest totals so far, so the smallest of them is always heap[0]
+    heap = []
+    if k <= 0:
+        return heap
+    for totals in _iter_total_chunks(source, start, end):
+        # Once the heap is full, only totals beating its smallest can get in, which for most
+        # pieces is very few of them
+        if len(heap) == k:
+            totals = totals[totals > heap[0]]
+        for total in totals.tolist():
+            if len(heap) < k:
+                heapq.heappush(heap, total)
+            elif total > heap[0]:
+                heapq.heapreplace(heap, total)
+
+    return sorted(heap, reverse=True)
+
+def top_k_elves(source: str='Inputs/Day1_Inputs.txt', k: int=3, workers: int=None) -> list:
     """
-    Calculates the total number of Calories carried by the three elves carrying the largest
+    Find the largest total Calories carried by any k elves, streaming through the input and keeping
+    only a heap of the k largest totals so far. This takes O(k) memory on top of the piece of the
+    input being read and O(n log k) time, however many elves there are.
+
+    With several workers, an uncompressed input file is instead cut into one byte range per worker
+    (at blank lines, so every elf is wholly inside one range, see inputs.split_ranges), the top k
+    of each range are found by a pool of worker processes, which each map the file themselves, and
+    the top k overall are the top k of their results. Anything other than an uncompressed file is
+    read in this process.
+
+    Parameters
+    ----------
+    source : str, stream or iterable, optional
+        Input file giving the calories of the food carried by each elf, in any form accepted by
+        inputs.iter_chunks.
+        The default is 'Inputs/Day1_Inputs.txt'.
+    k : int, optional
+        The number of elves to find.
+        The default is 3.
+    workers : int or NoneType, optional
+        Number of worker processes to split an uncompressed input file between, if None (or 1)
+        then the whole input is read in this process.
+        The default is None.
+
+    Returns
+    -------
+    top_k : list(int)
+        The k largest totals, largest first, or every total if there are fewer than k elves.
+
+    """
+    ranges = inputs.split_ranges(source, workers, b'\n\n') if workers and workers > 1 else []
+    if len(ranges) <= 1:
+        return _range_top_k(source, k)
+
+    import concurrent.futures
+    with concurrent.futures.ProcessPoolExecutor(min(workers, len(ranges))) as executor:
+        futures = [executor.submit(_range_top_k, source, k, start, end) for start, end in ranges]
+        # Every elf is in exactly one range, so the top k overall are among the top k of each
+        top_k = heapq.nlargest(k, (total for future in futures for total in future.result()))
+
+    return top_k
+
+@memoized
+def Day1_Part2(input_file: str='Inputs/Day1_Inputs.txt', k: int=3, workers: int=None) -> int:
+    """
+    Calculates the total number of Calories carried by the three (or k) elves carrying the largest
     individual amounts of Calories, where the calories of each item of food carried by each elf
-    are given in an input file.
+    are given in an input file. The input is streamed, keeping only the top k totals so far.
 
     Parameters
     ----------
     input_file : str, optional
         Input file giving the calories of the food carried by each elf.
         The default is 'Inputs/Day1_Inputs.txt'.
+    k : int, optional
+        The number of elves carrying the most Calories to add up.
+        The default is 3.
+    workers : int or NoneType, optional
+        Number of worker processes to split the input file between (see top_k_elves), if None
+        then the input is streamed in this process.
+        The default is None.
 
     Returns
     -------
     max_calories : int
+        The total number of Calories carried by the k elves carrying the largest individual
+        amounts of Calories.
+
+    """
+    # Find the largest k totals and add them up
+    max_calories = sum(top_k_elves(input_file, k, workers))
+
+    return max_calories
+
+@memoized
+def Day1_solve(input_file: str='Inputs/Day1_Inputs.txt') -> tuple:
+    """
+    Calculates both the maximum total number of Calories carried by a single elf and the total
+    carried by the three elves carrying the most, parsing the input file only once. The file is
+    memory mapped and scanned in large pieces, keeping only the top three elves so far, so it can
+    be larger than the available memory.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file giving the calories of the food carried by each elf.
+        The default is 'Inputs/Day1_Inputs.txt'.
+
+    Returns
+    -------
+    max_calories : int
+        The maximum total number of Calories carried by a single elf.
+    top_three_calories : int
         The total number of Calories carried by the three elves carrying the largest individual
         amounts of Calories.
 
     """
-    # Parse input file
-    elves = get_elf_totals(input_file)
+    # Only the top three elves are needed, so keep just those while streaming through the input
+    top_three = top_k_elves(input_file, 3)
 
-    # Sort them in ascending order
-    elves.sort()
-    # Find the sum of the top three values
-    max_calories = sum(elves[-3:])
+    return top_three[0], sum(top_three)
 
-    return max_calories
+class ElfTally:
+    """
+    Class keeping a running tally of an append-only calorie log, so that the largest totals can be
+    queried again as the log grows without reading it all again. It remembers how many bytes of the
+    file it has consumed, the running total of the elf still being written at the end of the file
+    and the top k totals of every elf before that, and refresh() parses only the bytes appended
+    since the last refresh, so each query costs O(new data).
 
-def Day1_Part1_one_line(input_file='Inputs/Day1_Inputs.txt'):
-    return max([sum([int(c) for c in e.strip().split('\n')]) for e in open(input_file).read().split('\n\n')])
+        tally = ElfTally('calories.log')
+        tally.refresh()
+        tally.max_calories, tally.top_calories
+
+    Only whole lines are consumed, so a line still being written is left for the next refresh. If
+    the file is ever shorter than what has already been consumed (e.g. it was rotated), the tally
+    starts again from the beginning.
+    """
+
+    def __init__(self, path: str='Inputs/Day1_Inputs.txt', k: int=3):
+        """
+        Parameters
+        ----------
+        path : str
+            The calorie log, an uncompressed file which is only ever appended to.
+            The default is 'Inputs/Day1_Inputs.txt'.
+        k : int, optional
+            The number of largest totals to keep.
+            The default is 3.
+
+        """
+        self.path = path
+        self.k = k
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Forget everything consumed so far, so the next refresh reads the whole file again.
+        """
+        # Bytes of the file consumed so far, which always ends at the end of a line
+        self.offset = 0
+        # Running total of the elf still open at the end of what has been consumed
+        self.open_total = 0
+        # Number of elves which have been closed by a blank line
+        self.closed_elves = 0
+        # Min-heap of the k largest totals of the closed elves
+        self.heap = []
+
+    def _consume(self, data: bytes) -> None:
+        """
+        Add a block of whole lines, which follows straight on from what has already been consumed,
+        to the tally.
+        """
+        calories, offsets = ingest.int_groups(data)
+        # Add up calories for each group of lines in the block, as in get_elf_totals
+        running_total = np.concatenate(([0], calories.cumsum()))
+        totals = running_total[offsets[1:]] - running_total[offsets[:-1]]
+        # The first group carries on the elf left open by the last block, and the last group is
+        # left open until the next blank line
+        totals[0] += self.open_total
+        closed, self.open_total = totals[:-1], int(totals[-1])
+        self.closed_elves += len(closed)
+        if len(self.heap) == self.k:
+            closed = closed[closed > self.heap[0]]
+        for total in closed.tolist():
+            if len(self.heap) < self.k:
+                heapq.heappush(self.heap, total)
+            elif total > self.heap[0]:
+                heapq.heapreplace(self.heap, total)
+
+    def refresh(self, chunk_size: int=inputs.CHUNK_SIZE) -> int:
+        """
+        Parse everything appended to the file since the last refresh.
+
+        Parameters
+        ----------
+        chunk_size : int, optional
+            The number of bytes to read at a time.
+            The default is inputs.CHUNK_SIZE (16 MiB).
 
-import numpy as np
+        Returns
+        -------
+        consumed : int
+            The number of new bytes consumed.
+
+        """
+        if os.path.getsize(self.path) < self.offset:
+            # The file has been replaced or truncated, so start again
+            self.reset()
+
+        start = self.offset
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            rest = b''
+            while True:
+                block = f.read(chunk_size)
+                if not block:
+                    break
+                data = rest + block
+                # Only consume whole lines, carrying the rest over to the next block
+                end = data.rfind(b'\n') + 1
+                if end:
+                    self._consume(data[:end])
+                    self.offset += end
+                rest = data[end:]
+
+        return self.offset - start
+
+    @property
+    def elves(self) -> int:
+        """
+        The number of elves so far, including the one still open at the end of the file.
+        """
+        return self.closed_elves + 1
+
+    @property
+    def top_k(self) -> list:
+        """
+        The k largest totals so far, largest first, including the elf still open at the end of the
+        file.
+        """
+        return heapq.nlargest(self.k, self.heap + [self.open_total])
+
+    @property
+    def max_calories(self) -> int:
+        """
+        The maximum total number of Calories carried by a single elf so far (Part 1).
+        """
+        return self.top_k[0]
+
+    @property
+    def top_calories(self) -> int:
+        """
+        The total number of Calories carried by the k elves carrying the most so far (Part 2).
+        """
+        return sum(self.top_k)
+
+def Day1_Part1_one_line(input_file='Inputs/Day1_Inputs.txt'):
+    return max([sum([int(c) for c in e.strip().split('\n')]) for e in read_text(input_file).split('\n\n')])
 
 def Day1_Part2_one_line(input_file='Inputs/Day1_Inputs.txt'):
-    return sum(np.sort([sum([int(c) for c in e.strip().split('\n')]) for e in open(input_file).read().split('\n\n')])[-3:])
+    return sum(heapq.nlargest(3, (sum([int(c) for c in e.strip().split('\n')]) for e in read_text(input_file).split('\n\n'))))
@@ -3,20 +3,16 @@
 # Usage: bash Day1.sh input_file
 
 # Variables to store highest three sums
-let max=next_to_max=nn_to_max=0
-# Parse input
-while read -r line; do
-# If line is not empty
-if [ -z "$line" ]
-then
-    # Store highest three sums in order
+let max=next_to_max=nn_to_max=sum=0
+# Store highest three sums in order, moving the lower ones down
+store_sum () {
     if (( sum > max ))
     then
-        let max=$sum
+        let nn_to_max=$next_to_max next_to_max=$max max=$sum
     else
         if (( sum > next_to_max ))
         then
-            let next_to_max=$sum
+            let nn_to_max=$next_to_max next_to_max=$sum
         else
             if (( sum > nn_to_max ))
             then
@@ -24,6 +20,13 @@ then
             fi
         fi
     fi
+}
+# Parse input, including a last line without a newline
+while read -r line || [ -n "$line" ]; do
+# If line is empty
+if [ -z "$line" ]
+then
+    store_sum
     # Reset sum
     let sum=0
 else
@@ -31,6 +34,8 @@ else
     let sum="$((sum+$line))"
 fi
 done < $1
+# The last elf isn't followed by a blank line
+store_sum
 #### Part 1 ####
 echo "Part 1:" $max
 #### Part 2 ####
@@ -0,0 +1,361 @@
+"""
+Harness comparing the implementations of Day 1 in each language against each other: the Python
+solutions (Day1_Part1/Day1_Part2 through get_elf_totals, the chunked Day1_solve and the _one_line
+variants), C++, Java and the shell script. Each one is built if needed (in a temporary directory,
+so nothing is left behind), then run as a separate process on the same synthetic inputs, so the
+times include starting the process, just as they would in a pipeline.
+
+For each implementation this measures the startup latency (the time to answer an input with a
+single elf) and the throughput in MB/s over inputs of each size, checks that the answers all agree
+with the first implementation, and draws both as ASCII bar charts. The inputs are written out a
+batch of elves at a time, so they can be far larger than the available memory. Implementations
+whose compilers or runtimes aren't installed are skipped, and once an implementation takes longer
+than --max-time it is skipped for the larger sizes.
+
+Usage: python compare_languages.py [--sizes 1K 1M 100M 4G ...] [--repeat R] [--max-time SECONDS]
+                                   [--only NAME ...] [--output FILE]
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+# The shared modules live in the top directory, one level above this one
+if os.path.dirname(os.path.dirname(os.path.abspath(__file__))) not in sys.path:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import generators
+
+# Directory containing the implementations
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Python snippet running the Day 1 functions on the file given as its first argument
+PYTHON_RUNNER = ('import sys; sys.path.insert(0, {here!r}); import Day1; f = sys.argv[1]; '
+                 'a, b = {call}; print("Part 1:", a); print("Part 2:", b)')
+
+# Calls giving both answers for each Python implementation
+PYTHON_CALLS = {'python': '(Day1.Day1_Part1(f), Day1.Day1_Part2(f))',
+                'python_solve': 'Day1.Day1_solve(f)',
+                'python_one_line': '(Day1.Day1_Part1_one_line(f), Day1.Day1_Part2_one_line(f))'}
+
+# Default input sizes in bytes
+DEFAULT_SIZES = ['1K', '1M', '100M']
+
+def parse_size(size: str) -> int:
+    """
+    Convert a size such as '1K', '100M' or '4G' (powers of 1000) into a number of bytes.
+    """
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([KMG]?)B?', size.upper())
+    if match is None:
+        raise argparse.ArgumentTypeError(f'Invalid size {size!r}, e.g. 1K, 100M or 4G')
+
+    return int(float(match.group(1))*1000**' KMG'.index(match.group(2) or ' '))
+
+def write_input(path: str, size: int, seed: int=0, batch: int=10000) -> int:
+    """
+    Write a synthetic Day 1 input of roughly the given size, a batch of elves at a time so that
+    the whole input is never held in memory. Like the real inputs, it doesn't end in a blank line.
+
+    Parameters
+    ----------
+    path : str
+        The file to write.
+    size : int
+        The size to aim for in bytes, the input stops after the first elf which reaches it.
+    seed : int, optional
+        Seed for the generator, each batch uses the next seed along.
+        The default is 0.
+    batch : int, optional
+        The number of elves to generate at a time.
+        The default is 10000.
+
+    Returns
+    -------
+    written : int
+        The number of bytes written.
+
+    """
+    written = 0
+    with open(path, 'w') as f:
+        while written < size:
+            elves = generators.day1(batch, seed).rstrip('\n').split('\n\n')
+            seed += 1
+            for elf in elves:
+                # Blank line between elves, including between batches
+                text = ('\n' if written else '') + elf + '\n'
+                f.write(text)
+                written += len(text)
+                if written >= size:
+                    break
+
+    return written
+
+def implementations(build_directory: str) -> dict:
+    """
+    Build every implementation whose toolchain is installed.
+
+    Parameters
+    ----------
+    build_directory : str
+        Directory to put anything which is compiled.
+
+    Returns
+    -------
+    commands : dict(str: list(str) or str)
+        Dictionary of the form (name: command), where the input file is added to the end of each
+        command, or (name: reason) for implementations which were skipped.
+
+    """
+    commands = {name: [sys.executable, '-c', PYTHON_RUNNER.format(here=HERE, call=call)]
+                for name, call in PYTHON_CALLS.items()}
+
+    compiler = shutil.which('g++') or shutil.which('clang++') or shutil.which('c++')
+    if compiler is None:
+        commands['cpp'] = 'no C++ compiler found'
+    else:
+        executable = os.path.join(build_directory, 'day1_cpp')
+        subprocess.run([compiler, '-O2', '-std=c++17', '-o', executable,
+                        os.path.join(HERE, 'Day1.cxx')], check=True)
+        commands['cpp'] = [executable]
+
+    if shutil.which('javac') is None or shutil.which('java') is None:
+        commands['java'] = 'no Java compiler and runtime found'
+    else:
+        subprocess.run(['javac', '-d', build_directory, os.path.join(HERE, 'Day1.java')],
+                       check=True)
+        commands['java'] = ['java', '-cp', build_directory, 'Day1']
+
+    if shutil.which('bash') is None:
+        commands['bash'] = 'bash not found'
+    else:
+        commands['bash'] = ['bash', os.path.join(HERE, 'Day1.sh')]
+
+    return commands
+
+def run(command: list, input_file: str, timeout: float=None) -> tuple:
+    """
+    Run one implementation on one input file.
+
+    Parameters
+    ----------
+    command : list(str)
+        The command, without the input file.
+    input_file : str
+        The input file.
+    timeout : float or NoneType, optional
+        Time limit in seconds, if None then no limit.
+        The default is None.
+
+    Returns
+    -------
+    wall_time : float
+        The time taken in seconds, or None if it timed out.
+    answers : tuple(int) or NoneType
+        The answers to Part 1 and Part 2, or None if they couldn't be found in the output.
+
+    """
+    # Keep the optional caches out of the timings
+    env = {key: value for key, value in os.environ.items()
+           if key not in ('AOC_MEMO', 'AOC_INPUT_CACHE')}
+    start = time.perf_counter()
+    try:
+        output = subprocess.run(command + [input_file], capture_output=True, text=True,
+                                timeout=timeout, env=env, cwd=HERE).stdout
+    except subprocess.TimeoutExpired:
+        return None, None
+    wall_time = time.perf_counter() - start
+    answers = re.findall(r'Part [12]: (\d+)', output)
+
+    return wall_time, tuple(int(a) for a in answers) if len(answers) == 2 else None
+
+def bar_chart(title: str, values: dict, unit: str, width: int=50) -> str:
+    """
+    Draw a horizontal ASCII bar chart.
+
+    Parameters
+    ----------
+    title : str
+        Title above the chart.
+    values : dict(str: float)
+        Dictionary of the form (label: value), values of None are shown as missing.
+    unit : str
+        Unit of the values.
+    width : int, optional
+        Length of the longest bar in characters.
+        The default is 50.
+
+    Returns
+    -------
+    chart : str
+        The chart.
+
+    """
+    lines = [title]
+    largest = max([v for v in values.values() if v is not None] + [0])
+    label_width = max(len(label) for label in values)
+    for label, value in values.items():
+        if value is None:
+            lines.append(f'{label:<{label_width}} | -')
+            continue
+        bar = '#'*max(1, round(width*value/largest)) if largest else ''
+        lines.append(f'{label:<{label_width}} | {bar} {value:.4g} {unit}')
+
+    return '\n'.join(lines)
+
+def compare(sizes: list, repeat: int=3, max_time: float=60.0, only: list=None,
+            verbose: bool=True) -> dict:
+    """
+    Measure the startup latency and throughput of every implementation, and check their answers.
+
+    Parameters
+    ----------
+    sizes : list(int)
+        The input sizes in bytes.
+    repeat : int, optional
+        The number of runs of each measurement, the fastest of which is kept.
+        The default is 3.
+    max_time : float, optional
+        The time in seconds after which an implementation is skipped for larger sizes.
+        The default is 60.
+    only : list(str) or NoneType, optional
+        The implementations to run, if None then all of them.
+        The default is None.
+    verbose : bool, optional
+        Whether to print each measurement as it is made.
+        The default is True.
+
+    Returns
+    -------
+    results : dict
+        The startup latency of each implementation ('startup'), the time, throughput and answers
+        for each implementation and size ('runs'), any implementations which were skipped
+        ('skipped') and any disagreements between the answers ('mismatches').
+
+    """
+    results = {'startup': {}, 'runs': [], 'skipped': {}, 'mismatches': []}
+    with tempfile.TemporaryDirectory() as directory:
+        commands = implementations(directory)
+        for name, command in list(commands.items()):
+            if isinstance(command, str) or (only and name not in only):
+                results['skipped'][name] = command if isinstance(command, str) else 'not selected'
+                del commands[name]
+
+        # Startup latency, from an input with a single elf
+        single = os.path.join(directory, 'single.txt')
+        with open(single, 'w') as f:
+            f.write('1000\n')
+        for name, command in commands.items():
+            times = [run(command, single, max_time)[0] for i in range(repeat)]
+            times = [t for t in times if t is not None]
+            results['startup'][name] = min(times) if times else None
+            if verbose:
+                print(f'{name} startup: {results["startup"][name]} s', file=sys.stderr)
+
+        too_slow = set()
+        for size in sizes:
+            input_file = os.path.join(directory, f'Day1_{size}.txt')
+            written = write_input(input_file, size)
+            reference = None
+            for name, command in commands.items():
+                if name in too_slow:
+                    continue
+                best, answers = None, None
+                for i in range(repeat):
+                    wall_time, answers = run(command, input_file, max_time)
+                    if wall_time is None:
+                        break
+                    best = wall_time if best is None else min(best, wall_time)
+                record = {'implementation': name, 'size': written, 'time': best,
+                          'throughput': written/best/1e6 if best else None,
+                          'answers': answers}
+                results['runs'].append(record)
+                if best is None or best > max_time:
+                    too_slow.add(name)
+                if answers is not None:
+                    if reference is None:
+                        reference = (name, answers)
+                    elif answers != reference[1]:
+                        results['mismatches'].append({'size': written, 'implementation': name,
+                                                      'answers': answers,
+                                                      'expected': reference[1],
+                                                      'reference': reference[0]})
+                if verbose:
+                    print(f'{name} {written} bytes: {best} s, answers {answers}', file=sys.stderr)
+            # Free up the disk space before writing the next input
+            os.remove(input_file)
+
+    return results
+
+def report(results: dict) -> str:
+    """
+    Draw the charts of the startup latency and of the throughput at each size, followed by any
+    skipped implementations and disagreements.
+
+    Parameters
+    ----------
+    results : dict
+        The results, as returned by compare.
+
+    Returns
+    -------
+    report : str
+        The report.
+
+    """
+    sections = [bar_chart('Startup latency', {name: None if t is None else t*1000 \
+                                              for name, t in results['startup'].items()}, 'ms')]
+    for size in sorted({r['size'] for r in results['runs']}):
+        sections.append(bar_chart(f'Throughput on {size/1e6:.4g} MB',
+                                  {r['implementation']: r['throughput'] \
+                                   for r in results['runs'] if r['size'] == size}, 'MB/s'))
+    for name, reason in results['skipped'].items():
+        sections.append(f'Skipped {name}: {reason}')
+    for m in results['mismatches']:
+        sections.append(f'MISMATCH on {m["size"]} bytes: {m["implementation"]} gave '
+                        f'{m["answers"]}, {m["reference"]} gave {m["expected"]}')
+    if not results['mismatches']:
+        sections.append('All answers agree')
+
+    return '\n\n'.join(sections)
+
+def main(argv: list=None) -> None:
+    """
+    Command line interface, run with -h for usage.
+
+    Parameters
+    ----------
+    argv : list(str) or NoneType, optional
+        Command line arguments, if None then sys.argv is used.
+        The default is None.
+
+    Returns
+    -------
+    None
+
+    """
+    parser = argparse.ArgumentParser(description='Compare the Day 1 implementations.')
+    parser.add_argument('-s', '--sizes', type=parse_size, nargs='+',
+                        default=[parse_size(s) for s in DEFAULT_SIZES],
+                        help='Input sizes, e.g. 1K 1M 100M 4G (default 1K 1M 100M).')
+    parser.add_argument('-r', '--repeat', type=int, default=3,
+                        help='Number of runs per measurement (fastest is kept).')
+    parser.add_argument('-t', '--max-time', type=float, default=60.0,
+                        help='Skip larger sizes once an implementation takes longer than this '
+                             '(seconds).')
+    parser.add_argument('--only', nargs='+', help='Implementations to run (all if not given).')
+    parser.add_argument('-o', '--output', help='JSON file to write the results to.')
+    args = parser.parse_args(argv)
+
+    results = compare(args.sizes, args.repeat, args.max_time, args.only)
+    print(report(results))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=1)
+    if results['mismatches']:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
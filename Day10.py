@@ -1,10 +1,15 @@
+from input_cache import cached_parser
+from inputs import iter_lines
+from memo import memoized
+
+@cached_parser
 def get_input(input_file: str='Inputs/Day10_Inputs.txt') -> list:
     """
     Parse an input file giving a list of instructions being sent to a CPU.
 
     Parameters
     ----------
-    input_file : str, optional
+    input_file : str, stream or iterable, optional
         Input file containing the instructions.
         The default is 'Inputs/Day10_Inputs.txt'.
 
@@ -15,17 +20,15 @@ def get_input(input_file: str='Inputs/Day10_Inputs.txt') -> list:
 
     """
     # Parse input file
-    file = open(input_file)
     instructions = []
-    for line in file:
+    for line in iter_lines(input_file):
         line = line.strip().split()
         if len(line) > 0:
             instructions.append(line)
 
-    file.close()
-
     return instructions
 
+@memoized
 def Day10_Part1(input_file: str='Inputs/Day10_Inputs.txt') -> int:
     """
     Calculate the sum of the strengths of the signals to a CPU during the 20, 60, 100, 140, 180 and
@@ -133,3 +136,71 @@ def Day10_Part2(input_file: str='Inputs/Day10_Inputs.txt') -> None:
             cycle += 1
             # Change X according to instruction
             X += int(instruction[1])
+
+def register_values(instructions: list):
+    """
+    Generator giving the value of the X register during each clock cycle of a CPU running a set of
+    instructions, where X starts at 1.
+
+    Parameters
+    ----------
+    instructions : list
+        The CPU instructions.
+
+    Yields
+    ------
+    cycle : int
+        The cycle number, starting at 1.
+    X : int
+        The value of the X register during the cycle.
+
+    """
+    X, cycle = 1, 1
+    for instruction in instructions:
+        # Always process at least 1 cycle
+        yield cycle, X
+        cycle += 1
+        if instruction[0] == 'addx':
+            # Process additional cycle, then change X according to instruction
+            yield cycle, X
+            cycle += 1
+            X += int(instruction[1])
+
+@memoized
+def Day10_solve(input_file: str='Inputs/Day10_Inputs.txt') -> tuple:
+    """
+    Calculate both the sum of the important signal strengths during the 20, 60, 100, 140, 180 and
+    220th clock cycles, and the image drawn on the CRT, running the CPU instructions only once.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file containing the CPU instructions.
+        The default is 'Inputs/Day10_Inputs.txt'.
+
+    Returns
+    -------
+    important_signal_strength_sum : int
+        The sum of the 'important' signal strengths during the 20, 60, 100, 140, 180 and 220th
+        clock cycles.
+    screen : str
+        Every complete row drawn on the CRT, separated by newlines.
+
+    """
+    # Parse input file
+    instructions = get_input(input_file)
+
+    important_signal_strength_sum = 0
+    rows = []
+    current_line = ''
+    for cycle, X in register_values(instructions):
+        # If it is an 'important' cycle, add the signal strength to total
+        if (cycle - 20)%40 == 0:
+            important_signal_strength_sum += cycle*X
+        # If sprite overlaps with current pixel, light it up, else leave it dark
+        current_line += '#' if abs((cycle-1)%40 - X) <= 1 else '.'
+        if cycle%40 == 0: # If reached the end of the row
+            rows.append(current_line)
+            current_line = ''
+
+    return important_signal_strength_sum, '\n'.join(rows)
@@ -26,13 +26,18 @@ class Monkey:
         # Inspections number starts at 0
         self.inspections = 0
 
+from input_cache import cached_parser
+from inputs import iter_lines
+from memo import memoized
+
+@cached_parser
 def get_input(input_file: str='Inputs/Day11_Inputs.txt') -> list:
     """
     Parse an input file containing the properties of a set of monkeys.
 
     Parameters
     ----------
-    input_file : str, optional
+    input_file : str, stream or iterable, optional
         Input file containing the monkey properties.
         The default is 'Inputs/Day11_Inputs.txt'.
 
@@ -43,9 +48,8 @@ def get_input(input_file: str='Inputs/Day11_Inputs.txt') -> list:
 
     """
     # Parse input file
-    file = open(input_file)
     monkeys = []
-    for line in file:
+    for line in iter_lines(input_file):
         line = line.strip().split()
         if len(line) > 0:
             # Switch to extract each property for each monkey
@@ -64,10 +68,68 @@ def get_input(input_file: str='Inputs/Day11_Inputs.txt') -> list:
             else:
                 print(f'ERROR: Unknown property "{line}"')
 
-    file.close()
-
     return monkeys
 
+def keep_away(monkeys: list, rounds: int, bored: bool) -> int:
+    """
+    Play a number of rounds of the monkeys passing around their items, and calculate the level of
+    monkey business as the product of the two highest numbers of inspections made by any monkey.
+    The monkeys are modified in place.
+
+    Parameters
+    ----------
+    monkeys : list(Monkey)
+        The monkeys, holding their starting items.
+    rounds : int
+        The number of rounds to play.
+    bored : bool
+        Whether worry levels are divided by 3 (rounded down) when each Monkey gets bored of an
+        item.
+
+    Returns
+    -------
+    monkey_business : int
+        The level of monkey business after the given number of rounds.
+
+    """
+    # Calculate product of all Monkeys' test integers
+    test_product = 1
+    for m in monkeys:
+        test_product *= m.test
+    # Compile each operation once, rather than evaluating the string for every item
+    operations = [eval(f'lambda old: {m.operation}') for m in monkeys]
+
+    for round_num in range(rounds):
+        for monkey, operation in zip(monkeys, operations): # For each Monkey
+            for old in monkey.items: # For each item the current Monkey holds, in order
+                # Determine new worry level
+                new = operation(old)
+                if bored:
+                    # Divide by 3 when the Monkey gets bored
+                    new //= 3
+                else:
+                    # Perform modulus on worry level by the product of all test values
+                    # Does not change result of test -> limits worry level to manageable amount
+                    new %= test_product
+                # Perform test on new worry level and pass item to corresponding Monkey
+                if new % monkey.test == 0:
+                    monkeys[monkey.true].items.append(new)
+                else:
+                    monkeys[monkey.false].items.append(new)
+            # Increment inspection counter for current Monkey
+            monkey.inspections += len(monkey.items)
+            # At the end of its turn, a Monkey will have no items
+            monkey.items = []
+
+    # Get number of inspections for each Monkey and sort in ascending order
+    inspections = [m.inspections for m in monkeys]
+    inspections.sort()
+    # Calculate product of highest two
+    monkey_business = inspections[-1] * inspections[-2]
+
+    return monkey_business
+
+@memoized
 def Day11_Part1(input_file: str='Inputs/Day11_Inputs.txt') -> int:
     """
     Calculate the level of monkey business after 20 rounds of a group of monkeys passing around a
@@ -119,33 +181,12 @@ def Day11_Part1(input_file: str='Inputs/Day11_Inputs.txt') -> int:
     # Parse input file
     monkeys = get_input(input_file)
 
-    for round_num in range(20): # For 20 rounds
-        for monkey in monkeys: # For each Monkey
-            for i in range(len(monkey.items)): # For each item the current Monkey holds, in order
-                # Get old worry level
-                old = monkey.items[i]
-                # Determine new worry level
-                new = eval(monkey.operation)
-                # Divide by 3 when the Monkey gets bored
-                new = int(new/3)
-                # Perform test on new worry level and pass item to corresponding Monkey
-                if new % monkey.test == 0:
-                    monkeys[monkey.true].items.append(new)
-                else:
-                    monkeys[monkey.false].items.append(new)
-                # Increment inspection counter for current Monkey
-                monkey.inspections += 1
-            # At the end of its turn, a Monkey will have no items
-            monkey.items = []
-
-    # Get number of inspections for each Monkey and sort in ascending order
-    inspections = [m.inspections for m in monkeys]
-    inspections.sort()
-    # Calculate product of highest two
-    monkey_business = inspections[-1] * inspections[-2]
+    # Worry levels are divided by 3 when each Monkey gets bored
+    monkey_business = keep_away(monkeys, 20, bored=True)
 
     return monkey_business
 
+@memoized
 def Day11_Part2(input_file: str='Inputs/Day11_Inputs.txt') -> int:
     """
     Calculate the level of monkey business after 10,000 rounds of a group of monkeys passing
@@ -196,35 +237,36 @@ def Day11_Part2(input_file: str='Inputs/Day11_Inputs.txt') -> int:
     # Parse input file
     monkeys = get_input(input_file)
 
-    # Calculate product of all Monkeys' test integers
-    test_product = 1
-    for m in monkeys:
-        test_product *= m.test
+    # Worry levels no longer drop when each Monkey gets bored
+    monkey_business = keep_away(monkeys, 10000, bored=False)
 
-    for round_num in range(10000): # For 10,000 rounds
-        for monkey in monkeys: # For each Monkey
-            for i in range(len(monkey.items)): # For each item the current Monkey holds, in order
-                # Get old worry level
-                old = monkey.items[i]
-                # Determine new worry level
-                new = eval(monkey.operation)
-                # Perform modulus on worry level by the product of all test values
-                # Does not change result of test -> limits worry level to manageable amount
-                new %= test_product
-                # Perform test on new worry level and pass item to corresponding Monkey
-                if new % monkey.test == 0:
-                    monkeys[monkey.true].items.append(new)
-                else:
-                    monkeys[monkey.false].items.append(new)
-                # Increment inspection counter for current Monkey
-                monkey.inspections += 1
-            # At the end of its turn, a Monkey will have no items
-            monkey.items = []
+    return monkey_business
 
-    # Get number of inspections for each Monkey and sort in ascending order
-    inspections = [m.inspections for m in monkeys]
-    inspections.sort()
-    # Calculate product of highest two
-    monkey_business = inspections[-1] * inspections[-2]
+import copy
 
-    return monkey_business
+@memoized
+def Day11_solve(input_file: str='Inputs/Day11_Inputs.txt') -> tuple:
+    """
+    Calculate the level of monkey business both after 20 rounds where worry levels drop when each
+    monkey gets bored and after 10,000 rounds where they do not, parsing the input file only once.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file containing the Monkey proporties.
+        The default is 'Inputs/Day11_Inputs.txt'.
+
+    Returns
+    -------
+    short_monkey_business : int
+        The level of monkey business after 20 rounds have passed.
+    long_monkey_business : int
+        The level of monkey business after 10,000 rounds have passed.
+
+    """
+    # Parse input file
+    monkeys = get_input(input_file)
+
+    # Each game needs its own copy of the monkeys, since they are modified as it is played
+    return keep_away(copy.deepcopy(monkeys), 20, bored=True), \
+           keep_away(monkeys, 10000, bored=False)
@@ -1,5 +1,10 @@
-import numpy as np
+from input_cache import cached_parser
+from inputs import iter_lines
+from memo import memoized
+from grid import Grid
+import search
 
+@cached_parser
 def get_input(input_file: str='Inputs/Day12_Inputs.txt') -> list:
     """
     Parse an input file giving the elevation of each square in a grid as a letter, with "a" being
@@ -8,49 +13,36 @@ def get_input(input_file: str='Inputs/Day12_Inputs.txt') -> list:
 
     Parameters
     ----------
-    input_file : str, optional
+    input_file : str, stream or iterable, optional
         Input file containing the elevations of the grid squares.
         The default is 'Inputs/Day12_Inputs.txt'.
 
     Returns
     -------
-    elevation : numpy.ndarray(int)
-        2D array of the elevation of the grid squares.
+    elevation : Grid
+        Grid of the elevation of the grid squares, from 0 to 25.
 
     start : tuple
-        Coordinates of the start square in the grid.
+        Coordinates (x, y) of the start square in the grid.
 
     end : tuple
-        Coordinates of the end square in the grid.
+        Coordinates (x, y) of the end square in the grid.
 
     """
     # Parse input file
-    file = open(input_file)
-    # Start y (row) at 0
-    elevation, y = [], 0
-    for line in file:
-        line = line.strip().split()
-        if len(line) > 0:
-            line = line[0]
-            if 'S' in line: # If start point is in line
-                # Store location
-                start = (y, line.index('S'))
-                # Replace with real height
-                line = line.replace('S', 'a')
-            if 'E' in line: # If end point is in line
-                # Store location
-                end = (y, line.index('E'))
-                # Replace with real height
-                line = line.replace('E', 'z')
-            # Separate out row and convert letters to integer heights
-            elevation.append([ord(c) - 97 for c in line])
-            # Increment row
-            y += 1
-
-    file.close()
-
-    return np.array(elevation), start, end
+    lines = [line.strip() for line in iter_lines(input_file) if line.strip()]
+
+    # Convert letters to integer heights, with the start and end marked by heights past the top
+    heights = {c: ord(c) - 97 for c in 'abcdefghijklmnopqrstuvwxyz'}
+    elevation = Grid.from_lines(lines, {**heights, 'S': 26, 'E': 27})
+    # Store the locations of the start and end points
+    [start], [end] = elevation.find(26), elevation.find(27)
+    # Replace with real heights
+    elevation[start], elevation[end] = heights['a'], heights['z']
+
+    return elevation, start, end
 
+@memoized
 def Day12_Part1(input_file: str='Inputs/Day12_Inputs.txt') -> int:
     """
     Calculate the distance of the shortest possible route between given start and end squares on
@@ -72,38 +64,24 @@ def Day12_Part1(input_file: str='Inputs/Day12_Inputs.txt') -> int:
     """
     # Parse input file
     elevation, start, end = get_input(input_file)
-    # Initialise each point on the grid with an impossibly large distance from the start
-    distance = {(y, x): 10000 for x in range(len(elevation[0])) for y in range(len(elevation))}
-
-    # Initialise list of the heads of potential routes, with only the start point
-    heads = [start]
-    # Set starting distance to 0
-    distance[start] = 0
-    while len(heads) > 0: # While potential routes are yet to be fully explored
-        new_heads = []
-        for curr_pos in heads: # For each open route
-            # For each adjacent point to the current square
-            for next_pos in [(curr_pos[0]+1, curr_pos[1]), (curr_pos[0], curr_pos[1]+1),
-                                (curr_pos[0]-1, curr_pos[1]), (curr_pos[0], curr_pos[1]-1)]:
-                # Check if point is not beyond the edge of the grid
-                if next_pos[0] >= 0 and next_pos[0] < len(elevation) and \
-                    next_pos[1] >= 0 and next_pos[1] < len(elevation[0]):
-                    # If the elevation of the next point is no more than 1 higher than the current
-                    if elevation[next_pos] - elevation[curr_pos] <= 1:
-                        # If this is the shortest route so far discovered to this point
-                        if distance[curr_pos] + 1 < distance[next_pos]:
-                            # Set the distance to the next point to the new value
-                            distance[next_pos] = distance[curr_pos] + 1
-                            # Add the next point to the new list of open routes
-                            new_heads.append(next_pos)
-        # Reset heads to new list of open routes
-        heads = new_heads.copy()
-
-    # Find final distance to end point
-    shortest_distance = distance[end]
+    # Each square can be moved to from an adjacent square if its elevation is no more than 1
+    # higher than the current square
+    def next_squares(curr_pos):
+        x, y = curr_pos
+        return [next_pos for next_pos in [(x+1, y), (x, y+1), (x-1, y), (x, y-1)] \
+                if elevation.in_bounds(*next_pos) and elevation[next_pos] - elevation[x, y] <= 1]
+
+    # Breadth-first search from the start point, so the end point is first reached by the shortest
+    # route, with an impossibly large distance if it can't be reached at all
+    shortest_distance = 10000
+    for curr_pos, distance in search.bfs([start], next_squares):
+        if curr_pos == end:
+            shortest_distance = distance
+            break
 
     return shortest_distance
 
+@memoized
 def Day12_Part2(input_file: str='Inputs/Day12_Inputs.txt') -> int:
     """
     Calculate the distance of the shortest possible route between any square of lowest elevation
@@ -130,34 +108,68 @@ def Day12_Part2(input_file: str='Inputs/Day12_Inputs.txt') -> int:
     ########################################
     # Parse input file
     elevation, start, end = get_input(input_file)
-    # Initialise each point on the grid with an impossibly large distance from the end
-    distance = {(y, x): 10000 for x in range(len(elevation[0])) for y in range(len(elevation))}
-
-    # Initialise list of the heads of potential routes, with only the end point
-    heads = [end]
-    # Set distance to end square to 0
-    distance[end] = 0
-    while len(heads) > 0: # While potential routes are yet to be fully explored
-        new_heads = []
-        for curr_pos in heads: # For each open route
-            # For each adjacent point to the current square
-            for next_pos in [(curr_pos[0]+1, curr_pos[1]), (curr_pos[0], curr_pos[1]+1),
-                                (curr_pos[0]-1, curr_pos[1]), (curr_pos[0], curr_pos[1]-1)]:
-                # Check if point is not beyond the edge of the grid
-                if next_pos[0] >= 0 and next_pos[0] < len(elevation) and \
-                    next_pos[1] >= 0 and next_pos[1] < len(elevation[0]):
-                    # If the elevation of the next point is no less than 1 higher than the current
-                    if elevation[curr_pos] - elevation[next_pos] <= 1:
-                        # If this is the shortest route so far discovered to this point
-                        if distance[curr_pos] + 1 < distance[next_pos]:
-                            # Set the distance to the next point to the new value
-                            distance[next_pos] = distance[curr_pos] + 1
-                            # Add the next point to the new list of open routes
-                            new_heads.append(next_pos)
-        # Reset heads to new list of open routes
-        heads = new_heads.copy()
-
-    # Find shortest distance from end square to any start square with the lowest possible elevation
-    shortest_distance = min([distance[point] for point in distance if elevation[point] == 0])
+    # Moving backwards, each square can be moved to from an adjacent square if its elevation is no
+    # more than 1 lower than the current square
+    def prev_squares(curr_pos):
+        x, y = curr_pos
+        return [next_pos for next_pos in [(x+1, y), (x, y+1), (x-1, y), (x, y-1)] \
+                if elevation.in_bounds(*next_pos) and elevation[x, y] - elevation[next_pos] <= 1]
+
+    # Breadth-first search backwards from the end square, so the first square with the lowest
+    # possible elevation to be reached is the closest one
+    shortest_distance = 10000
+    for curr_pos, distance in search.bfs([end], prev_squares):
+        if elevation[curr_pos] == 0:
+            shortest_distance = distance
+            break
 
     return shortest_distance
+
+@memoized
+def Day12_solve(input_file: str='Inputs/Day12_Inputs.txt') -> tuple:
+    """
+    Calculate both the distance of the shortest possible route from the given start square to the
+    end square, and from any square of lowest elevation to the end square. Both come from a single
+    breadth-first search backwards from the end square, which finds the distance from every square
+    to the end at once.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file containing the elevations of the grid squares.
+        The default is 'Inputs/Day12_Inputs.txt'.
+
+    Returns
+    -------
+    start_distance : int
+        The distance of the shortest possible route between the start and end squares.
+    lowest_distance : int
+        The distance of the shortest possible route between the a square of lowest elevation and
+        the end point.
+
+    """
+    # Parse input file
+    elevation, start, end = get_input(input_file)
+    # Surround the grid with a border, so neighbours can be found without checking the edges
+    elevation = elevation.padded(1, 255)
+    heights = elevation.data
+    steps = elevation.offsets([(1, 0), (0, 1), (-1, 0), (0, -1)])
+
+    # Moving backwards, the next point must be at most one lower than the current, and never in
+    # the border
+    def prev_squares(curr):
+        return [curr + step for step in steps \
+                if heights[curr + step] != 255 and heights[curr] - heights[curr + step] <= 1]
+
+    # Initialise each point on the grid with an impossibly large distance from the end, then fill in
+    # every square reached by the search, which are flat indices so can be stored in a bytearray
+    distance = [10000]*len(heights)
+    for curr, curr_distance in search.bfs([elevation.index(*end)], prev_squares,
+                                          lambda index: index, len(heights)):
+        distance[curr] = curr_distance
+
+    # Find distance to the start square, and to any square with the lowest possible elevation
+    start_distance = distance[elevation.index(*start)]
+    lowest_distance = min(d for d, height in zip(distance, heights) if height == 0)
+
+    return start_distance, lowest_distance
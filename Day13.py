@@ -1,3 +1,8 @@
+from input_cache import cached_parser
+from inputs import iter_lines
+from memo import memoized
+
+@cached_parser
 def get_input(input_file: str='Inputs/Day13_Inputs.txt', group_pairs: bool=True) -> list:
     """
     Parse an input file containing pairs of data packets, which consist of nested lists and
@@ -5,7 +10,7 @@ def get_input(input_file: str='Inputs/Day13_Inputs.txt', group_pairs: bool=True)
 
     Parameters
     ----------
-    input_file : str, optional
+    input_file : str, stream or iterable, optional
         Input file containing the data packets.
         The default is 'Inputs/Day13_Inputs.txt'.
     group_pairs : bool, optional
@@ -19,14 +24,13 @@ def get_input(input_file: str='Inputs/Day13_Inputs.txt', group_pairs: bool=True)
 
     """
     # Parse input file
-    file = open(input_file)
     if group_pairs:
         # If grouping pairs, initialise nested list for first pair
         pairs = [[]]
     else:
         # Else just need one list
         pairs = []
-    for line in file:
+    for line in iter_lines(input_file):
         line = line.strip().split()
         if len(line) == 0:
             if group_pairs:
@@ -40,12 +44,11 @@ def get_input(input_file: str='Inputs/Day13_Inputs.txt', group_pairs: bool=True)
                 # Else just append packet to list
                 pairs.append(eval(line[0]))
 
-    file.close()
-
     return pairs
 
-import numpy as np
+from profiling import hot
 
+@hot
 def compare_order(a, b):
     """
     Recursively compares two items, both can be either an integer or a list, to determine which
@@ -83,7 +86,7 @@ def compare_order(a, b):
     # If both inputs are integers
     if type(a) == int and type(b) == int:
         # Return sign of difference -> -1 if a < b, 1 if a > b and 0 if a == b; as required
-        return np.sign(a - b)
+        return (a > b) - (a < b)
 
     # Else if both inputs are lists
     elif type(a) == list and type(b) == list:
@@ -98,7 +101,7 @@ def compare_order(a, b):
                 # Else return the result
                 return check
         # If the end of the shorter list is reached, return the comparison of the list lengths
-        return np.sign(len(a) - len(b))
+        return (len(a) > len(b)) - (len(a) < len(b))
 
     # Else the inputs must be one integer and one list
     else:
@@ -109,6 +112,7 @@ def compare_order(a, b):
             # Else convert b to a list
             return compare_order(a, [b])
 
+@memoized
 def Day13_Part1(input_file: str='Inputs/Day13_Inputs.txt') -> int:
     """
     Determines the sum of the indicies of the pairs of data packets, given in an input file, which
@@ -159,6 +163,7 @@ def Day13_Part1(input_file: str='Inputs/Day13_Inputs.txt') -> int:
 
 from functools import cmp_to_key
 
+@memoized
 def Day13_Part2(input_file: str='Inputs/Day13_Inputs.txt') -> int:
     """
     Determines decoder key of a distress signal, which is given by the product of the indices of
@@ -211,3 +216,55 @@ def Day13_Part2(input_file: str='Inputs/Day13_Inputs.txt') -> int:
     decoder_key = (sorted_pairs.index([[2]]) + 1) * (sorted_pairs.index([[6]]) + 1)
     
     return decoder_key
+
+@memoized
+def Day13_solve(input_file: str='Inputs/Day13_Inputs.txt') -> tuple:
+    """
+    Calculate both the sum of the indices of the pairs of data packets which are in the correct
+    order and the decoder key for the distress signal, parsing the input file only once. The
+    packets do not need to be sorted to find the decoder key, since the index of each divider
+    packet is just one more than the number of packets which come before it.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file containing the pairs of data packets.
+        The default is 'Inputs/Day13_Inputs.txt'.
+
+    Returns
+    -------
+    right_order_sum : int
+        The sum of the indices of all pairs in the input which are in the correct order.
+    decoder_key : int
+        The the product of the indices of the divider packets ([[2]] and [[6]]) in the sorted list
+        of data packets.
+
+    """
+    # Parse input file
+    pairs = get_input(input_file)
+
+    right_order_sum = 0
+    dividers = [[[2]], [[6]]]
+    # Start from the positions of the divider packets among just themselves
+    divider_indices = [1, 2]
+    # Whether a packet identical to each divider has been found in the input
+    found_dividers = [False, False]
+    for index, pair in enumerate(pairs): # For each pair
+        if compare_order(pair[0], pair[1]) < 0: # Comparison returns -1 for the correct order
+            right_order_sum += index + 1
+        for packet in pair:
+            for d, divider in enumerate(dividers):
+                order = compare_order(packet, divider)
+                # Packets which compare equal to a divider also come before it, since the dividers
+                # are added last, unless an identical packet has already been found, since this is
+                # then the one which is located in the sorted list
+                if order < 0 or (order == 0 and not found_dividers[d]):
+                    if packet == divider:
+                        found_dividers[d] = True
+                    else:
+                        divider_indices[d] += 1
+
+    # Calculate the decoder key with the indices of the divider packets
+    decoder_key = divider_indices[0]*divider_indices[1]
+
+    return right_order_sum, decoder_key
@@ -1,10 +1,16 @@
+from input_cache import cached_parser
+from inputs import iter_lines
+from memo import memoized
+from grid import Grid
+
+@cached_parser
 def get_input(input_file: str='Inputs/Day14_Inputs.txt') -> list:
     """
     Parse an input file giving the boundaries of sets of lines of rocks in a cave.
 
     Parameters
     ----------
-    input_file : str, optional
+    input_file : str, stream or iterable, optional
         Input file giving the rock boundaries.
         The default is 'Inputs/Day14_Inputs.txt'.
 
@@ -15,18 +21,50 @@ def get_input(input_file: str='Inputs/Day14_Inputs.txt') -> list:
 
     """
     # Parse input file
-    file = open(input_file)
     rock_boundaries = []
-    for line in file:
+    for line in iter_lines(input_file):
         line = line.strip().split(' -> ')
         if len(line) > 0:
             # Split up and format the coordinates
             rock_boundaries.append([tuple(int(i) for i in coords.split(',')) for coords in line])
 
-    file.close()
-
     return rock_boundaries
 
+# Values of each type of point in the cave grid
+AIR, ROCK, SAND = 0, 1, 2
+
+def build_cave(rock_boundaries: list) -> Grid:
+    """
+    Build a grid of the cave from the boundaries of the rock walls, which is wide enough either
+    side of the sand source at (500, 0) for the pyramid of sand which forms on a floor two rows
+    below the lowest rock.
+
+    Parameters
+    ----------
+    rock_boundaries : list
+        List of the boundaries of each rock wall, as lists of (x, y) tuples.
+
+    Returns
+    -------
+    cave : Grid
+        Grid of the cave, with each point either AIR or ROCK. The rows below the lowest rock are
+        left as AIR.
+
+    """
+    # The sand can spread at most one unit sideways for every unit it falls
+    y_max = max(y for boundary in rock_boundaries for x, y in boundary)
+    cave = Grid(2*y_max + 7, y_max + 3, AIR, x0=500 - y_max - 3)
+    for boundary in rock_boundaries:
+        # Construct the rock walls, setting each contained point to a rock in the grid, which
+        # grows if a wall is further out to the side than the sand could ever reach
+        for (x1, y1), (x2, y2) in zip(boundary[:-1], boundary[1:]):
+            for x in range(min(x1, x2), max(x1, x2) + 1):
+                for y in range(min(y1, y2), max(y1, y2) + 1):
+                    cave[x, y] = ROCK
+
+    return cave
+
+@memoized
 def Day14_Part1(input_file: str='Inputs/Day14_Inputs.txt') -> int:
     """
     Determine the total number of units of sand which can fall into a cave and come to rest on a
@@ -97,6 +135,7 @@ def Day14_Part1(input_file: str='Inputs/Day14_Inputs.txt') -> int:
     total_sand = len(all_sand)
     return total_sand
 
+@memoized
 def Day14_Part2(input_file: str='Inputs/Day14_Inputs.txt') -> int:
     """
     Determine the total number of units of sand which can fall into a cave and come to rest on a
@@ -127,46 +166,98 @@ def Day14_Part2(input_file: str='Inputs/Day14_Inputs.txt') -> int:
     """
     # Parse input file
     rock_boundaries = get_input(input_file)
-    # Create a grid initially full of air, 200 deep in y and 400 wide in x, since I know the y_max
-    # of the cave is less than 200, and the resulting pyramid of sand will be at most 2*y_max wide
-    # Also using a shifted coordinate system with the sand source at (200, 0) to allow the grid to
-    # be smaller while indexing simply.
-    grid = [['AIR' for i in range(400)] for j in range(200)]
-    for boundary in rock_boundaries:
-        # Construct the rock walls, setting each contained point to a rock in the grid
-        for i in range(len(boundary) - 1):
-            if boundary[i][0] == boundary[i+1][0]:
-                for k in range(min(boundary[i][1], boundary[i+1][1]),
-                               max(boundary[i][1], boundary[i+1][1]) + 1):
-                    grid[k][boundary[i][0] - 300] = 'ROCK' # (using shifted coordinates)
-            elif boundary[i][1] == boundary[i+1][1]:
-                for k in range(min(boundary[i][0], boundary[i+1][0]),
-                               max(boundary[i][0], boundary[i+1][0]) + 1):
-                    grid[boundary[i][1]][k - 300] = 'ROCK' # (using shifted coordinates)
-    
+    # Create a grid of the cave, just wide enough for the resulting pyramid of sand
+    grid = build_cave(rock_boundaries)
+
     # Create horizontal rock floor 2 rows below lowest rocks
-    y_max = max([i for i in range(len(grid)) if 'ROCK' in grid[i]])
-    grid[y_max + 2] = ['ROCK' for i in range(400)]
+    y_max = max(y for boundary in rock_boundaries for x, y in boundary)
+    for x in range(grid.x0, grid.x0 + grid.width):
+        grid[x, y_max + 2] = ROCK
 
-    # Sand source at (200, 0) in this shifted coordinate system
-    sand_source = (200, 0)
-    
-    curr_sand = (sand_source[0], sand_source[1])
-    while grid[sand_source[1]][sand_source[0]] == 'AIR': # While the sand source is not blocked
-        if grid[curr_sand[1] + 1][curr_sand[0]] == 'AIR':
+    # Work with flat indices into the grid, where moving down one row is a step of the width
+    cells, down = grid.data, grid.width
+    sand_source = grid.index(500, 0)
+
+    curr_sand = sand_source
+    while cells[sand_source] == AIR: # While the sand source is not blocked
+        if cells[curr_sand + down] == AIR:
             # Attempt to move down
-            curr_sand = (curr_sand[0], curr_sand[1] + 1)
-        elif grid[curr_sand[1] + 1][curr_sand[0] - 1] == 'AIR':
+            curr_sand += down
+        elif cells[curr_sand + down - 1] == AIR:
             # Attempt to instead move diagonally one step down and to the left
-            curr_sand = (curr_sand[0] - 1, curr_sand[1] + 1)
-        elif grid[curr_sand[1] + 1][curr_sand[0] + 1] == 'AIR':
+            curr_sand += down - 1
+        elif cells[curr_sand + down + 1] == AIR:
             # Attempt to instead move diagonally one step down and to the right
-            curr_sand = (curr_sand[0] + 1, curr_sand[1] + 1)
+            curr_sand += down + 1
         else:
             # Else come to rest, set this point to sand to the grid
-            grid[curr_sand[1]][curr_sand[0]] = 'SAND'
-            curr_sand = (sand_source[0], sand_source[1])
+            cells[curr_sand] = SAND
+            curr_sand = sand_source
 
     # Count total number of sand points in the grid at the end
-    total_sand = sum([line.count('SAND') for line in grid])
+    total_sand = grid.count(SAND)
     return total_sand
+
+@memoized
+def Day14_solve(input_file: str='Inputs/Day14_Inputs.txt') -> tuple:
+    """
+    Determine both the number of units of sand which come to rest before sand starts falling into
+    the abyss, and the number which come to rest on the floor before the source is blocked, from a
+    single simulation. Sand comes to rest in the same places in both parts until the first unit
+    falls past the lowest rock, so the simulation just carries on with the floor from there. The
+    path of each unit of sand is also kept, so that the next unit can start falling from the last
+    point on the path which is still open, rather than from the source.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file giving the boundaries of the rock walls.
+        The default is 'Inputs/Day14_Inputs.txt'.
+
+    Returns
+    -------
+    abyss_sand : int
+        The total number of units of sand which come to rest on the rocks.
+    floor_sand : int
+        The total number of units of sand which come to rest on the rocks before the source is
+        blocked.
+
+    """
+    # Parse input file
+    rock_boundaries = get_input(input_file)
+    # Grid of the cave, where every point is either air, rock or sand
+    cave = build_cave(rock_boundaries)
+
+    # Store the highest y value sand can have before it falls into the abyss
+    y_max = max(y for boundary in rock_boundaries for x, y in boundary)
+    # Work with flat indices into the grid, where moving down one row is a step of the width
+    cells, down = cave.data, cave.width
+    # Flat indices of the points on the lowest rock's row and on the row above the floor
+    abyss_row = cave.index(cave.x0, y_max)
+    floor_row = cave.index(cave.x0, y_max + 1)
+
+    abyss_sand = None
+    total_sand = 0
+    # Path of the current unit of sand from the source
+    path = [cave.index(500, 0)]
+    while path: # While the sand source is not blocked
+        curr = path[-1]
+        # The first time sand falls past the lowest rock, it would fall into the abyss
+        if curr >= abyss_row and abyss_sand is None:
+            abyss_sand = total_sand
+        # Sand comes to rest on the floor two rows below the lowest rock
+        if curr < floor_row:
+            # Attempt to move down, then diagonally down and left, then down and right
+            for next_ in (curr + down, curr + down - 1, curr + down + 1):
+                if cells[next_] == AIR:
+                    path.append(next_)
+                    break
+            else:
+                # Else come to rest
+                cells[path.pop()] = SAND
+                total_sand += 1
+        else:
+            cells[path.pop()] = SAND
+            total_sand += 1
+
+    return abyss_sand, total_sand
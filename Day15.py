@@ -4,23 +4,25 @@ class RangeSet:
     of each other, e.g. (1, 3) and (4, 7) would become (1, 7), while (1, 3) and (5, 7) would stay
     that way.
     """
-    def __init__(self, ranges: list=[]):
+    def __init__(self, ranges: list=None):
         """
         Initialise the set with a list of ranges, can be empty, which must not be overlapping
         according to the rule above, and which are immediately sorted in ascending order.
 
         Parameters
         ----------
-        ranges : list of tuples, optional
-            List of ranges to initialise the set with, should not overlap.
-            The default is [].
+        ranges : list of tuples or NoneType, optional
+            List of ranges to initialise the set with, should not overlap. If None, the set starts
+            empty.
+            The default is None.
 
         Returns
         -------
         None.
 
         """
-        self.ranges = ranges
+        # Use a new list each time, so different sets never share the same ranges
+        self.ranges = [] if ranges is None else ranges
         # Sort the ranges to make adding easier
         self.ranges.sort()
 
@@ -182,6 +184,11 @@ class RangeSet:
         """
         return sum([curr_range[1] - curr_range[0] + 1 for curr_range in self.ranges])
 
+from input_cache import cached_parser
+import ingest
+from memo import memoized
+
+@cached_parser
 def get_input(input_file: str='Inputs/Day15_Inputs.txt') -> list:
     """
     Parse an input file and extract the coordinates of a set of sensors, along with the coordinates
@@ -189,7 +196,7 @@ def get_input(input_file: str='Inputs/Day15_Inputs.txt') -> list:
 
     Parameters
     ----------
-    input_file : str, optional
+    input_file : str, stream or iterable, optional
         Input file containing the sensor and beacon coordinates.
         The default is 'Inputs/Day15_Inputs.txt'.
 
@@ -203,21 +210,14 @@ def get_input(input_file: str='Inputs/Day15_Inputs.txt') -> list:
 
     """
     # Parse input file
-    file = open(input_file)
-    sensors, beacons = [], []
-    for line in file:
-        line = line.strip().split()
-        if len(line) > 0:
-            # Extract coordinates and convert to integers
-            sensors.append((int(line[2].split('=')[1].split(',')[0]),
-                            int(line[3].split('=')[1].split(':')[0])))
-            beacons.append((int(line[8].split('=')[1].split(',')[0]),
-                            int(line[9].split('=')[1])))
-
-    file.close()
+    # Extract coordinates and convert to integers, with the sensor and beacon x, y on each line
+    coords = ingest.read_int_table(input_file).tolist()
+    sensors = [(sx, sy) for sx, sy, bx, by in coords]
+    beacons = [(bx, by) for sx, sy, bx, by in coords]
 
     return sensors, beacons
 
+@memoized
 def Day15_Part1(input_file: str='Inputs/Day15_Inputs.txt', row_of_interest: int=2000000) -> int:
     """
     Calculate how many positions in a specified row of a grid cannot contain a beacon, given the
@@ -262,8 +262,11 @@ def Day15_Part1(input_file: str='Inputs/Day15_Inputs.txt', row_of_interest: int=
 
     return number_excluded
 
-from tqdm import tqdm
+from lazy import lazy_import
+tqdm = lazy_import('tqdm')
+import telemetry
 
+@memoized
 def Day15_Part2(input_file: str='Inputs/Day15_Inputs.txt',
                 possible_coords: RangeSet=RangeSet([(0, 4000000)])) -> int:
     """
@@ -300,7 +303,8 @@ def Day15_Part2(input_file: str='Inputs/Day15_Inputs.txt',
     sensors, beacons = get_input(input_file)
     # Loop over every row in the grid of possible coordinates and perform the same check as
     # Part 1
-    for row_of_interest in tqdm(range(possible_coords.ranges[-1][1] + 1)[::-1]):
+    rows = range(possible_coords.ranges[-1][1] + 1)[::-1]
+    for row_of_interest in telemetry.track(tqdm.tqdm(rows), unit='rows'):
         excluded_coordinates = RangeSet([])
         for s, b in zip(sensors, beacons): # For each sensor and its closest beacon
             # Find the Manhattan distance between them --> corresponds to max vertical distance from
@@ -320,3 +324,78 @@ def Day15_Part2(input_file: str='Inputs/Day15_Inputs.txt',
             # Then the column must be 1 more than the upper limit of the lower range
             tuning_frequency = (excluded_coordinates.ranges[0][1] + 1)*4000000 + row_of_interest
             return tuning_frequency
+
+@memoized
+def Day15_solve(input_file: str='Inputs/Day15_Inputs.txt', row_of_interest: int=2000000,
+                possible_coords: RangeSet=RangeSet([(0, 4000000)])) -> tuple:
+    """
+    Calculates both the number of positions in a specified row which cannot contain a beacon, and
+    the tuning frequency of the distress beacon, parsing the input file and finding the range of
+    every sensor only once. Since there is only one possible position for the distress beacon, it
+    must lie just outside the range of at least two sensors, so in coordinates rotated by 45
+    degrees (x - y and x + y) it is on the intersection of two of the lines just outside their
+    diamond-shaped boundaries, and only those intersections need to be checked rather than every
+    row of the grid.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file containing the sensor and beacon coordinates.
+        The default is 'Inputs/Day15_Inputs.txt'.
+    row_of_interest : int, optional
+        The row to check.
+        The default is 2000000.
+    possible_coords : RangeSet, optional
+        The range of possible coordinates in each axis for the distress beacon.
+        The default is RangeSet([(0, 4000000)]).
+
+    Returns
+    -------
+    number_excluded : int
+        The number of positions in the specified row which cannot contain a beacon.
+    tuning_frequency : int
+        The tuning frequency of the distress beacon.
+
+    """
+    # Parse input file
+    sensors, beacons = get_input(input_file)
+    # The Manhattan distance to each sensor's closest beacon is the range of the sensor
+    ranges = [abs(s[0] - b[0]) + abs(s[1] - b[1]) for s, b in zip(sensors, beacons)]
+
+    excluded_coordinates = RangeSet()
+    for s, y_range in zip(sensors, ranges):
+        if s[1] - y_range <= row_of_interest <= s[1] + y_range:
+            # Add section of row excluded by the sensor to RangeSet
+            width = y_range - (abs(row_of_interest - s[1]))
+            excluded_coordinates += (s[0] - width, s[0] + width)
+    # Number exluced is length of RangeSet minus the number of beacons in the row
+    number_excluded = len(excluded_coordinates) - sum([b[1] == row_of_interest for b in set(beacons)])
+
+    # Lines just outside the boundary of each sensor's range, as constant x - y and x + y
+    diffs, sums = set(), set()
+    for s, y_range in zip(sensors, ranges):
+        for offset in (-y_range - 1, y_range + 1):
+            diffs.add(s[0] - s[1] + offset)
+            sums.add(s[0] + s[1] + offset)
+    low, high = possible_coords.ranges[0][0], possible_coords.ranges[-1][1]
+
+    candidates = set()
+    for diff in diffs:
+        for total in sums:
+            # Only lines with the same parity cross at an integer point
+            if (diff + total)%2:
+                continue
+            x, y = (total + diff)//2, (total - diff)//2
+            if low <= x <= high and low <= y <= high and \
+                all(abs(s[0] - x) + abs(s[1] - y) > y_range for s, y_range in zip(sensors, ranges)):
+                candidates.add((x, y))
+
+    if len(candidates) == 1:
+        x, y = candidates.pop()
+        tuning_frequency = x*4000000 + y
+    else:
+        # Either the distress beacon is against the edge of the grid, or there is more than one
+        # possible position, so fall back to checking every row
+        tuning_frequency = Day15_Part2(input_file, possible_coords)
+
+    return number_excluded, tuning_frequency
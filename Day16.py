@@ -41,7 +41,11 @@ class Valve:
                                        self.flow_rate, self.tunnels)
 
 import re
+from input_cache import cached_parser
+from inputs import iter_lines
+from memo import memoized
 
+@cached_parser
 def get_input(input_file: str='Inputs/Day16_Inputs.txt') -> list:
     """
     Parse an input file containing a list of Valves, their flow rates and the other valves they are
@@ -49,7 +53,7 @@ def get_input(input_file: str='Inputs/Day16_Inputs.txt') -> list:
 
     Parameters
     ----------
-    input_file : str, optional
+    input_file : str, stream or iterable, optional
         Input file giving the Valves and their properties.
         The default is 'Inputs/Day16_Inputs.txt'.
 
@@ -61,11 +65,10 @@ def get_input(input_file: str='Inputs/Day16_Inputs.txt') -> list:
 
     """
     # Parse input file
-    with open(input_file) as f:
-        # Extract only Valve names and flow_rate
-        valve_props = [re.findall('[A-Z]{2}|\d+', line) for line in f.readlines()]
-        # Build valve objects and add to dictionary
-        valves = {v[0]: Valve(v[0], int(v[1]), {nv:1 for nv in v[2:]}) for v in valve_props}
+    # Extract only Valve names and flow_rate
+    valve_props = (re.findall('[A-Z]{2}|\d+', line) for line in iter_lines(input_file))
+    # Build valve objects and add to dictionary
+    valves = {v[0]: Valve(v[0], int(v[1]), {nv:1 for nv in v[2:]}) for v in valve_props}
 
     return valves
 
@@ -130,6 +133,10 @@ def compress_valves(all_valves, start_valve='AA'):
 
     return compressed_valves
 
+from profiling import hot, phase
+import telemetry
+
+@hot
 def find_max_route(curr_path, valves, minutes_left, curr_max_pressure=0, open_valves=['AA'],
                    max_route=(0, ['AA'])):
     """
@@ -169,6 +176,8 @@ def find_max_route(curr_path, valves, minutes_left, curr_max_pressure=0, open_va
         which releases the most total pressure of any possible route.
 
     """
+    # Count the state towards the progress of the search, along with the best pressure so far
+    telemetry.tick('states', best=max_route[0])
     # If all valves are opened then there are no more options, so return the current max route
     if sorted(open_valves) == sorted([v for v in valves]):
         return curr_max_pressure, open_valves
@@ -238,6 +247,7 @@ def find_max_route(curr_path, valves, minutes_left, curr_max_pressure=0, open_va
 
     return max_route
 
+@memoized
 def Day16_Part1(input_file: str='Inputs/Day16_Inputs.txt') -> int:
     """
     Finds the maximum possible pressure released at the end of 30 minutes by a system of valves,
@@ -409,6 +419,7 @@ def find_max_route_all_comb(curr_valve, open_valves, minutes_left, curr_max_pres
     # valves, set it to the new value.
     # The keys of opt_all_comb are lists of opened valves, which are sorted() to avoid duplication
     # and tuple() so they are hashable for the dictionary. This could also be done with bitmasking.
+    telemetry.tick('states', combinations=len(opt_all_comb))
     opt_all_comb[tuple(sorted(open_valves))] = max(curr_max_pressure,
                                                    # dict.get() allows a defult value of 0 to be
                                                    # assigned if no value has been recorded for
@@ -433,6 +444,77 @@ def find_max_route_all_comb(curr_valve, open_valves, minutes_left, curr_max_pres
 
     return opt_all_comb
 
+def valve_distances(compressed_valves):
+    """
+    Find the minimum distance between every combination of valves in a compressed system of valves,
+    along with the flow rates of the valves worth opening.
+
+    Parameters
+    ----------
+    compressed_valves : dict(str, Valve)
+        Compressed system of Valves with zero flow rate Valves removed.
+
+    Returns
+    -------
+    distances : dict(tuple(str, str): int)
+        Dictionary of the form (tuple(valve1, valve2): distance_between_valves_1_and_2) which gives
+        the minimum possible distance between every combination of valves.
+    flows : dict(str: int)
+        Dictionary of the form (valve_name: flow_rate) giving the flow rate of each valve with a
+        non-zero flow rate.
+
+    """
+    # Create dictionary of distances between every combination of valves, fill with known
+    # distances from compressed_valves and assign a default impossiblly large value to unknown
+    # distances
+    distances = {(v, nv): compressed_valves[v].tunnels[nv] if nv in compressed_valves[v].tunnels \
+                 else 0 if v == nv else 1000 for nv in compressed_valves for v in compressed_valves}
+
+    # Find minimum distance between every combination of valves using Floyd-Warshall
+    distances = Floyd_Warshall(compressed_valves, distances)
+
+    # Create dictionary of flow rates of every valve
+    flows = {v: valve.flow_rate for v, valve in compressed_valves.items() if valve.flow_rate > 0}
+
+    return distances, flows
+
+@hot
+def max_team_pressure(distances, flows, minutes=26):
+    """
+    Finds the maximum possible pressure released by two members working separately, by combining
+    the best routes for every pair of sets of opened valves which do not overlap.
+
+    Parameters
+    ----------
+    distances : dict(tuple(str, str): int)
+        Dictionary of the form (tuple(valve1, valve2): distance_between_valves_1_and_2) which gives
+        the minimum possible distance between every combination of valves.
+    flows : dict(str: int)
+        Dictionary of the form (valve_name: flow_rate) giving the flow rate of each valve.
+    minutes : int, optional
+        The number of minutes available to each member.
+        The default is 26.
+
+    Returns
+    -------
+    max_pressure : int
+        The maximum possible pressure which can be released by the two-member team.
+
+    """
+    # Find the maximum possible pressure for every combination of opened valves in the time
+    opt_all_comb = find_max_route_all_comb('AA', [], minutes, 0, flows, distances, {})
+
+    # Find the maximum total pressure for two orthogonal combinations of opened valves, reporting
+    # the progress through the first of each pair
+    routes = telemetry.track(opt_all_comb.items(), unit='combinations')
+    max_pressure = max(dist_1 + dist_2 for route_1, dist_1 in routes \
+                                      for route_2, dist_2 in opt_all_comb.items() \
+                                      # Check the two sets of opened valves are orthogonal
+                                      if all(v1 not in route_2 for v1 in route_1))
+
+    return max_pressure
+
+@memoized
 def Day16_Part2(input_file: str='Inputs/Day16_Inputs.txt') -> int:
     """
     Finds the maximum possible pressure released at the end of 26 minutes by a system of valves,
@@ -461,25 +543,48 @@ def Day16_Part2(input_file: str='Inputs/Day16_Inputs.txt') -> int:
     # adjusting valve connections accordingly
     compressed_valves = compress_valves(all_valves, 'AA')
 
-    # Create dictionary of distances between every combination of valves, fill with known
-    # distances from compressed_valves and assign a default impossiblly large value to unknown
-    # distances
-    distances = {(v, nv): compressed_valves[v].tunnels[nv] if nv in compressed_valves[v].tunnels \
-                 else 0 if v == nv else 1000 for nv in compressed_valves for v in compressed_valves}
+    # Find the minimum distance between every combination of valves
+    distances, flows = valve_distances(compressed_valves)
 
-    # Find minimum distance between every combination of valves using Floyd-Warshall
-    distances = Floyd_Warshall(compressed_valves, distances)
+    max_pressure = max_team_pressure(distances, flows)
 
-    # Create dictionary of flow rates of every valve
-    flows = {v: valve.flow_rate for v, valve in compressed_valves.items() if valve.flow_rate > 0}
-    
-    # Find the maximum possible pressure for every combination of opened valves within 26 minutes
-    opt_all_comb = find_max_route_all_comb('AA', [], 26, 0, flows, distances, {})
+    return max_pressure
 
-    # Find the maximum total pressure for two orthogonal combinations of opened valves
-    max_pressure = max(dist_1 + dist_2 for route_1, dist_1 in opt_all_comb.items() \
-                                      for route_2, dist_2 in opt_all_comb.items() \
-                                      # Check the two sets of opened valves are orthogonal
-                                      if all(v1 not in route_2 for v1 in route_1))
+@memoized
+def Day16_solve(input_file: str='Inputs/Day16_Inputs.txt') -> tuple:
+    """
+    Finds both the maximum possible pressure released in 30 minutes by one person and in 26
+    minutes by a team of two, parsing the input file and compressing the valve system only once.
 
-    return max_pressure
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file giving the valves, their flow rates and the other valves they are directly
+        connected to via tunnels.
+        The default is 'Inputs/Day16_Inputs.txt'.
+
+    Returns
+    -------
+    max_pressure : int
+        The maximum possible pressure which can be released in 30 minutes.
+    max_team_pressure : int
+        The maximum possible pressure which can be released in 26 minutes by the two-member team.
+
+    """
+    # Parse input file
+    all_valves = get_input(input_file)
+
+    with phase('precompute'):
+        # Compress valve system down to only valves with non zero flow rates (and the starting
+        # valve), adjusting valve connections accordingly
+        compressed_valves = compress_valves(all_valves, 'AA')
+        # Find the minimum distance between every combination of valves for the team of two
+        distances, flows = valve_distances(compressed_valves)
+
+    with phase('search'):
+        # Use a recursive depth-first search to find the optimal route for one person
+        max_pressure, optimal_route = find_max_route(['AA'], compressed_valves, 30, 0, ['AA'],
+                                                     (0, ['AA']))
+        team_pressure = max_team_pressure(distances, flows)
+
+    return max_pressure, team_pressure
@@ -1,10 +1,16 @@
+from input_cache import cached_parser
+from inputs import iter_lines
+from memo import memoized
+from grid import Grid
+
+@cached_parser
 def get_input(input_file: str='Inputs/Day17_Inputs.txt') -> str:
     """
     Parse an input file describing the directions of a series of jets of hot gas in a cave.
 
     Parameters
     ----------
-    input_file : str, optional
+    input_file : str, stream or iterable, optional
         The input file containing the jet directions.
         The default is 'Inputs/Day17_Inputs.txt'.
 
@@ -15,8 +21,8 @@ def get_input(input_file: str='Inputs/Day17_Inputs.txt') -> str:
 
     """
     # Parse input file
-    with open(input_file) as f:
-        jets = f.readlines()[0].strip()
+    # Only the first line is needed
+    jets = next(iter_lines(input_file)).strip()
 
     return jets
 
@@ -63,6 +69,10 @@ def draw_cave(stopped: set, moving: set={}, max_rows=None) -> None:
     # Add the floor at the bottom
     print('+-------+')
 
+from profiling import hot, phase
+import telemetry
+
+@hot
 def process_rock_fall(base_rock: set, stopped: set, jets: str, jet_index: int) -> tuple:
     """
     Simulate a single rock of a given type, falling into a cave containing a given set of stopped
@@ -148,6 +158,7 @@ def process_rock_fall(base_rock: set, stopped: set, jets: str, jet_index: int) -
             # Else perform the movement, setting the new rock position, and continue
             rock = next_pos.copy()
 
+@memoized
 def Day17_Part1(input_file: str='Inputs/Day17_Inputs.txt', total_rocks: int=2022) -> int:
     """
     Find the total height of the tower formed by a series of rocks falling into a cave, after a
@@ -249,12 +260,14 @@ def Day17_Part1(input_file: str='Inputs/Day17_Inputs.txt', total_rocks: int=2022
         # rocks and the next jet index each time
         stopped, jet_index, _ = process_rock_fall(rocks[rock_number%len(rocks)], stopped, jets,
                                                   jet_index)
+        telemetry.report(done=rock_number + 1, total=total_rocks)
 
     # Find the height of the highest rock in the cave (+1 since the y coordinate starts at zero)
     total_height = max([c[1] for c in stopped]) + 1
 
     return total_height
 
+@memoized
 def Day17_Part2(input_file: str='Inputs/Day17_Inputs.txt', total_rocks: int=1000000000000) -> int:
     """
     Find the total height of the tower formed by a series of rocks falling into a cave, after a
@@ -370,6 +383,7 @@ def Day17_Part2(input_file: str='Inputs/Day17_Inputs.txt', total_rocks: int=1000
                                                           jets, jet_index)
         # Increment rock_number
         rock_number += 1
+        telemetry.report(rocks=rock_number, jet_wraps=jet_wraps)
 
         # If the jets wrapped around during the last rock fall
         if jets_wrap:
@@ -437,3 +451,138 @@ def Day17_Part2(input_file: str='Inputs/Day17_Inputs.txt', total_rocks: int=1000
     total_height = pre_wrap_height_gain + height_gain_from_wraps + final_loop_height_gain
 
     return total_height
+
+# The five types of rocks, as the coordinates of each unit relative to their bottom left corner
+ROCK_SHAPES = [((0, 0), (1, 0), (2, 0), (3, 0)),
+               ((1, 0), (0, 1), (1, 1), (2, 1), (1, 2)),
+               ((0, 0), (1, 0), (2, 0), (2, 1), (2, 2)),
+               ((0, 0), (0, 1), (0, 2), (0, 3)),
+               ((0, 0), (1, 0), (0, 1), (1, 1))]
+
+@hot
+def tower_heights(jets: str, snapshot_rows: int=30) -> tuple:
+    """
+    Simulate rocks falling into the cave until the state of the cave repeats, recording the height
+    of the tower after each rock. The state is the type of the next rock, the index of the next jet
+    and the shape of the top rows of the tower, since once all three repeat, everything that
+    follows repeats as well.
+
+    Parameters
+    ----------
+    jets : str
+        The string of characters giving the direction of each jet, in order.
+    snapshot_rows : int, optional
+        The number of rows at the top of the tower included in the state. Rocks are assumed never
+        to fall further than this below the top of the tower.
+        The default is 30.
+
+    Returns
+    -------
+    heights : list(int)
+        The height of the tower after each number of rocks have fallen, starting from zero rocks.
+    cycle_start : int
+        The number of rocks after which the repeating pattern starts.
+    cycle_length : int
+        The number of rocks in each repeat of the pattern.
+
+    """
+    # Grid of the cave, with the walls either side (x = -1 and x = 7) and the floor (y = -1)
+    # stored as rock, so that a falling rock never has to check the edges of the cave
+    cave = Grid(9, 1, 1, x0=-1, y0=-1)
+    cells, up = cave.data, cave.width
+    # Each shape as the steps between flat indices from its bottom left corner
+    shapes = [cave.offsets(shape) for shape in ROCK_SHAPES]
+    shape_tops = [max(dy for dx, dy in shape) for shape in ROCK_SHAPES]
+    height = 0
+    jet_index = 0
+    jet_moves = [1 if jet == '>' else -1 for jet in jets]
+    heights = [0]
+    seen = {}
+    rock_number = 0
+    while True:
+        # Check whether the state of the cave has been seen before, using the raw bytes of the top
+        # rows of the grid as their shape
+        state = (rock_number%len(ROCK_SHAPES), jet_index,
+                 bytes(cells[max(0, (height - snapshot_rows + 1)*up): (height + 1)*up]))
+        if state in seen:
+            return heights, seen[state], rock_number - seen[state]
+        seen[state] = rock_number
+
+        # Make sure there is room above the tower for the next rock, adding empty rows between
+        # the walls, which only adds to the end of the grid so the flat indices are unchanged
+        if cave.height < height + 8:
+            old_height = cave.height
+            cave.extend_to(0, height + 8)
+            cells = cave.data
+            for y in range(old_height, cave.height):
+                cells[y*up: (y + 1)*up] = b'\x01\x00\x00\x00\x00\x00\x00\x00\x01'
+
+        shape = shapes[rock_number%len(ROCK_SHAPES)]
+        # Each rock appears two units from the left wall and three units above the tower
+        pos = cave.index(2, height + 3)
+        while True:
+            # Push the rock with the next jet, if there is space
+            move = jet_moves[jet_index]
+            jet_index = (jet_index + 1)%len(jets)
+            if not any(cells[pos + move + step] for step in shape):
+                pos += move
+            # Move the rock down one unit, or stop it if there is no space
+            if any(cells[pos - up + step] for step in shape):
+                break
+            pos -= up
+
+        for step in shape:
+            cells[pos + step] = 1
+        height = max(height, cave.point(pos)[1] + shape_tops[rock_number%len(ROCK_SHAPES)] + 1)
+        heights.append(height)
+        rock_number += 1
+        telemetry.report(rocks=rock_number, height=height)
+
+@memoized
+def Day17_solve(input_file: str='Inputs/Day17_Inputs.txt', part1_rocks: int=2022,
+                part2_rocks: int=1000000000000) -> tuple:
+    """
+    Find the total height of the tower formed by the falling rocks after two different numbers of
+    rocks have stopped, parsing the input file and simulating the tower only once. The tower is
+    only simulated until its state first repeats, and the height after any number of rocks is then
+    either looked up directly or extrapolated from the repeating pattern.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file containing the jet directions.
+        The default is 'Inputs/Day17_Inputs.txt'.
+    part1_rocks : int, optional
+        The total number of rocks which fall into the cave for Part 1.
+        The default is 2022.
+    part2_rocks : int, optional
+        The total number of rocks which fall into the cave for Part 2.
+        The default is 1000000000000.
+
+    Returns
+    -------
+    part1_height : int
+        The total height of the rock tower after part1_rocks rocks have fallen.
+    part2_height : int
+        The total height of the rock tower after part2_rocks rocks have fallen.
+
+    """
+    # Parse input file to get list of jet directions
+    jets = get_input(input_file)
+
+    # Simulate the tower until its state repeats
+    with phase('search'):
+        heights, cycle_start, cycle_length = tower_heights(jets)
+    # Height gained by each repeat of the pattern
+    cycle_height = heights[cycle_start + cycle_length] - heights[cycle_start]
+
+    total_heights = []
+    for total_rocks in (part1_rocks, part2_rocks):
+        if total_rocks < len(heights):
+            total_heights.append(heights[total_rocks])
+        else:
+            # Skip over as many whole repeats of the pattern as possible
+            cycles, rocks_left = divmod(total_rocks - cycle_start, cycle_length)
+            total_heights.append(heights[cycle_start + rocks_left] + cycles*cycle_height)
+
+    return tuple(total_heights)
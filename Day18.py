@@ -1,10 +1,17 @@
+from input_cache import cached_parser
+import ingest
+from memo import memoized
+import search
+from profiling import phase
+
+@cached_parser
 def get_input(input_file: str='Inputs/Day18_Inputs.txt') -> list:
     """
     Parse an input file containing the coordinates of 1x1x1 cubes making up a lava droplet.
 
     Parameters
     ----------
-    input_file : str, optional
+    input_file : str, stream or iterable, optional
         The input file containing the cube coordinates.
         The default is 'Inputs/Day18_Inputs.txt'.
 
@@ -15,14 +22,14 @@ def get_input(input_file: str='Inputs/Day18_Inputs.txt') -> list:
 
     """
     # Parse input file
-    with open(input_file) as f:
-        # Convert coordinates to tuples of ints
-        cubes = [tuple(int(i) for i in line.strip().split(',')) for line in f.readlines()]
+    # Convert coordinates to tuples of ints, with one row of coordinates per line
+    cubes = [tuple(cube) for cube in ingest.read_int_table(input_file).tolist()]
 
     return cubes
 
 from itertools import combinations
 
+@memoized
 def Day18_Part1(input_file: str='Inputs/Day18_Inputs.txt') -> int:
     """
     Calculates the number of cube faces which are not immediately connected to another cube in a
@@ -42,7 +49,7 @@ def Day18_Part1(input_file: str='Inputs/Day18_Inputs.txt') -> int:
 
     """
     # Parse input file to get coordinates of every cube
-    cubes = get_input()
+    cubes = get_input(input_file)
 
     # Find the total number of faces across every cube
     all_faces = len(cubes)*6
@@ -59,7 +66,8 @@ def Day18_Part1(input_file: str='Inputs/Day18_Inputs.txt') -> int:
     
     return exposed_faces
 
-import numpy as np
+from lazy import lazy_import
+np = lazy_import('numpy')
 
 def next_cubes(cube: tuple, bounds: tuple) -> list:
     """
@@ -98,6 +106,7 @@ def next_cubes(cube: tuple, bounds: tuple) -> list:
 
     return next_cubes
 
+@memoized
 def Day18_Part2(input_file: str='Inputs/Day18_Inputs.txt') -> int:
     """
     Calculates the exterior surface area of a lava droplet made up of a series of individual 1x1x1
@@ -117,7 +126,7 @@ def Day18_Part2(input_file: str='Inputs/Day18_Inputs.txt') -> int:
 
     """
     # Parse input file to get coordinates of every cube
-    filled_cubes = get_input()
+    filled_cubes = set(get_input(input_file))
 
     # Find the minimum and maximum bounds required to encompass the entire lava droplet with a
     # layer of air around the outside
@@ -127,25 +136,90 @@ def Day18_Part2(input_file: str='Inputs/Day18_Inputs.txt') -> int:
     # Use a breadth-first search to visit every cube of air around the outside of the droplet
     # Start at the minimum boundary corner of the cube
     start = (bounds_min, bounds_min, bounds_min)
-    # Initialise queue and list of visited cubes
-    queue, visited = [start], [start]
-    
     bounds = (bounds_min, bounds_max)
+    # Number each cube within the boundaries, so visited cubes can be stored in a flat array
+    side = bounds_max - bounds_min + 1
+    index = lambda cube: ((cube[0] - bounds_min)*side + cube[1] - bounds_min)*side + \
+                         cube[2] - bounds_min
+    # Only air cubes can be moved through
+    air_cubes = lambda cube: [c for c in next_cubes(cube, bounds) if c not in filled_cubes]
+
     exterior_faces = 0
+    with phase('search'):
+        for curr_cube, distance in search.bfs([start], air_cubes, index, side**3):
+            # For each of its neighbours, within the boundaries, if a neighbour is lava, add one
+            # to the number of exterior faces
+            exterior_faces += sum(c in filled_cubes for c in next_cubes(curr_cube, bounds))
+
+    return exterior_faces
+
+# Unit shifts to each of the six neighbours of a cube
+FACES = [(1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, -1, 0), (0, 0, 1), (0, 0, -1)]
+
+@memoized
+def Day18_solve(input_file: str='Inputs/Day18_Inputs.txt') -> tuple:
+    """
+    Calculates both the total surface area and the exterior surface area of a lava droplet made up
+    of a series of individual 1x1x1 cubes, parsing the input file and building the set of cubes
+    only once. Each face is found by looking up the six neighbours of every cube in the set, rather
+    than comparing every pair of cubes.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        The input file containing the cube coordinates.
+        The default is 'Inputs/Day18_Inputs.txt'.
+
+    Returns
+    -------
+    exposed_faces : int
+        The number of exposed (not connected to another cube) faces in the lava droplet.
+    exterior_faces : int
+        The exterior surface area of the lava droplet.
+
+    """
+    # Parse input file to get coordinates of every cube
+    filled_cubes = set(get_input(input_file))
+
+    # Count every face whose neighbouring cube is not part of the droplet
+    exposed_faces = sum((x + dx, y + dy, z + dz) not in filled_cubes \
+                        for x, y, z in filled_cubes for dx, dy, dz in FACES)
+
+    # Find the minimum and maximum bounds required to encompass the entire lava droplet with a
+    # layer of air around the outside
+    bounds_min = min(c[i] for c in filled_cubes for i in range(3)) - 1
+    bounds_max = max(c[i] for c in filled_cubes for i in range(3)) + 1
 
-    # While there are cubes still to visit
-    while queue:
-        # Take the item at the front of the queue
-        curr_cube = queue.pop(0)
+    # Use a breadth-first search to visit every cube of air around the outside of the droplet
+    start = (bounds_min, bounds_min, bounds_min)
+    side = bounds_max - bounds_min + 1
+    exterior_faces = 0
 
-        # For each of its neighbours, within the boundaries
-        for next_cube in next_cubes(curr_cube, bounds):
+    def air_cubes(cube):
+        nonlocal exterior_faces
+        x, y, z = cube
+        next_air = []
+        for dx, dy, dz in FACES:
+            next_cube = (x + dx, y + dy, z + dz)
+            # Skip cubes outside the boundaries
+            if not (bounds_min <= next_cube[0] <= bounds_max and \
+                    bounds_min <= next_cube[1] <= bounds_max and \
+                    bounds_min <= next_cube[2] <= bounds_max):
+                continue
             # If a neighbour is lava, add one to the number of exterior faces
             if next_cube in filled_cubes:
                 exterior_faces += 1
-            # Otherwise, add the new outer air cube to the queue and record as visited
-            elif next_cube not in visited:
-                visited.append(next_cube)
-                queue.append(next_cube)
-
-    return exterior_faces
+            # Otherwise, the outer air cube can be moved into
+            else:
+                next_air.append(next_cube)
+        return next_air
+
+    # Each cube within the boundaries is numbered, so visited cubes are stored in a flat array
+    index = lambda cube: ((cube[0] - bounds_min)*side + cube[1] - bounds_min)*side + \
+                         cube[2] - bounds_min
+    # Run the search to the end, counting exterior faces as the neighbours of each cube are found
+    with phase('search'):
+        for cube, distance in search.bfs([start], air_cubes, index, side**3):
+            pass
+
+    return exposed_faces, exterior_faces
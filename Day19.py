@@ -1,5 +1,8 @@
-import re
+from input_cache import cached_parser
+import ingest
+from memo import memoized
 
+@cached_parser
 def get_input(input_file: str='Inputs/Day19_TestInputs.txt') -> dict:
     """
     Parse an input file giving a set of blueprints detailling the resources required for building
@@ -7,7 +10,7 @@ def get_input(input_file: str='Inputs/Day19_TestInputs.txt') -> dict:
 
     Parameters
     ----------
-    input_file : str, optional
+    input_file : str, stream or iterable, optional
         Input file containing the blueprints.
         The default is 'Inputs/Day19_TestInputs.txt'.
 
@@ -19,13 +22,10 @@ def get_input(input_file: str='Inputs/Day19_TestInputs.txt') -> dict:
 
     """
     # Parse input file
-    with open(input_file) as f:
-        lines = f.readlines()
-
     blueprints = {}
-    for line in lines:
-        # Extract and format numbers
-        numbers = [int(i) for i in re.findall('\d+', line.strip())]
+    # Extract all of the numbers at once, with 7 for each blueprint (which might be split over
+    # several lines)
+    for numbers in ingest.read_ints(input_file).reshape(-1, 7).tolist():
         # Build blueprint dictionary
         blueprints[numbers[0]] = {'ore': {'ore': numbers[1], 'clay': 0, 'obsidian': 0, 'geode': 0},
                                   'clay': {'ore': numbers[2], 'clay': 0, 'obsidian': 0, 'geode': 0},
@@ -36,6 +36,10 @@ def get_input(input_file: str='Inputs/Day19_TestInputs.txt') -> dict:
 
 import math
 
+from profiling import hot
+import telemetry
+
+@hot
 def find_max_geodes(robot_costs: dict, robots: dict={'ore': 1, 'clay': 0, 'obsidian': 0, 'geode': 0},
                     remaining_minutes: int=24, resources: dict={'ore': 0, 'clay': 0, 'obsidian': 0},
                     curr_geodes: int=0, max_geodes: int=0, max_costs: dict=None) -> int:
@@ -85,6 +89,8 @@ def find_max_geodes(robot_costs: dict, robots: dict={'ore': 1, 'clay': 0, 'obsid
     # to avoid recalculating it repeatedly
     if not max_costs:
         max_costs = {resource: max(robot_costs[robot][resource] for robot in robots) for resource in resources}
+    # Count the state towards the progress of the search, along with the best total so far
+    telemetry.tick('states', best=max_geodes)
 
     # If we built one geode per minute from now until the end, would the final total exceed the
     # highest amount found so far? If not then no point continuing so stop here
@@ -163,6 +169,7 @@ def find_max_geodes(robot_costs: dict, robots: dict={'ore': 1, 'clay': 0, 'obsid
 
     return max_geodes
 
+@memoized
 def Day19_Part1(input_file: str='Inputs/Day19_Inputs.txt') -> int:
     """
     Find the sum of the quality levels of every blueprint given in an input file, where the
@@ -194,13 +201,14 @@ def Day19_Part1(input_file: str='Inputs/Day19_Inputs.txt') -> int:
 
     quality_level = 0
     # For each blueprint
-    for id_num, blueprint in blueprints.items():
+    for id_num, blueprint in telemetry.track(blueprints.items(), unit='blueprints'):
         # Use a recurive depth-first search to find the maximum possible number of geodes that be
         # collected using that blueprint, and calculate the corresponding quality level
         quality_level += id_num*find_max_geodes(blueprint)
     
     return quality_level
 
+@memoized
 def Day19_Part2(input_file: str='Inputs/Day19_Inputs.txt') -> int:
     """
     Find the product of the maximum possible numbers of geodes which can be produced in 32 minutes
@@ -232,9 +240,49 @@ def Day19_Part2(input_file: str='Inputs/Day19_Inputs.txt') -> int:
 
     geode_product = 1
     # For the first 3 blueprints
-    for blueprint in list(blueprints.values())[:3]:
+    for blueprint in telemetry.track(list(blueprints.values())[:3], unit='blueprints'):
         # Use a recurive depth-first search to find the maximum possible number of geodes that be
         # collected using that blueprint
         geode_product *= find_max_geodes(blueprint, remaining_minutes=32)
     
     return geode_product
+
+@memoized
+def Day19_solve(input_file: str='Inputs/Day19_Inputs.txt') -> tuple:
+    """
+    Find both the sum of the quality levels of every blueprint after 24 minutes and the product of
+    the maximum numbers of geodes for the first three blueprints after 32 minutes, parsing the input
+    file only once. Anything possible in 24 minutes is also possible in 32, so the 24 minute result
+    for each of the first three blueprints is used as a starting lower bound for its 32 minute
+    search, letting it discard hopeless branches from the start.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file containing the blueprints.
+        The default is 'Inputs/Day19_Inputs.txt'.
+
+    Returns
+    -------
+    quality_level : int
+        The sum of the quality levels of all blueprints given in the input file.
+    geode_product : int
+        The product of the maximum possible numbers of geodes which can be produced in 32 minutes
+        for the first 3 blueprints in the input file.
+
+    """
+    # Parse the input file and extract the blueprints
+    blueprints = get_input(input_file)
+
+    quality_level = 0
+    geode_product = 1
+    for n, (id_num, blueprint) in enumerate(telemetry.track(blueprints.items(),
+                                                            unit='blueprints')):
+        max_geodes = find_max_geodes(blueprint)
+        quality_level += id_num*max_geodes
+        # For the first 3 blueprints, only branches which beat the 24 minute total can be optimal
+        if n < 3:
+            geode_product *= find_max_geodes(blueprint, remaining_minutes=32,
+                                             max_geodes=max(max_geodes - 1, 0))
+
+    return quality_level, geode_product
@@ -1,3 +1,11 @@
+from lazy import lazy_import
+np = lazy_import('numpy')
+from input_cache import cached_parser
+import inputs
+from inputs import iter_lines
+from memo import memoized
+
+@cached_parser
 def get_rounds(input_file: str='Inputs/Day2_Inputs.txt') -> list:
     """
     Parse input file containing a strategy guide for each round of a Rock, Paper, Scissors
@@ -5,7 +13,7 @@ def get_rounds(input_file: str='Inputs/Day2_Inputs.txt') -> list:
 
     Parameters
     ----------
-    input_file : str, optional
+    input_file : str, stream or iterable, optional
         Input file giving the strategy guide contents.
         The default is 'Inputs/Day2_Inputs.txt'.
 
@@ -16,16 +24,29 @@ def get_rounds(input_file: str='Inputs/Day2_Inputs.txt') -> list:
 
     """
     # Parse input file
-    file = open(input_file)
     rounds = []
-    for line in file:
+    for line in iter_lines(input_file):
         line = line.strip().split()
         if len(line) > 0:
             rounds.append(line)
-    file.close()
 
     return rounds
 
+# X (1) -> beats C (6), draws with A (3), loses to B (0)
+# Y (2) -> beats A (6), draws with B (3), loses to C (0)
+# Z (3) -> beats B (6), draws with C (3), loses to A (0)
+PART1_SCORES = {'X': {'Score': 1, 'A': 3, 'B': 0, 'C': 6},
+                'Y': {'Score': 2, 'A': 6, 'B': 3, 'C': 0},
+                'Z': {'Score': 3, 'A': 0, 'B': 6, 'C': 3}}
+
+# X always loses (0) -> for A play Scissors (3), for B play Rock (1), for C play Paper (2)
+# Y always draws (3) -> for A play Rock (1), for B play Paper (2), for C play Scissors (3)
+# Z always wins (6) -> for A play Paper (2), for B play Scissors (3), for C play Rock (1)
+PART2_SCORES = {'X': {'Score': 0, 'A': 3, 'B': 1, 'C': 2},
+                'Y': {'Score': 3, 'A': 1, 'B': 2, 'C': 3},
+                'Z': {'Score': 6, 'A': 2, 'B': 3, 'C': 1}}
+
+@memoized
 def Day2_Part1(input_file: str='Inputs/Day2_Inputs.txt') -> int:
     """
     Calculates the total score for the player if they play a Rock, Paper, Scissors tournament
@@ -53,24 +74,10 @@ def Day2_Part1(input_file: str='Inputs/Day2_Inputs.txt') -> int:
         The total score for the player at the end of the tournament.
 
     """
-    # Parse input file
-    rounds = get_rounds(input_file)
-
-    # X (1) -> beats C (6), draws with A (3), loses to B (0)
-    # Y (2) -> beats A (6), draws with B (3), loses to C (0)
-    # Z (3) -> beats B (6), draws with C (3), loses to A (0)
-    scores = {'X': {'Score': 1, 'A': 3, 'B': 0, 'C': 6},
-              'Y': {'Score': 2, 'A': 6, 'B': 3, 'C': 0},
-              'Z': {'Score': 3, 'A': 0, 'B': 6, 'C': 3}}
-
-    score = 0
-    # Loop through rounds
-    for a, b in rounds:
-        # Add shape score and outcome score
-        score += scores[b]['Score'] + scores[b][a]
-
-    return score
+    # Count each of the nine kinds of round, then score each kind once
+    return score_counts(count_rounds(input_file), PART1_SCORES)
 
+@memoized
 def Day2_Part2(input_file: str='Inputs/Day2_Inputs.txt') -> int:
     """
     Calculates the total score for the player if they play a Rock, Paper, Scissors tournament
@@ -98,20 +105,245 @@ def Day2_Part2(input_file: str='Inputs/Day2_Inputs.txt') -> int:
         The total score for the player at the end of the tournament.
 
     """
-    # Parse input file
-    rounds = get_rounds(input_file)
-
-    # X always loses (0) -> for A play Scissors (3), for B play Rock (1), for C play Paper (2)
-    # Y always draws (3) -> for A play Rock (1), for B play Paper (2), for C play Scissors (3)
-    # Z always wins (6) -> for A play Paper (2), for B play Scissors (3), for C play Rock (1)
-    scores = {'X': {'Score': 0, 'A': 3, 'B': 1, 'C': 2},
-              'Y': {'Score': 3, 'A': 1, 'B': 2, 'C': 3},
-              'Z': {'Score': 6, 'A': 2, 'B': 3, 'C': 1}}
-
-    score = 0
-    # Loop through rounds
-    for a, b in rounds:
-        # Add outcome score and shape score
-        score += scores[b]['Score'] + scores[b][a]
-
-    return score
+    # Count each of the nine kinds of round, then score each kind once
+    return score_counts(count_rounds(input_file), PART2_SCORES)
+
+def iter_rounds(input_file: str='Inputs/Day2_Inputs.txt'):
+    """
+    Generate the rounds of the strategy guide given in an input file one at a time, reading the
+    file in large pieces (see inputs.iter_chunks) rather than line by line, so that the guide can
+    be larger than the available memory.
+
+    Parameters
+    ----------
+    input_file : str, stream or iterable, optional
+        Input file giving the strategy guide contents.
+        The default is 'Inputs/Day2_Inputs.txt'.
+
+    Yields
+    ------
+    round : tuple(str)
+        The opponent's shape and the second column of each round.
+
+    """
+    for chunk in inputs.iter_chunks(input_file):
+        # Every round is two letters, so the letters of the piece can simply be paired up
+        letters = bytes(chunk).decode().split()
+        yield from zip(letters[0::2], letters[1::2])
+
+@memoized
+def Day2_solve(input_file: str='Inputs/Day2_Inputs.txt') -> tuple:
+    """
+    Calculates the total score for the player under both readings of the strategy guide given in
+    an input file, where the second column is either the shape to play (Part 1) or the outcome
+    required (Part 2), parsing the input file only once. The rounds are counted as the file is
+    read, so only one piece of it is held in memory at a time.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file giving the strategy guide contents.
+        The default is 'Inputs/Day2_Inputs.txt'.
+
+    Returns
+    -------
+    shape_score : int
+        The total score if the second column is the shape to play.
+    outcome_score : int
+        The total score if the second column is the outcome required.
+
+    """
+    # There are only nine different rounds, so count them as the file is read and score each kind
+    # once
+    counts = count_rounds(input_file)
+
+    return score_counts(counts, PART1_SCORES), score_counts(counts, PART2_SCORES)
+
+def score_table(scores) -> 'np.ndarray':
+    """
+    Convert a strategy into a table of the score of each kind of round.
+
+    Parameters
+    ----------
+    scores : dict or array_like
+        The strategy, either a dictionary in the same form as PART1_SCORES and PART2_SCORES, or
+        the table itself as a 3x3 array of the score of each round, indexed by the opponent's shape
+        (A, B, C) then the second column (X, Y, Z).
+
+    Raises
+    ------
+    ValueError
+        If the table isn't 3x3.
+
+    Returns
+    -------
+    table : numpy.ndarray(int64)
+        The 3x3 table of scores.
+
+    """
+    if isinstance(scores, dict):
+        return np.array([[scores[b]['Score'] + scores[b][a] for b in 'XYZ'] for a in 'ABC'],
+                        dtype=np.int64)
+
+    table = np.asarray(scores, dtype=np.int64)
+    if table.shape != (3, 3):
+        raise ValueError(f'Strategy table must be 3x3, not {table.shape}')
+
+    return table
+
+def _count_piece(piece) -> 'np.ndarray':
+    """
+    Count the nine kinds of round in a piece of a strategy guide, returning the nine counts in
+    the order AX, AY, AZ, BX, ... CZ.
+    """
+    data = np.frombuffer(piece, dtype=np.uint8)
+    # The pieces from iter_chunks lose their last newline, so a piece of n fixed width lines
+    # ("A X\n") is 4n - 1 bytes long with a newline every fourth byte
+    if (len(data) + 1) % 4 == 0 and (data[3::4] == ord('\n')).all() and \
+            (data[1::4] == ord(' ')).all():
+        opponent, column = data[0::4], data[2::4]
+    else:
+        # Otherwise (Windows line endings, blank lines, stray spaces...) pair up everything which
+        # isn't whitespace
+        letters = data[data > ord(' ')]
+        opponent, column = letters[0::2], letters[1::2]
+        if len(opponent) != len(column):
+            raise ValueError('Every round of the strategy guide needs two letters')
+
+    # Position of each letter in ABC or XYZ, where anything before the first letter wraps around
+    # to well past 2 in uint8
+    opponent = opponent - ord('A')
+    column = column - ord('X')
+    if len(opponent) and (opponent.max() > 2 or column.max() > 2):
+        raise ValueError('Unexpected letter in the strategy guide')
+
+    # Index of each round in the flattened 3x3 table, kept to one byte per round
+    return np.bincount(opponent*3 + column, minlength=9)
+
+def count_rounds(input_file: str='Inputs/Day2_Inputs.txt') -> 'np.ndarray':
+    """
+    Count how many times each of the nine kinds of round appears in the strategy guide given in an
+    input file, in a single vectorised pass over the raw bytes. The file is read in large pieces
+    (see inputs.iter_chunks), so the guide can be larger than the available memory, and the time
+    taken is limited by reading the bytes rather than by the interpreter.
+
+    Parameters
+    ----------
+    input_file : str, stream or iterable, optional
+        Input file giving the strategy guide contents.
+        The default is 'Inputs/Day2_Inputs.txt'.
+
+    Returns
+    -------
+    counts : numpy.ndarray(int64)
+        3x3 array of the number of rounds of each kind, indexed by the opponent's shape (A, B, C)
+        then the second column (X, Y, Z).
+
+    """
+    counts = np.zeros(9, dtype=np.int64)
+    for piece in inputs.iter_chunks(input_file):
+        counts += _count_piece(piece)
+
+    return counts.reshape(3, 3)
+
+def score_counts(counts, scores) -> int:
+    """
+    Calculate the total score of a tournament from the number of rounds of each kind, as the dot
+    product of the counts with the table of the score of each kind.
+
+    Parameters
+    ----------
+    counts : array_like
+        3x3 array of the number of rounds of each kind, as returned by count_rounds.
+    scores : dict or array_like
+        The strategy, in any form accepted by score_table, e.g. PART1_SCORES.
+
+    Returns
+    -------
+    score : int
+        The total score for the player at the end of the tournament.
+
+    """
+    return int(np.dot(np.ravel(counts), score_table(scores).ravel()))
+
+def Day2_score(input_file: str='Inputs/Day2_Inputs.txt', scores=PART1_SCORES) -> int:
+    """
+    Calculates the total score for the player if they play a Rock, Paper, Scissors tournament
+    following any strategy, given as the score of each kind of round.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file giving the strategy guide contents.
+        The default is 'Inputs/Day2_Inputs.txt'.
+    scores : dict or array_like, optional
+        The strategy, in any form accepted by score_table.
+        The default is PART1_SCORES.
+
+    Returns
+    -------
+    score : int
+        The total score for the player at the end of the tournament.
+
+    """
+    return score_counts(count_rounds(input_file), scores)
+
+def score_tables(strategies) -> 'np.ndarray':
+    """
+    Stack any number of strategies into an array of their tables of scores.
+
+    Parameters
+    ----------
+    strategies : array_like or list
+        Either an (N, 3, 3) array of tables, or a list of strategies in any form accepted by
+        score_table (which can be mixed).
+
+    Raises
+    ------
+    ValueError
+        If any of the tables isn't 3x3.
+
+    Returns
+    -------
+    tables : numpy.ndarray(int64)
+        (N, 3, 3) array of the table of each strategy, in order.
+
+    """
+    if isinstance(strategies, np.ndarray):
+        tables = strategies.astype(np.int64, copy=False)
+        if tables.ndim != 3 or tables.shape[1:] != (3, 3):
+            raise ValueError(f'Strategy tables must be Nx3x3, not {tables.shape}')
+        return tables
+
+    return np.array([score_table(s) for s in strategies], dtype=np.int64).reshape(-1, 3, 3)
+
+def score_strategies(input_file: str='Inputs/Day2_Inputs.txt', strategies=None) -> 'np.ndarray':
+    """
+    Calculates the total score for the player under each of any number of strategies for the
+    strategy guide given in an input file, reading the file only once. The rounds are counted
+    first (see count_rounds), then every strategy is scored at once as a single matrix product of
+    the (N, 9) tables with the 9 counts, so scoring 10,000 strategies costs little more than
+    scoring one.
+
+    Parameters
+    ----------
+    input_file : str, stream or iterable, optional
+        Input file giving the strategy guide contents.
+        The default is 'Inputs/Day2_Inputs.txt'.
+    strategies : array_like, list or NoneType, optional
+        The strategies, in any form accepted by score_tables, if None then
+        [PART1_SCORES, PART2_SCORES].
+        The default is None.
+
+    Returns
+    -------
+    scores : numpy.ndarray(int64)
+        The total score under each strategy, in order.
+
+    """
+    if strategies is None:
+        strategies = [PART1_SCORES, PART2_SCORES]
+    tables = score_tables(strategies)
+    counts = count_rounds(input_file)
+
+    return tables.reshape(-1, 9) @ counts.ravel()
@@ -1,10 +1,15 @@
+from input_cache import cached_parser
+import ingest
+from memo import memoized
+
+@cached_parser
 def get_input(input_file: str='Inputs/Day20_Inputs.txt', key: int=1) -> list:
     """
     Parse an input file to extract a list of numbers, and multiply each number by a given key.
 
     Parameters
     ----------
-    input_file : str, optional
+    input_file : str, stream or iterable, optional
         Input file containing the numbers.
         The default is 'Inputs/Day20_Inputs.txt'.
     key : int, optional
@@ -18,9 +23,9 @@ def get_input(input_file: str='Inputs/Day20_Inputs.txt', key: int=1) -> list:
 
     """
     # Parse input file
-    with open(input_file) as f:
-        # Convert each value to int and multiply by key
-        values = [int(line.strip())*key for line in f.readlines()]
+    # Convert all of the values to ints at once, then multiply by key as Python ints, which
+    # can't overflow like int64
+    values = [value*key for value in ingest.read_ints(input_file).tolist()]
 
     return values
 
@@ -68,6 +73,7 @@ def mixing(values: list, rounds: int=1) -> list:
 
     return new_values
 
+@memoized
 def Day20_Part1(input_file: str='Inputs/Day20_Inputs.txt') -> int:
     """
     Find the sum of the grove coordinates extracted from a list of values, after it has been
@@ -106,6 +112,7 @@ def Day20_Part1(input_file: str='Inputs/Day20_Inputs.txt') -> int:
 
     return number_sum
 
+@memoized
 def Day20_Part2(input_file: str='Inputs/Day20_Inputs.txt', key: int=811589153) -> int:
     """
     Find the sum of the grove coordinates extracted from a list of values, after it has been
@@ -146,3 +153,38 @@ def Day20_Part2(input_file: str='Inputs/Day20_Inputs.txt', key: int=811589153) -
     number_sum = sum(values[(zero_index + add)%len(values)] for add in [1000, 2000, 3000])
     
     return number_sum
+
+@memoized
+def Day20_solve(input_file: str='Inputs/Day20_Inputs.txt', key: int=811589153) -> tuple:
+    """
+    Find the sum of the grove coordinates both after one round of mixing and after multiplying
+    every value by the decryption key and applying ten rounds of mixing, parsing the input file
+    only once.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file giving the encrypted list of values.
+        The default is 'Inputs/Day20_Inputs.txt'.
+    key : int, optional
+        The decryption key by which to multiply every number for Part 2.
+        The default is 811589153.
+
+    Returns
+    -------
+    number_sum : int
+        The sum of the grove coordinates after one round of mixing.
+    decrypted_number_sum : int
+        The sum of the grove coordinates after applying the key and ten rounds of mixing.
+
+    """
+    # Parse input file to extract values
+    values = get_input(input_file)
+
+    sums = []
+    for mixed in (mixing(values), mixing([value*key for value in values], 10)):
+        # Find current position of the value 0 and sum the corresponding grove coordinates
+        zero_index = mixed.index(0)
+        sums.append(sum(mixed[(zero_index + add)%len(mixed)] for add in [1000, 2000, 3000]))
+
+    return tuple(sums)
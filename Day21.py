@@ -1,3 +1,8 @@
+from input_cache import cached_parser
+from inputs import iter_lines
+from memo import memoized
+
+@cached_parser
 def get_input(input_file: str='Inputs/Day21_Inputs.txt') -> list:
     """
     Parse an input file containing a list of monkeys and expressions describing the number each one
@@ -5,7 +10,7 @@ def get_input(input_file: str='Inputs/Day21_Inputs.txt') -> list:
 
     Parameters
     ----------
-    input_file : str, optional
+    input_file : str, stream or iterable, optional
         The input file containing the monkeys and expressions.
         The default is 'Inputs/Day21_Inputs.txt'.
 
@@ -16,12 +21,12 @@ def get_input(input_file: str='Inputs/Day21_Inputs.txt') -> list:
 
     """
     # Parse input file
-    with open(input_file) as f:
-        # Split equations into a dictionary
-         equations = {line.strip().split(': ')[0]: line.strip().split(': ')[1] for line in f.readlines()}
+    # Split equations into a dictionary
+    equations = dict(line.strip().split(': ') for line in iter_lines(input_file))
 
     return equations
 
+@memoized
 def Day21_Part1(input_file: str='Inputs/Day21_Inputs.txt') -> int:
     """
     Find the number that the monkey named 'root' will yell, given a list of all monkeys and
@@ -69,11 +74,13 @@ def Day21_Part1(input_file: str='Inputs/Day21_Inputs.txt') -> int:
 
     return root
 
-import sympy as sp
-from sympy.parsing.sympy_parser import parse_expr
-from sympy.interactive import printing
-printing.init_printing(use_latex=(False))
+from lazy import lazy_import
+# sympy takes longer to import than the whole of Part 1 takes to run, so only import it (and set
+# up its printing) once Part 2 needs it
+sp = lazy_import('sympy', on_load=lambda sympy: sympy.init_printing(use_latex=(False)))
+sympy_parser = lazy_import('sympy.parsing.sympy_parser')
 
+@memoized
 def Day21_Part2(input_file: str='Inputs/Day21_Inputs.txt') -> int:
     """
     Find the number that you (named 'humn') must yell, such that the expression for the monkey
@@ -95,7 +102,7 @@ def Day21_Part2(input_file: str='Inputs/Day21_Inputs.txt') -> int:
 
     """
     # Parse input file to extract the monkeys and expressions
-    equations = get_input()
+    equations = get_input(input_file)
     
     # Determine which equations are solved (already have a number) and which are still unknown
     # expressions
@@ -136,10 +143,10 @@ def Day21_Part2(input_file: str='Inputs/Day21_Inputs.txt') -> int:
         # For the 'root' expression, replace the operation for '-' so this should evaluate to
         # 0 when LHS == RHS
         if variable == 'root':
-            simultaneous_equations.append(parse_expr(equation.split()[0] + ' - ' + equation.split()[2]))
+            simultaneous_equations.append(sympy_parser.parse_expr(equation.split()[0] + ' - ' + equation.split()[2]))
         # For all other expressions, change from var = expr to var - expr so it evaluates to 0
         else:
-            simultaneous_equations.append(parse_expr(variable + ' - (' + equation + ')'))
+            simultaneous_equations.append(sympy_parser.parse_expr(variable + ' - (' + equation + ')'))
 
     # Solve the set of equations
     solution = sp.solve(simultaneous_equations)
@@ -148,3 +155,125 @@ def Day21_Part2(input_file: str='Inputs/Day21_Inputs.txt') -> int:
     humn = solution[sp.symbols('humn')]
 
     return humn
+
+import operator
+from fractions import Fraction
+
+# Function for each operation in the monkeys' expressions, with division rounded towards zero
+# like int(a/b), but without any floating point error for large numbers
+OPERATIONS = {'+': operator.add, '-': operator.sub, '*': operator.mul,
+              '/': lambda a, b: int(Fraction(a, b))}
+
+def yell(monkey: str, equations: dict, values: dict):
+    """
+    Recursively find the number yelled by a monkey, storing the number yelled by every monkey
+    found along the way so that each is only worked out once.
+
+    Parameters
+    ----------
+    monkey : str
+        The name of the monkey.
+    equations : dict(str, str)
+        Dictionary containing the expressions for each monkey in the form {monkey_name: expression}.
+    values : dict(str, int)
+        Dictionary of the numbers yelled by each monkey found so far, which is added to.
+
+    Returns
+    -------
+    value : int
+        The number yelled by the monkey.
+
+    """
+    if monkey not in values:
+        equation = equations[monkey].split()
+        if len(equation) == 1:
+            values[monkey] = int(equation[0])
+        else:
+            values[monkey] = OPERATIONS[equation[1]](yell(equation[0], equations, values),
+                                                     yell(equation[2], equations, values))
+
+    return values[monkey]
+
+def depends_on(monkey: str, target: str, equations: dict, dependents: dict) -> bool:
+    """
+    Recursively find whether the number yelled by a monkey depends on the number yelled by a
+    target monkey, storing the result for every monkey found along the way.
+
+    Parameters
+    ----------
+    monkey : str
+        The name of the monkey.
+    target : str
+        The name of the target monkey.
+    equations : dict(str, str)
+        Dictionary containing the expressions for each monkey in the form {monkey_name: expression}.
+    dependents : dict(str, bool)
+        Dictionary of the results found so far, which is added to.
+
+    Returns
+    -------
+    depends : bool
+        Whether the number yelled by the monkey depends on the target monkey.
+
+    """
+    if monkey not in dependents:
+        equation = equations[monkey].split()
+        dependents[monkey] = monkey == target or (len(equation) == 3 and \
+            (depends_on(equation[0], target, equations, dependents) or \
+             depends_on(equation[2], target, equations, dependents)))
+
+    return dependents[monkey]
+
+@memoized
+def Day21_solve(input_file: str='Inputs/Day21_Inputs.txt') -> tuple:
+    """
+    Find both the number that the monkey named 'root' will yell and the number that you (named
+    'humn') must yell for the two sides of the 'root' expression to be equal, parsing the input
+    file only once. The numbers yelled by every monkey which does not depend on 'humn' are shared
+    between both parts, and rather than solving the equations symbolically, the single chain of
+    expressions from 'root' down to 'humn' is undone one operation at a time, using exact fractions.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file containing the monkeys and expressions.
+        The default is 'Inputs/Day21_Inputs.txt'.
+
+    Returns
+    -------
+    root : int
+        The number which will eventually be yelled by the monkey named root.
+    humn : int or Fraction
+        The number which you must yell for 'root' to be True, only a fraction if there is no
+        whole number which works.
+
+    """
+    # Parse input file to extract the monkeys and expressions
+    equations = get_input(input_file)
+
+    values = {}
+    root = yell('root', equations, values)
+
+    dependents = {}
+    left, _, right = equations['root'].split()
+    # The side of the root expression which does not depend on humn gives the target value
+    if depends_on(left, 'humn', equations, dependents):
+        monkey, target = left, values[right]
+    else:
+        monkey, target = right, values[left]
+
+    # Work down the chain of monkeys to humn, undoing each operation to find the number required
+    while monkey != 'humn':
+        a, operation, b = equations[monkey].split()
+        if depends_on(a, 'humn', equations, dependents):
+            # Unknown on the left: a (op) b = target
+            monkey, other = a, values[b]
+            target = {'+': lambda: target - other, '-': lambda: target + other,
+                      '*': lambda: Fraction(target, other), '/': lambda: target*other}[operation]()
+        else:
+            # Unknown on the right: a (op) b = target
+            monkey, other = b, values[a]
+            target = {'+': lambda: target - other, '-': lambda: other - target,
+                      '*': lambda: Fraction(target, other), '/': lambda: Fraction(other, target)}[operation]()
+
+    return root, int(target) if target.denominator == 1 else target
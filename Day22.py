@@ -1,5 +1,10 @@
 import re
+from input_cache import cached_parser
+from inputs import iter_lines
+from memo import memoized
+import search
 
+@cached_parser
 def get_input(input_file: str='Inputs/Day22_Inputs.txt') -> list:
     """
     Parse an input file giving the layout of a board of paths and walls, and a path to take through
@@ -7,7 +12,7 @@ def get_input(input_file: str='Inputs/Day22_Inputs.txt') -> list:
 
     Parameters
     ----------
-    input_file : str, optional
+    input_file : str, stream or iterable, optional
         Input file giving the board layout and path.
         The default is 'Inputs/Day22_Inputs.txt'.
 
@@ -24,23 +29,24 @@ def get_input(input_file: str='Inputs/Day22_Inputs.txt') -> list:
 
     """
     # Parse input file
-    with open(input_file) as f:
-         lines = f.readlines()
-
-    # Extract the board
-    raw_board = [line.strip('\n') for line in lines[:-2]]
+    lines = iter_lines(input_file)
+
+    # Extract the board, which ends at the first blank line
+    raw_board = []
+    for line in lines:
+        if not line.strip():
+            break
+        raw_board.append(line)
     max_len = max(len(r) for r in raw_board)
     # Format the rows and columns
     board_rows = [line + ' '*(max_len - len(line)) for line in raw_board]
     board_cols = [''.join(r[c] for r in board_rows) for c in range(len(board_rows[0]))]
 
     # Extract and format the path
-    path = re.findall('\d+|[A-Z]', lines[-1].strip())
+    path = re.findall('\d+|[A-Z]', ''.join(line.strip() for line in lines))
 
     return board_rows, board_cols, path
 
-import numpy as np
-
 def move(pos: tuple, facing: int, move: int, board: tuple) -> tuple:
     """
     Move a given number of places across a board from a given starting position in a given
@@ -70,14 +76,10 @@ def move(pos: tuple, facing: int, move: int, board: tuple) -> tuple:
     if facing in [0, 2]:
         curr_row = board_rows[pos[0]]
         # Find the start and end positions of the current row (between the whitespace)
-        try:
-            row_start = np.where(np.array(list(curr_row[:max(1, pos[1])])) == ' ')[0][-1]+1
-        except IndexError:
-            row_start = 0
-        try:
-            row_end = pos[1] + np.where(np.array(list(curr_row[pos[1]:])) == ' ')[0][0] - 1
-        except IndexError:
-            row_end = len(curr_row) - 1
+        # (rfind gives -1 if there is no whitespace before, so the row starts at 0)
+        row_start = curr_row.rfind(' ', 0, max(1, pos[1])) + 1
+        row_end = curr_row.find(' ', pos[1])
+        row_end = (row_end if row_end != -1 else len(curr_row)) - 1
         # Find the length of the row
         row_len = row_end - row_start + 1
         # Right movement
@@ -126,14 +128,9 @@ def move(pos: tuple, facing: int, move: int, board: tuple) -> tuple:
     # Vertical movement - same logic as above but with columns instead of rows
     else:
         curr_col = board_cols[pos[1]]
-        try:
-            col_start = np.where(np.array(list(curr_col[:max(1, pos[0])])) == ' ')[0][-1]+1
-        except IndexError:
-            col_start = 0
-        try:
-            col_end = pos[0] + np.where(np.array(list(curr_col[pos[0]:])) == ' ')[0][0] - 1
-        except IndexError:
-            col_end = len(curr_col) - 1
+        col_start = curr_col.rfind(' ', 0, max(1, pos[0])) + 1
+        col_end = curr_col.find(' ', pos[0])
+        col_end = (col_end if col_end != -1 else len(curr_col)) - 1
         col_len = col_end - col_start + 1
         if facing == 1:
             if pos[0] + move <= col_end:
@@ -229,6 +226,7 @@ class TestMove(unittest.TestCase):
         self.assertEqual(move((1, 3), 3, 10, board), (0, 3))
         self.assertEqual(move((0, 3), 3, 10, board), (0, 3))
 
+@memoized
 def Day22_Part1(input_file: str='Inputs/Day22_Inputs.txt') -> int:
     """
     Find the password given as the sum of 1000 times the row, 4 times the column, and the facing of
@@ -352,13 +350,9 @@ def buildCube(board: tuple) -> tuple:
     # Initialise found_faces dictionary with first face
     found_faces = {first_face_corner: Face((-1, 0, 0), 0)}
 
-    # Create queue of faces to check
-    queue = [first_face_corner]
-
-    # Perform BFS search through the board to find each cube face
-    while queue:
-        curr_face_corner = queue.pop(0)
+    def next_face_corners(curr_face_corner):
         curr_face = found_faces[curr_face_corner]
+        new_face_corners = []
         # For each face, check in each direction
         for rot, (dx, dy) in enumerate(DIRECTIONS):
             next_face_corner = (curr_face_corner[0] + dx, curr_face_corner[1] + dy)
@@ -386,7 +380,12 @@ def buildCube(board: tuple) -> tuple:
             # Construct the new face with the extra rotation and add to found_faces
             found_faces[next_face_corner] = Face(connected_template_edge.normal, extra_rotation)
             # Continue BFS
-            queue.append(next_face_corner)
+            new_face_corners.append(next_face_corner)
+        return new_face_corners
+
+    # Perform BFS search through the board to find each cube face
+    for curr_face_corner, distance in search.bfs([first_face_corner], next_face_corners):
+        pass
 
     # Build dict of corners from normals
     found_face_corners = {face.normal: corner for corner, face in found_faces.items()}
@@ -533,6 +532,7 @@ class TestMoveOnCube(unittest.TestCase):
         self.assertEqual(move_on_cube((11, 10), 1, board, cube_side_length, found_faces,
                                       found_face_corners), ((7, 1), 3))
 
+@memoized
 def Day22_Part2(input_file: str='Inputs/Day22_Inputs.txt') -> int:
     """
     Find the password given as the sum of 1000 times the row, 4 times the column, and the facing of
@@ -593,3 +593,55 @@ def Day22_Part2(input_file: str='Inputs/Day22_Inputs.txt') -> int:
     # Calculate the final password
     password = 1000 * (pos[0] + 1) + 4 * (pos[1] + 1) + facing
     return password
+
+@memoized
+def Day22_solve(input_file: str='Inputs/Day22_Inputs.txt') -> tuple:
+    """
+    Find the passwords from the final positions after following the path both on the flat board,
+    wrapping around to the other side of the board, and on the cube folded from the board, parsing
+    the input file only once and following the path for both in a single pass.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file giving the board layout and movement instructions.
+        The default is 'Inputs/Day22_Inputs.txt'.
+
+    Returns
+    -------
+    board_password : int
+        The password generated from your final position on the flat board.
+    cube_password : int
+        The password generated from your final position on the cube.
+
+    """
+    # Parse input file to get board layout and path instructions
+    board_rows, board_cols, path = get_input(input_file)
+    board = (board_rows, board_cols)
+
+    # Construct the corresponding cube and find the connections between each face
+    found_faces, found_face_corners, cube_side_length = buildCube(board)
+
+    # Both start from the same position and facing
+    board_pos = cube_pos = (0, board_rows[0].index('.'))
+    board_facing = cube_facing = 0
+
+    # For each instruction
+    for instruction in path:
+        # If it is a turn, change both facings accordingly
+        if instruction.isalpha():
+            turn = 1 if instruction == 'R' else -1 if instruction == 'L' else 0
+            board_facing = (board_facing + turn)%4
+            cube_facing = (cube_facing + turn)%4
+
+        # Else execute the corresponding move on both
+        else:
+            board_pos = move(board_pos, board_facing, int(instruction), board)
+            for i in range(int(instruction)):
+                cube_pos, cube_facing = move_on_cube(cube_pos, cube_facing, board,
+                                                     cube_side_length, found_faces,
+                                                     found_face_corners)
+
+    # Calculate the final passwords
+    return int(1000 * (board_pos[0] + 1) + 4 * (board_pos[1] + 1) + board_facing), \
+           1000 * (cube_pos[0] + 1) + 4 * (cube_pos[1] + 1) + cube_facing
@@ -1,3 +1,9 @@
+from input_cache import cached_parser
+from inputs import iter_lines
+from memo import memoized
+from grid import Grid
+
+@cached_parser
 def get_input(input_file: str='Inputs/Day23_Inputs.txt') -> list:
     """
     Parse an input file giving the layout of a grove, with the positions of each of a group of
@@ -5,7 +11,7 @@ def get_input(input_file: str='Inputs/Day23_Inputs.txt') -> list:
 
     Parameters
     ----------
-    input_file : str, optional
+    input_file : str, stream or iterable, optional
         The input file giving the grove layout.
         The default is 'Inputs/Day23_Inputs.txt'.
 
@@ -17,24 +23,16 @@ def get_input(input_file: str='Inputs/Day23_Inputs.txt') -> list:
 
     """
     # Parse input file
-    with open(input_file) as f:
-         rows = [row.strip() for row in f.readlines()]
-
     curr_pos = []
-    start_in_col = 0
-    i = 0
     # For every row
-    while i < len(rows):
-        try:
-            # Find the next elf along in that row
+    for i, row in enumerate(iter_lines(input_file)):
+        row = row.strip()
+        # Find each elf along that row in turn
+        j = row.find('#')
+        while j != -1:
             # Shift all coordinates by (1000, 1000) to make room for grid growth
-            curr_pos.append((i + 1000, rows[i].index('#', start_in_col) + 1000))
-            # Set the point in that row to search from next
-            start_in_col = curr_pos[-1][1] - 1000 + 1
-        except:
-            # If no elves left in current row, move to the next
-            start_in_col = 0
-            i += 1
+            curr_pos.append((i + 1000, j + 1000))
+            j = row.find('#', j + 1)
 
     return curr_pos
 
@@ -63,36 +61,48 @@ def draw_rows(curr_pos: list) -> None:
         print(''.join(['#' if (i, j) in curr_pos else '.' for j in range(row_min-1, row_max+2)]))
     print('\n')
 
-import operator
+from collections import defaultdict
 
-def add(t1: tuple, t2: tuple) -> tuple:
+# List of all eight directions
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]
+# List of sets of three proposed directions, indexed as 0 = 'N', 1 = 'S', 2 = 'W', 3 = 'E'
+PROP_DIRECTIONS = [[(-1, 0), (-1, 1), (-1, -1)], [(1, 0), (1, 1,), (1, -1)],
+                   [(0, -1), (-1, -1), (1, -1)], [(0, 1), (-1, 1), (1, 1)]]
+
+def build_grove(curr_pos: list) -> tuple:
     """
-    Add two tuples together element-wise.
+    Place the elves on a grid of the grove, with an empty border around them big enough for a
+    few rounds of spreading out before the grid has to grow.
 
     Parameters
     ----------
-    t1 : tuple(int)
-        First tuple of numbers.
-    t2 : tuple(int)
-        Second equal-length tuple of numbers.
+    curr_pos : list(int, int)
+        The (x, y) coordinates of each elf.
 
     Returns
     -------
-    t : tuple
-        New tuple with sum of elements of t1 and t2.
+    grove : Grid
+        Grid of the grove, where 1 marks an elf and 0 an empty spot.
+    elves : list(int)
+        The flat index of each elf in the grid.
 
     """
-    return tuple(map(operator.add, t1, t2))
-
-from collections import defaultdict
-
-# List of all eight directions
-DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]
-# List of sets of three proposed directions, indexed as 0 = 'N', 1 = 'S', 2 = 'W', 3 = 'E'
-PROP_DIRECTIONS = [[(-1, 0), (-1, 1), (-1, -1)], [(1, 0), (1, 1,), (1, -1)],
-                   [(0, -1), (-1, -1), (1, -1)], [(0, 1), (-1, 1), (1, 1)]]
-
-def one_round(curr_pos: list, first_dir_index: int) -> tuple:
+    x_min, x_max = min(p[0] for p in curr_pos), max(p[0] for p in curr_pos)
+    y_min, y_max = min(p[1] for p in curr_pos), max(p[1] for p in curr_pos)
+    margin = max(x_max - x_min, y_max - y_min)//2 + 2
+    grove = Grid(x_max - x_min + 1 + 2*margin, y_max - y_min + 1 + 2*margin, 0,
+                 x0=x_min - margin, y0=y_min - margin)
+    elves = [grove.index(*elf) for elf in curr_pos]
+    for elf in elves:
+        grove.data[elf] = 1
+
+    return grove, elves
+
+from profiling import hot
+import telemetry
+
+@hot
+def one_round(grove: Grid, elves: list, first_dir_index: int) -> tuple:
     """
     Processes one round of movement for all elves in a 2D grid, given their starting positions and
     the index of the first proposal which should be made this round.
@@ -125,49 +135,93 @@ def one_round(curr_pos: list, first_dir_index: int) -> tuple:
 
     Parameters
     ----------
-    curr_pos : list(int, int)
-        The (x, y) coordinates of each elf relative to the top left corner of the grid being
-        (1000, 1000).
+    grove : Grid
+        Grid of the grove, where 1 marks an elf and 0 an empty spot.
+    elves : list(int)
+        The flat index of each elf in the grid.
     first_dir_index : int
         The index of the proposal to be made first this round.
 
     Returns
     -------
-    curr_pos : list(int, int)
-        The new coordinates of each elf after the round.
+    grove : Grid
+        The grid after the round, which is a new, larger grid if an elf reached the edge.
+    elves : list(int)
+        The new flat index of each elf after the round.
     changed : bool
         Whether any elf positions changed this round.
 
     """
-    # Use defaultdict with lists to store coordinates of elves which want to move to a given spot
+    cells = grove.data
+    # Steps between flat indices for each direction
+    neighbours = grove.offsets(DIRECTIONS)
+    prop_neighbours = [grove.offsets(directions) for directions in PROP_DIRECTIONS]
+    # Use defaultdict with lists to store indices of elves which want to move to a given spot
     moving = defaultdict(list)
-    # Create set of current elf positions for faster searching
-    curr_pos_set = set(curr_pos)
     # Set order of proposals for this round
     proposals = [(first_dir_index + i)%4 for i in range(4)]
     # For each elf
-    for n, elf in enumerate(curr_pos):
-        # Only consider moving if there are no adjacent elves
-        if any(add(elf, direc) in curr_pos_set for direc in DIRECTIONS):
+    for n, elf in enumerate(elves):
+        # Only consider moving if there are adjacent elves
+        if any(cells[elf + step] for step in neighbours):
             # For each proposal, in the current order
             for proposal in proposals:
                 # If the three corresponding positions are free, propose to move into that spot
                 # and move onto the next elf
-                if not any(add(elf, direc) in curr_pos_set for direc in PROP_DIRECTIONS[proposal]):
-                    moving[add(elf, DIRECTIONS[proposal])].append(n)
+                if not any(cells[elf + step] for step in prop_neighbours[proposal]):
+                    moving[elf + neighbours[proposal]].append(n)
                     break
 
     # For each new proposed position, if only one elf proposed moving there, perform the movement,
     # else ignore it
+    at_edge = False
     for new, prev in moving.items():
         if len(prev) == 1:
-            curr_pos[prev[0]] = new
+            cells[elves[prev[0]]], cells[new] = 0, 1
+            elves[prev[0]] = new
+            # Check whether the elf is now on the border, where it can't see all its neighbours
+            y, x = divmod(new, grove.width)
+            at_edge = at_edge or x in (0, grove.width - 1) or y in (0, grove.height - 1)
+
+    # If any elf reached the edge of the grid, start again with a bigger one
+    if at_edge:
+        grove, elves = build_grove([grove.point(elf) for elf in elves])
 
     # If moving is not empty, the grid has changed
     changed = len(moving) > 0
 
-    return curr_pos, changed
+    return grove, elves, changed
+
+def empty_ground(grove: Grid, elves: list) -> int:
+    """
+    Finds the number of empty spaces in the smallest rectangle containing every elf.
 
+    Parameters
+    ----------
+    grove : Grid
+        Grid of the grove, where 1 marks an elf and 0 an empty spot.
+    elves : list(int)
+        The flat index of each elf in the grid.
+
+    Returns
+    -------
+    empty_squares : int
+        The number of empty spaces in the smallest rectangle containing every elf.
+
+    """
+    curr_pos = [grove.point(elf) for elf in elves]
+    # Find the boundaries of the smallest rectangle containing every elf
+    col_min = min(p[0] for p in curr_pos)
+    col_max = max(p[0] for p in curr_pos)
+    row_min = min(p[1] for p in curr_pos)
+    row_max = max(p[1] for p in curr_pos)
+
+    # Find the number of empty spots in that rectangle
+    empty_squares = (col_max - col_min + 1)*(row_max - row_min + 1) - len(curr_pos)
+
+    return empty_squares
+
+@memoized
 def Day23_Part1(input_file: str='Inputs/Day23_Inputs.txt') -> int:
     """
     Finds the number of empty spaces in the smallest rectangle that contains every elf on a grid
@@ -213,7 +267,7 @@ def Day23_Part1(input_file: str='Inputs/Day23_Inputs.txt') -> int:
 
     """
     # Parse the input file to get the initial grid layout
-    curr_pos = get_input(input_file)
+    grove, elves = build_grove(get_input(input_file))
 
     # Start with the North proposal
     first_dir_index = 0
@@ -221,23 +275,18 @@ def Day23_Part1(input_file: str='Inputs/Day23_Inputs.txt') -> int:
 
     # Do 10 rounds of moving
     while round_num <= 10:
-        curr_pos, changed = one_round(curr_pos, first_dir_index)
+        grove, elves, changed = one_round(grove, elves, first_dir_index)
 
         # Shift the order of proposals by one space
         first_dir_index = (first_dir_index + 1)%4
         round_num += 1
 
-    # Find the boundaries of the smallest rectangle containing every elf
-    col_min = min(p[0] for p in curr_pos)
-    col_max = max(p[0] for p in curr_pos)
-    row_min = min(p[1] for p in curr_pos)
-    row_max = max(p[1] for p in curr_pos)
-
-    # Find the number of empty spots in that rectangle
-    empty_squares = (col_max - col_min + 1)*(row_max - row_min + 1) - len(curr_pos)
+    # Find the number of empty spots in the smallest rectangle containing every elf
+    empty_squares = empty_ground(grove, elves)
 
     return empty_squares
 
+@memoized
 def Day23_Part2(input_file: str='Inputs/Day23_Inputs.txt') -> int:
     """
     Finds the number of rounds of movement required for a given starting layout of elves in a grid,
@@ -282,7 +331,7 @@ def Day23_Part2(input_file: str='Inputs/Day23_Inputs.txt') -> int:
 
     """
     # Parse the input file to get the initial grid layout
-    curr_pos = get_input(input_file)
+    grove, elves = build_grove(get_input(input_file))
     
     # Start with the North proposal
     first_dir_index = 0
@@ -292,10 +341,62 @@ def Day23_Part2(input_file: str='Inputs/Day23_Inputs.txt') -> int:
     # Continue until the grid doesn't change
     while changed:
         round_num += 1
-        curr_pos, changed = one_round(curr_pos, first_dir_index)
+        grove, elves, changed = one_round(grove, elves, first_dir_index)
+        telemetry.report(rounds=round_num)
 
         # Shift the order of proposals by one space
         first_dir_index = (first_dir_index + 1)%4
 
     # Return the last round number
     return round_num
+
+@memoized
+def Day23_solve(input_file: str='Inputs/Day23_Inputs.txt') -> tuple:
+    """
+    Finds both the number of empty spaces in the smallest rectangle containing every elf after 10
+    rounds of movement, and the number of rounds required before no elves move anymore, parsing
+    the input file and simulating the movement only once. The first 10 rounds are the same in both
+    parts, so the simulation just continues on from the state after round 10.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        The input file giving the grove layout.
+        The default is 'Inputs/Day23_Inputs.txt'.
+
+    Returns
+    -------
+    empty_squares : int
+        The number of empty spaces in the smallest rectangle that contains every elf on the grid
+        after 10 rounds.
+    round_num : int
+        The number of rounds required before no elves move anymore.
+
+    """
+    # Parse the input file to get the initial grid layout
+    grove, elves = build_grove(get_input(input_file))
+
+    # Start with the North proposal
+    first_dir_index = 0
+    round_num = 0
+    empty_squares = None
+    last_round = None
+
+    # Continue until the grid doesn't change, and at least 10 rounds have passed
+    while last_round is None or round_num < 10:
+        round_num += 1
+        grove, elves, changed = one_round(grove, elves, first_dir_index)
+        telemetry.report(rounds=round_num)
+
+        # Shift the order of proposals by one space
+        first_dir_index = (first_dir_index + 1)%4
+
+        if round_num == 10:
+            # Find the number of empty spots in the smallest rectangle containing every elf
+            empty_squares = empty_ground(grove, elves)
+
+        # Record the first round where no elves moved
+        if not changed and last_round is None:
+            last_round = round_num
+
+    return empty_squares, last_round
@@ -2,6 +2,13 @@
 DIRECTIONS = {'>': (0, 1), 'v': (1, 0), '<': (0, -1), '^': (-1, 0)}
 SYMBOLS = {v: k for k, v in DIRECTIONS.items()}
 
+from input_cache import cached_parser
+from inputs import iter_lines
+from memo import memoized
+from grid import Grid
+import search
+
+@cached_parser
 def get_input(input_file: str='Inputs/Day24_Inputs.txt') -> tuple:
     """
     Parse an input file giving the layout of a valley, bounded by walls (#) and containing empty
@@ -11,7 +18,7 @@ def get_input(input_file: str='Inputs/Day24_Inputs.txt') -> tuple:
 
     Parameters
     ----------
-    input_file : str, optional
+    input_file : str, stream or iterable, optional
         Input file giving the valley layout.
         The default is 'Inputs/Day24_Inputs.txt'.
 
@@ -30,8 +37,7 @@ def get_input(input_file: str='Inputs/Day24_Inputs.txt') -> tuple:
 
     """
     # Parse input file
-    with open(input_file) as f:
-        lines = [line.strip() for line in f.readlines()]
+    lines = [line.strip() for line in iter_lines(input_file)]
     # Calculate valley dimensions, discounting the walls
     valley_length = len(lines) - 2
     valley_width = len(lines[0]) - 2
@@ -207,9 +213,9 @@ def find_possible_moves(curr_pos: tuple, next_blizzards: dict, valley_bounds: tu
     ----------
     curr_pos : tuple(int)
         Current player position in the form (x, y).
-    next_blizzards : dict(tuple: list(tuple))
-        Dictionary of lists of the initial coordinates of every blizzard going in a given direction,
-        hashed by the unit vector of that direction, in the form (x, y).
+    next_blizzards : Grid
+        Grid of the valley marking every position which will contain a blizzard next turn with 1,
+        indexed by coordinates in the form (x, y).
     valley_bounds : tuple(int)
         The dimensions of the valley in the form (length, width).
     journey_bounds : tuple(tuple(int))
@@ -223,7 +229,7 @@ def find_possible_moves(curr_pos: tuple, next_blizzards: dict, valley_bounds: tu
 
     """
     # If the current position will not contain a blizzard next turn, not moving is an option
-    if curr_pos not in next_blizzards:
+    if not next_blizzards[curr_pos]:
         next_positions = {curr_pos}
     # Else remaining here is not an option
     else:
@@ -235,11 +241,37 @@ def find_possible_moves(curr_pos: tuple, next_blizzards: dict, valley_bounds: tu
         # If this position is within the boundaries and will not contain a blizzard next turn,
         # it is an option
         if coord_is_in_bounds(next_pos, valley_bounds, journey_bounds) and \
-            next_pos not in next_blizzards:
+            not next_blizzards[next_pos]:
             next_positions.add(next_pos)
 
     return next_positions
 
+def blizzard_grid(all_blizzards: dict, valley_bounds: tuple) -> Grid:
+    """
+    Mark the positions of every blizzard in a valley on a grid, whatever their direction.
+
+    Parameters
+    ----------
+    all_blizzards : dict(tuple: list(tuple))
+        Dictionary of lists of the coordinates of every blizzard going in a given direction,
+        hashed by the unit vector of that direction, in the form (x, y).
+    valley_bounds : tuple(int)
+        The dimensions of the valley in the form (length, width).
+
+    Returns
+    -------
+    blizzard_grid : Grid
+        Grid of the valley, indexed by coordinates in the form (x, y), with 1 marking the
+        positions containing at least one blizzard. Positions outside the valley read as 0.
+
+    """
+    blizzard_grid = Grid(*valley_bounds)
+    for blizzards in all_blizzards.values():
+        for x, y in blizzards:
+            blizzard_grid.data[y*valley_bounds[0] + x] = 1
+
+    return blizzard_grid
+
 ### All this is just to find the lowest common multiple of two numbers ###
                                                                          #
 def next_prime(n: int) -> int:                                           #
@@ -349,6 +381,9 @@ def lcm(a: int, b: int) -> int:                                          #
                                                                          #
 ##########################################################################
 
+from profiling import hot, phase
+
+@hot
 def find_fastest_route_bfs(journey_bounds: tuple, all_blizzard_states: list, valley_bounds: tuple,
                            start_moves: int=0) -> list:
     """
@@ -362,9 +397,9 @@ def find_fastest_route_bfs(journey_bounds: tuple, all_blizzard_states: list, val
     journey_bounds : tuple(tuple(int))
         The coordinates (x, y) of the entrance and exit from the valley in the form (entrance,
         exit).
-    all_blizzard_states : list(set(tuple))
-        Dictionary of lists of the initial coordinates of every blizzard going in a given direction,
-        hashed by the unit vector of that direction, in the form (x, y).
+    all_blizzard_states : list(Grid)
+        Grid of the positions containing a blizzard (marked with 1) after each number of moves,
+        until the blizzards return to their initial positions.
     valley_bounds : tuple(int)
         The dimensions of the valley in the form (length, width).
     start_moves : int, optional
@@ -378,32 +413,22 @@ def find_fastest_route_bfs(journey_bounds: tuple, all_blizzard_states: list, val
         number of starting moves.
 
     """
-    # Initalise queue of states for BFS with (position, moves_to_reach) describing each state
-    queue = [(journey_bounds[0], start_moves)]
-    # Initalise set of checked states
-    checked_states = set()
-
-    # While there are unchecked states
-    while queue:
-        # Get next highest priority state
-        curr_pos, curr_moves = queue.pop(0)
+    def next_states(state):
+        curr_pos, curr_moves = state
         # Find possible next positions from current position
         next_positions = find_possible_moves(curr_pos,
                                              all_blizzard_states[(curr_moves + 1) % len(all_blizzard_states)],
                                              valley_bounds, journey_bounds)
+        return [(pos, curr_moves + 1) for pos in next_positions]
+
+    # Each state of the BFS is described by (position, moves_to_reach)
+    for (curr_pos, curr_moves), distance in search.bfs([(journey_bounds[0], start_moves)],
+                                                       next_states):
         # If we have reached the target end point, return the current move count
-        if journey_bounds[1] in next_positions:
-            return curr_moves + 1
-        # Else for each possible next position (if any)
-        for pos in next_positions:
-            # Create correpsonding state
-            next_state = (pos, curr_moves + 1)
-            # Check if this has already been checked
-            if next_state not in checked_states:
-                # If not, add to the queue and set of checked states
-                queue.append(next_state)
-                checked_states.add(next_state)
+        if curr_pos == journey_bounds[1]:
+            return curr_moves
 
+@memoized
 def Day24_Part1(input_file: str='Inputs/Day24_Inputs.txt') -> int:
     """
     Finds the fewest number of moves required to reach the other side of valley containing a
@@ -428,25 +453,29 @@ def Day24_Part1(input_file: str='Inputs/Day24_Inputs.txt') -> int:
     # Extract initial blizzard positions and journey and valley boundaries from input file
     all_blizzards, journey_bounds, valley_bounds = get_input(input_file)
 
-    # Find fewest number of moves required for the blizzards to recover their initial positions
-    num_blizzard_states = lcm(*valley_bounds)
-    all_blizzard_states = []
-    # Find every possible unique blizzard layout
-    for moves in range(num_blizzard_states + 1):
-        all_blizzard_states.append(move_blizzards(all_blizzards, valley_bounds, moves))
+    with phase('precompute'):
+        # Find fewest number of moves required for the blizzards to recover their initial
+        # positions
+        num_blizzard_states = lcm(*valley_bounds)
+        all_blizzard_states = []
+        # Find every possible unique blizzard layout
+        for moves in range(num_blizzard_states + 1):
+            all_blizzard_states.append(move_blizzards(all_blizzards, valley_bounds, moves))
 
-    # Assert that the blizzards recovered their initial positions at the end
-    assert all_blizzard_states[0] == all_blizzard_states[-1]
+        # Assert that the blizzards recovered their initial positions at the end
+        assert all_blizzard_states[0] == all_blizzard_states[-1]
 
-    # Join together all blizzard positions into a single set
-    all_blizzard_states = [set(bliz for direc in blizzard_state.values() for bliz in direc) \
-                           for blizzard_state in all_blizzard_states[:-1]]
+        # Mark all blizzard positions on a single grid for each state
+        all_blizzard_states = [blizzard_grid(blizzard_state, valley_bounds) \
+                               for blizzard_state in all_blizzard_states[:-1]]
 
     # Perform a breadth-first search through the valley to find the lowest number of moves required
-    start_to_end = find_fastest_route_bfs(journey_bounds, all_blizzard_states, valley_bounds)
+    with phase('search'):
+        start_to_end = find_fastest_route_bfs(journey_bounds, all_blizzard_states, valley_bounds)
 
     return start_to_end
 
+@memoized
 def Day24_Part1and2(input_file: str='Inputs/Day24_Inputs.txt') -> tuple:
     """
     Finds the fewest number of moves required to reach the other side of valley containing a
@@ -476,32 +505,60 @@ def Day24_Part1and2(input_file: str='Inputs/Day24_Inputs.txt') -> tuple:
     # Extract initial blizzard positions and journey and valley boundaries from input file
     all_blizzards, journey_bounds, valley_bounds = get_input(input_file)
     
-    # Find fewest number of moves required for the blizzards to recover their initial positions
-    num_blizzard_states = lcm(*valley_bounds)
-    all_blizzard_states = []
-    # Find every possible unique blizzard layout
-    for moves in range(num_blizzard_states + 1):
-        all_blizzard_states.append(move_blizzards(all_blizzards, valley_bounds, moves))
+    with phase('precompute'):
+        # Find fewest number of moves required for the blizzards to recover their initial
+        # positions
+        num_blizzard_states = lcm(*valley_bounds)
+        all_blizzard_states = []
+        # Find every possible unique blizzard layout
+        for moves in range(num_blizzard_states + 1):
+            all_blizzard_states.append(move_blizzards(all_blizzards, valley_bounds, moves))
+
+        # Assert that the blizzards recovered their initial positions at the end
+        assert all_blizzard_states[0] == all_blizzard_states[-1]
+
+        # Mark all blizzard positions on a single grid for each state
+        all_blizzard_states = [blizzard_grid(blizzard_state, valley_bounds) \
+                               for blizzard_state in all_blizzard_states[:-1]]
+
+    with phase('search'):
+        # Perform a breadth-first search through the valley to find the lowest number of moves
+        # required to go from the start to the end the first time
+        start_to_end = find_fastest_route_bfs(journey_bounds, all_blizzard_states, valley_bounds)
+
+        # Perform a breadth-first search through the valley to find the lowest number of moves
+        # required to go from the end back to the start
+        start_to_end_and_back = find_fastest_route_bfs(journey_bounds[::-1], all_blizzard_states,
+                                                       valley_bounds, start_to_end)
+
+        # Perform a breadth-first search through the valley to find the lowest number of moves
+        # required to go from the start to the end the second time
+        start_to_end_and_back_and_back = find_fastest_route_bfs(journey_bounds,
+                                                                all_blizzard_states, valley_bounds,
+                                                                start_to_end_and_back)
 
-    # Assert that the blizzards recovered their initial positions at the end
-    assert all_blizzard_states[0] == all_blizzard_states[-1]
+    return start_to_end, start_to_end_and_back_and_back
 
-    # Join together all blizzard positions into a single set
-    all_blizzard_states = [set(bliz for direc in blizzard_state.values() for bliz in direc) \
-                           for blizzard_state in all_blizzard_states[:-1]]
+@memoized
+def Day24_solve(input_file: str='Inputs/Day24_Inputs.txt') -> tuple:
+    """
+    Finds both the fewest number of moves required to reach the other side of the valley, and the
+    fewest to go there, back to the start and back to the end again. This is Day24_Part1and2, which
+    already parses the input file and finds every blizzard state only once for both parts.
 
-    # Perform a breadth-first search through the valley to find the lowest number of moves required
-    # to go from the start to the end the first time
-    start_to_end = find_fastest_route_bfs(journey_bounds, all_blizzard_states, valley_bounds)
-    
-    # Perform a breadth-first search through the valley to find the lowest number of moves required
-    # to go from the end back to the start
-    start_to_end_and_back = find_fastest_route_bfs(journey_bounds[::-1], all_blizzard_states,
-                                                   valley_bounds, start_to_end)
-    
-    # Perform a breadth-first search through the valley to find the lowest number of moves required
-    # to go from the start to the end the second time
-    start_to_end_and_back_and_back = find_fastest_route_bfs(journey_bounds, all_blizzard_states,
-                                                            valley_bounds, start_to_end_and_back)
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file containing the valley layout.
+        The default is 'Inputs/Day24_Inputs.txt'.
 
-    return start_to_end, start_to_end_and_back_and_back
+    Returns
+    -------
+    start_to_end : int
+        The fewest number of moves required to reach the other side of valley.
+    start_to_end_and_back_and_back : int
+        The fewest number of moves required to reach the other side of valley, then go back to the
+        start, and then go back to the end again.
+
+    """
+    return Day24_Part1and2(input_file)
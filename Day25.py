@@ -1,10 +1,15 @@
+from input_cache import cached_parser
+from inputs import iter_lines
+from memo import memoized
+
+@cached_parser
 def get_input(input_file: str='Inputs/Day25_Inputs.txt') -> list:
     """
     Parse an input file and extract a list of numbers written in SNAFU format.
 
     Parameters
     ----------
-    input_file : str, optional
+    input_file : str, stream or iterable, optional
         Input file containing the numbers.
         The default is 'Inputs/Day25_Inputs.txt'.
 
@@ -15,8 +20,7 @@ def get_input(input_file: str='Inputs/Day25_Inputs.txt') -> list:
 
     """
     # Parse input file
-    with open(input_file) as f:
-        numbers = [line.strip() for line in f.readlines()]
+    numbers = [line.strip() for line in iter_lines(input_file)]
 
     return numbers
 
@@ -139,6 +143,7 @@ class TestConversions(unittest.TestCase):
         for d, s in zip(dec, snafu):
             self.assertEqual(dec_to_snafu(d), s)
 
+@memoized
 def Day25_Part1(input_file: str='Inputs/Day25_Inputs.txt') -> str:
     """
     Find the SNAFU number which corresponds to the sum of a list of SNAFU numbers given in an input
@@ -173,3 +178,26 @@ def Day25_Part1(input_file: str='Inputs/Day25_Inputs.txt') -> str:
     snafu_sum = dec_to_snafu(dec_sum)#
 
     return snafu_sum
+
+@memoized
+def Day25_solve(input_file: str='Inputs/Day25_Inputs.txt') -> tuple:
+    """
+    Find the SNAFU number which corresponds to the sum of a list of SNAFU numbers given in an input
+    file. There is no second puzzle on Day 25, so this only has an answer for Part 1, and is just
+    here so that every day can be solved in the same way.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file giving the SNAFU numbers.
+        The default is 'Inputs/Day25_Inputs.txt'.
+
+    Returns
+    -------
+    snafu_sum : str
+        The sum of the input numbers, in SNAFU format.
+    None
+        There is no Part 2.
+
+    """
+    return Day25_Part1(input_file), None
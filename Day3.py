@@ -1,10 +1,15 @@
+from input_cache import cached_parser
+from inputs import iter_lines
+from memo import memoized
+
+@cached_parser
 def get_input(input_file: str='Inputs/Day3_Inputs.txt') -> list:
     """
     Parse input file containing the contents of the rucksacks carried by a group of elves.
 
     Parameters
     ----------
-    input_file : str, optional
+    input_file : str, stream or iterable, optional
         The input file containing the rucksack contents.
         The default is 'Inputs/Day3_Inputs.txt'.
 
@@ -15,16 +20,93 @@ def get_input(input_file: str='Inputs/Day3_Inputs.txt') -> list:
 
     """
     # Parse input file
-    file = open(input_file)
     rucksacks = []
-    for line in file:
+    for line in iter_lines(input_file):
         line = line.strip().split()
         if len(line) > 0:
             rucksacks.append(line[0])
-    file.close()
 
     return rucksacks
 
+def priority(item: str) -> int:
+    """
+    Find the priority score of an item, which is 1-26 for items 'a'-'z' and 27-52 for 'A'-'Z'.
+
+    Parameters
+    ----------
+    item : str
+        The item.
+
+    Returns
+    -------
+    p : int
+        The priority score of the item.
+
+    """
+    # Calculate prioity score by shifting ord() values
+    if item.islower():
+        p = ord(item) - 96
+    else:
+        p = ord(item) - 38
+
+    return p
+
+def compartment_total(data: list) -> int:
+    """
+    Calculate the total priority score of the single shared item between the two compartments of
+    each rucksack.
+
+    Parameters
+    ----------
+    data : list(str)
+        The contents of each rucksack.
+
+    Returns
+    -------
+    total : int
+        The total priority score across all the elves.
+
+    """
+    total = 0
+    for rucksack in data: # For each rucksack
+        # Make sets of each compartment contents
+        c1 = set(rucksack[:int(len(rucksack)/2)])
+        c2 = set(rucksack[int(len(rucksack)/2):])
+        # Find the single common item using intersection()
+        common = c1.intersection(c2).pop()
+        total += priority(common)
+
+    return total
+
+def group_total(data: list) -> int:
+    """
+    Calculate the total priority score of the single shared item between the rucksacks of each
+    group of three elves.
+
+    Parameters
+    ----------
+    data : list(str)
+        The contents of each rucksack, in their groups of three.
+
+    Returns
+    -------
+    total : int
+        The total priority score across all the groups of elves.
+
+    """
+    total = 0
+    for n in range(0, len(data), 3): # For each group of three
+        # Make sets of each rucksack contents
+        c1 = set(data[n])
+        c2 = set(data[n+1])
+        c3 = set(data[n+2])
+        # Find the common item using intersection()
+        common = c1.intersection(c2).intersection(c3).pop()
+        total += priority(common)
+
+    return total
+
+@memoized
 def Day3_Part1(input_file: str='Inputs/Day3_Inputs.txt') -> int:
     """
     Calculate the total priority score for all elves based on the single shared item between the
@@ -47,23 +129,10 @@ def Day3_Part1(input_file: str='Inputs/Day3_Inputs.txt') -> int:
     """
     # Parse input file
     data = get_input(input_file)
-    
-    total = 0
-    for rucksack in data: # For each rucksack
-        # Make sets of each compartment contents
-        c1 = set(rucksack[:int(len(rucksack)/2)])
-        c2 = set(rucksack[int(len(rucksack)/2):])
-        # Find the single common item using intersection()
-        common = c1.intersection(c2).pop()
-        # Calculate prioity score by shifting ord() values
-        if common.islower():
-            p = ord(common) - 96
-        else:
-            p = ord(common) - 38
-        total += p
-    
-    return total
 
+    return compartment_total(data)
+
+@memoized
 def Day3_Part2(input_file: str='Inputs/Day3_Inputs.txt') -> int:
     """
     Calculate the total priority score across all groups of three elves based on the single shared
@@ -86,19 +155,30 @@ def Day3_Part2(input_file: str='Inputs/Day3_Inputs.txt') -> int:
     # Parse input file
     data = get_input(input_file)
 
-    total = 0
-    for n in range(0, len(data), 3): # For each group of three
-        # Make sets of each rucksack contents
-        c1 = set(data[n])
-        c2 = set(data[n+1])
-        c3 = set(data[n+2])
-        # Find the common item using intersection()
-        common = c1.intersection(c2).intersection(c3).pop()
-        # Calculate prioity score by shifting ord() values
-        if common.islower():
-            p = ord(common) - 96
-        else:
-            p = ord(common) - 38
-        total += p
-    
-    return total
+    return group_total(data)
+
+@memoized
+def Day3_solve(input_file: str='Inputs/Day3_Inputs.txt') -> tuple:
+    """
+    Calculate both the total priority score of the items shared between the compartments of each
+    rucksack and of the items shared between each group of three elves, parsing the input file
+    only once.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        The input file containing the contents of the elves rucksacks.
+        The default is 'Inputs/Day3_Inputs.txt'.
+
+    Returns
+    -------
+    compartment_total : int
+        The total priority score across all the elves.
+    group_total : int
+        The total priority score across all the groups of elves.
+
+    """
+    # Parse input file
+    data = get_input(input_file)
+
+    return compartment_total(data), group_total(data)
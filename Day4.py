@@ -1,10 +1,15 @@
+from input_cache import cached_parser
+from inputs import iter_lines
+from memo import memoized
+
+@cached_parser
 def get_input(input_file: str='Inputs/Day4_Inputs.txt') -> list:
     """
     Parse input file containing the section assignment IDs for pairs of elves.
 
     Parameters
     ----------
-    input_file : str, optional
+    input_file : str, stream or iterable, optional
         The input file containing the section assignment for each pair.
         The default is 'Inputs/Day4_Inputs.txt'.
 
@@ -15,9 +20,8 @@ def get_input(input_file: str='Inputs/Day4_Inputs.txt') -> list:
 
     """
     # Parse input file
-    file = open(input_file)
     pairs = []
-    for line in file:
+    for line in iter_lines(input_file):
         line = line.strip().split()
         if len(line) > 0:
             pair = []
@@ -29,10 +33,9 @@ def get_input(input_file: str='Inputs/Day4_Inputs.txt') -> list:
                 pair.append(elf)
             pairs.append(pair)
 
-    file.close()
-
     return pairs
 
+@memoized
 def Day4_Part1(input_file: str='Inputs/Day4_Inputs.txt') -> int:
     """
     Calculate the total number of pairs of elves where one section assignment fully contains the
@@ -67,6 +70,7 @@ def Day4_Part1(input_file: str='Inputs/Day4_Inputs.txt') -> int:
 
     return subset_count
 
+@memoized
 def Day4_Part2(input_file: str='Inputs/Day4_Inputs.txt') -> int:
     """
     Calculate the total number of pairs of elves whose section assignments overlap, where section
@@ -98,3 +102,38 @@ def Day4_Part2(input_file: str='Inputs/Day4_Inputs.txt') -> int:
     # definitely easier to read
 
     return overlap_count
+
+@memoized
+def Day4_solve(input_file: str='Inputs/Day4_Inputs.txt') -> tuple:
+    """
+    Calculate both the number of pairs of elves where one section assignment fully contains the
+    other and the number of pairs whose section assignments overlap, parsing the input file only
+    once and checking both in a single pass over the pairs.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        The input file containing the section assignment for each pair.
+        The default is 'Inputs/Day4_Inputs.txt'.
+
+    Returns
+    -------
+    subset_count : int
+        The number of pairs where one elf's section assignment fully contains the other's.
+    overlap_count : int
+        The number of pairs of elves whose section assignments overlap.
+
+    """
+    # Parse input file
+    pairs = get_input(input_file)
+
+    subset_count = 0
+    overlap_count = 0
+    for pair in pairs:
+        # A pair can only contain one another if they overlap
+        if not pair[0].isdisjoint(pair[1]):
+            overlap_count += 1
+            if pair[0].issubset(pair[1]) or pair[0].issuperset(pair[1]):
+                subset_count += 1
+
+    return subset_count, overlap_count
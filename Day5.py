@@ -1,3 +1,8 @@
+from input_cache import cached_parser
+from inputs import iter_lines
+from memo import memoized
+
+@cached_parser
 def get_input(input_file: str='Inputs/Day5_Inputs.txt') -> tuple:
     """
     Parse an input file giving the initial state of a series of stacks of crates, followed
@@ -5,7 +10,7 @@ def get_input(input_file: str='Inputs/Day5_Inputs.txt') -> tuple:
 
     Parameters
     ----------
-    input_file : str, optional
+    input_file : str, stream or iterable, optional
         The input file giving the initial stacks and rearrangement instructions.
         The default is 'Inputs/Day5_Inputs.txt'.
 
@@ -20,11 +25,10 @@ def get_input(input_file: str='Inputs/Day5_Inputs.txt') -> tuple:
 
     """
     # Parse input file
-    file = open(input_file)
     stacks, instructions = [], []
     # Flag that the initial stacks haven't been initialised yet
     initial_state = None
-    for line in file:
+    for line in iter_lines(input_file):
         if len(line.strip()) > 0:
             if initial_state == None: # If initial states aren't initialised yet
                 for i in range(0, len(line), 4):
@@ -58,13 +62,12 @@ def get_input(input_file: str='Inputs/Day5_Inputs.txt') -> tuple:
                 line = line.strip().split('move ')[1].split(' from ')
                 instructions.append([int(n) for part in line for n in part.split(' to ')])
 
-    file.close()
-
     # Reverse stack ordering for tidier code in the next part
     [stack.reverse() for stack in stacks]
 
     return stacks, instructions
 
+@memoized
 def Day5_Part1(input_file: str='Inputs/Day5_Inputs.txt') -> str:
     """
     Determines the top crates in each of a series of stacks, after a series of instructions for
@@ -98,6 +101,7 @@ def Day5_Part1(input_file: str='Inputs/Day5_Inputs.txt') -> str:
     top_crates = ''.join([stack[-1] for stack in stacks])
     return top_crates
 
+@memoized
 def Day5_Part2(input_file: str='Inputs/Day5_Inputs.txt') -> str:
     """
     Determines the top crates in each of a series of stacks, after a series of instructions for
@@ -132,3 +136,44 @@ def Day5_Part2(input_file: str='Inputs/Day5_Inputs.txt') -> str:
     # Join the labels of the top crates in each stack
     top_crates = ''.join([stack[-1] for stack in stacks])
     return top_crates
+
+@memoized
+def Day5_solve(input_file: str='Inputs/Day5_Inputs.txt') -> tuple:
+    """
+    Determines the top crates in each of a series of stacks after the rearrangement instructions
+    are applied, both when crates are moved one at a time (Part 1) and when they are moved as a
+    group (Part 2), parsing the input file only once and applying each instruction to both
+    arrangements in a single pass.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        The input file giving the initial stacks and rearrangement instructions.
+        The default is 'Inputs/Day5_Inputs.txt'.
+
+    Returns
+    -------
+    single_top_crates : str
+        The labels of the top crates in every stack when crates are moved one at a time.
+    group_top_crates : str
+        The labels of the top crates in every stack when crates are moved as a group.
+
+    """
+    # Parse input file
+    stacks, instructions = get_input(input_file)
+    # Each part rearranges its own copy of the stacks
+    single_stacks = [stack.copy() for stack in stacks]
+    group_stacks = stacks
+
+    for number, source, target in instructions:
+        start = len(single_stacks[source-1]) - number
+        # Moving crates one at a time reverses their order
+        single_stacks[target-1] += reversed(single_stacks[source-1][start:])
+        del single_stacks[source-1][start:]
+        # Moving crates as a group preserves their order
+        group_stacks[target-1] += group_stacks[source-1][start:]
+        del group_stacks[source-1][start:]
+
+    # Join the labels of the top crates in each stack
+    return ''.join([stack[-1] for stack in single_stacks]), \
+           ''.join([stack[-1] for stack in group_stacks])
@@ -1,3 +1,9 @@
+from input_cache import cached_parser
+import inputs
+from inputs import iter_lines
+from memo import memoized
+
+@cached_parser
 def get_input(input_file: str='Inputs/Day6_Inputs.txt') -> str:
     """
     Parse an input file containing a string of characters representing the datastream from a
@@ -5,7 +11,7 @@ def get_input(input_file: str='Inputs/Day6_Inputs.txt') -> str:
 
     Parameters
     ----------
-    input_file : str, optional
+    input_file : str, stream or iterable, optional
         The input file containing the datastream.
         The default is 'Inputs/Day6_Inputs.txt'.
 
@@ -16,10 +22,11 @@ def get_input(input_file: str='Inputs/Day6_Inputs.txt') -> str:
 
     """
     # Parse input file
-    data = list(open(input_file))[0].strip()
+    data = next(iter_lines(input_file)).strip()
 
     return data
 
+@memoized
 def Day6_Part1(input_file: str='Inputs/Day6_Inputs.txt') -> int:
     """
     Determine the number of characters from the beginning of a datastream, given in an input file,
@@ -49,6 +56,7 @@ def Day6_Part1(input_file: str='Inputs/Day6_Inputs.txt') -> int:
     start_of_packet = i + 4
     return start_of_packet
 
+@memoized
 def Day6_Part2(input_file: str='Inputs/Day6_Inputs.txt') -> int:
     """
     Determine the number of characters from the beginning of a datastream, given in an input file,
@@ -77,3 +85,116 @@ def Day6_Part2(input_file: str='Inputs/Day6_Inputs.txt') -> int:
     
     start_of_message = i + 14
     return start_of_message
+
+def find_markers(data: str, lengths: tuple=(4, 14)) -> list:
+    """
+    Find the ends of the first sets of all-different characters of several lengths in a single
+    pass through a datastream, by keeping track of where each character was last seen and so where
+    the current run of all-different characters begins.
+
+    Parameters
+    ----------
+    data : str
+        The datastream.
+    lengths : tuple(int), optional
+        The number of all-different characters in each marker.
+        The default is (4, 14).
+
+    Returns
+    -------
+    ends : list(int)
+        The number of characters before the end of the first marker of each length, or the
+        length of the datastream plus the marker length if there is no such marker.
+
+    """
+    ends = [None]*len(lengths)
+    last_seen = {}
+    start = 0
+    for i, char in enumerate(data):
+        # The run of all-different characters has to start after the last repeat of this one
+        if last_seen.get(char, -1) >= start:
+            start = last_seen[char] + 1
+        last_seen[char] = i
+        for n, length in enumerate(lengths):
+            if ends[n] is None and i - start + 1 >= length:
+                ends[n] = i + 1
+        if None not in ends:
+            break
+
+    return [len(data) + length if end is None else end for end, length in zip(ends, lengths)]
+
+def find_markers_in_bytes(buffer, lengths: tuple=(4, 14)) -> list:
+    """
+    Find the ends of the first sets of all-different characters of several lengths in the first
+    line of a bytes-like buffer, as find_markers but working directly on the bytes. The scan stops
+    as soon as every marker has been found, so with a memory mapped file only the start of the
+    file is ever read.
+
+    Parameters
+    ----------
+    buffer : bytes-like
+        The datastream, e.g. bytes, a memoryview or an mmap.
+    lengths : tuple(int), optional
+        The number of all-different characters in each marker.
+        The default is (4, 14).
+
+    Returns
+    -------
+    ends : list(int)
+        The number of characters before the end of the first marker of each length, or the
+        length of the first line plus the marker length if there is no such marker.
+
+    """
+    ends = [None]*len(lengths)
+    # Position each byte value was last seen at
+    last_seen = [-1]*256
+    start = 0
+    i = 0
+    with memoryview(buffer) as view:
+        for i, char in enumerate(view):
+            # Stop at the end of the first line
+            if char == 10 or char == 13:
+                break
+            # The run of all-different characters has to start after the last repeat of this one
+            if last_seen[char] >= start:
+                start = last_seen[char] + 1
+            last_seen[char] = i
+            for n, length in enumerate(lengths):
+                if ends[n] is None and i - start + 1 >= length:
+                    ends[n] = i + 1
+            if None not in ends:
+                break
+        else:
+            # Reached the end of the buffer without a newline
+            i = len(view)
+
+    return [i + length if end is None else end for end, length in zip(ends, lengths)]
+
+@memoized
+def Day6_solve(input_file: str='Inputs/Day6_Inputs.txt') -> tuple:
+    """
+    Determine the number of characters from the beginning of a datastream, given in an input file,
+    to the end of both the first start-of-packet marker (four different characters) and the first
+    start-of-message marker (fourteen different characters), parsing the input file only once.
+    The file is memory mapped and scanned as bytes, so only as much of it as is needed to find
+    both markers is ever read.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        The input file containing the datastream.
+        The default is 'Inputs/Day6_Inputs.txt'.
+
+    Returns
+    -------
+    start_of_packet : int
+        The number of characters before the end of the first start-of-packet marker.
+    start_of_message : int
+        The number of characters before the end of the first start-of-message marker.
+
+    """
+    # Map the input file, without reading or decoding any of it up front
+    with inputs.map_input(input_file) as buffer:
+        start_of_packet, start_of_message = find_markers_in_bytes(buffer, (4, 14))
+
+    return start_of_packet, start_of_message
@@ -4,6 +4,11 @@ dictionaries, as the directory and file names are not relevant, but it's much ea
 what's happening with the dictionary, so I think it was worth doing it this way anyway.
 """
 
+from input_cache import cached_parser
+from inputs import iter_lines
+from memo import memoized
+
+@cached_parser
 def get_input(input_file: str = 'Inputs/Day7_Inputs.txt') -> dict:
     """
     Parse an input file containing Linux commands and their outputs, used to move around a file
@@ -12,7 +17,7 @@ def get_input(input_file: str = 'Inputs/Day7_Inputs.txt') -> dict:
 
     Parameters
     ----------
-    input_file : str, optional
+    input_file : str, stream or iterable, optional
         The input file containing the commands and their outputs.
         The default is 'Inputs/Day7_Inputs.txt'.
 
@@ -24,11 +29,10 @@ def get_input(input_file: str = 'Inputs/Day7_Inputs.txt') -> dict:
 
     """
     # Parse input file
-    file = open(input_file)
     file_system = {}
     # Track the current directory using a string
     curr_dir = 'file_system'
-    for line in file:
+    for line in iter_lines(input_file):
         line = line.strip().split()
         if len(line) > 0:
             if line[0] == '$': # If command
@@ -52,11 +56,9 @@ def get_input(input_file: str = 'Inputs/Day7_Inputs.txt') -> dict:
                 # Add file and its size to the current directory
                 eval(curr_dir)[line[1]] = int(line[0])
 
-    file.close()
-
     return file_system
 
-def total_size(file_system: dict, total_sizes: dict={}, curr_dir: str='file_system') -> int:
+def total_size(file_system: dict, total_sizes: dict=None, curr_dir: str='file_system') -> int:
     """
     Recursively calculates the size of the given directory and all subdirectories.
 
@@ -64,9 +66,10 @@ def total_size(file_system: dict, total_sizes: dict={}, curr_dir: str='file_syst
     ----------
     file_system : dict
         The given directory to calculate sizes for.
-    total_sizes : dict, optional
-        The sizes of subdirectories measured so far (required for recursion).
-        The default is {}.
+    total_sizes : dict or NoneType, optional
+        The sizes of subdirectories measured so far (required for recursion). If None, a new
+        dictionary is started.
+        The default is None.
     curr_dir : str, optional
         The current directory as a string (required for recursion).
         The default is 'file_system'.
@@ -85,6 +88,9 @@ def total_size(file_system: dict, total_sizes: dict={}, curr_dir: str='file_syst
         The sizes of all subdirectories, by name.
 
     """
+    # Start a new dictionary for each file system, rather than sharing one between calls
+    if total_sizes is None:
+        total_sizes = {}
     curr_size = 0
     for key in file_system: # Loop through directory contents
         if type(file_system[key]) == dict: # If subdirectory
@@ -105,6 +111,7 @@ def total_size(file_system: dict, total_sizes: dict={}, curr_dir: str='file_syst
 
     return curr_size, total_sizes
 
+@memoized
 def Day7_Part1(input_file: str='Inputs/Day7_Inputs.txt', size_limit: int=100000) -> int:
     """
     Calculate the total size of all subdirectories in a file system with an individual total size
@@ -140,6 +147,7 @@ def Day7_Part1(input_file: str='Inputs/Day7_Inputs.txt', size_limit: int=100000)
 
     return total_size_sum
 
+@memoized
 def Day7_Part2(input_file: str='Inputs/Day7_Inputs.txt', total_space: int=70000000,
                space_required: int=30000000) -> int:
     """
@@ -181,3 +189,54 @@ def Day7_Part2(input_file: str='Inputs/Day7_Inputs.txt', total_space: int=700000
                                          if total_sizes[k] >= new_space_required])
 
     return smallest_sufficient_directory
+
+@memoized
+def Day7_solve(input_file: str='Inputs/Day7_Inputs.txt', size_limit: int=100000,
+               total_space: int=70000000, space_required: int=30000000) -> tuple:
+    """
+    Calculate both the total size of all subdirectories at or below the given size limit and the
+    size of the smallest single subdirectory which can be deleted to free up the space required,
+    building the file system and measuring the size of every subdirectory only once.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        The input file containing the commands and their outputs.
+        The default is 'Inputs/Day7_Inputs.txt'.
+    size_limit : int, optional
+        The maximum size of files to be considered.
+        The default is 100,000.
+    total_space : int, optional
+        The total storage capacity of the file system.
+        The default is 70,000,000.
+    space_required : int, optional
+        The total free space required to install updates.
+        The default is 30,000,000.
+
+    Returns
+    -------
+    total_size_sum : int
+        The total size of all subdirectories in the file system smaller than or equal to the
+        given size limit.
+    smallest_sufficient_directory : int
+        The size of the smallest single subdirectory which can be deleted from the file system
+        to free up enough space to install updates.
+
+    """
+    # Parse input file
+    file_system = get_input(input_file)
+    # Get size of file system and all subdirectories
+    file_system_size, total_sizes = total_size(file_system)
+    # Add full file system to dictionary
+    total_sizes['/'] = file_system_size
+
+    # Sum sizes of subdirectories at or below the size limit
+    total_size_sum = sum([size for size in total_sizes.values() if size <= size_limit])
+
+    # Extra space required on top of the current free space
+    new_space_required = space_required - (total_space - file_system_size)
+    # Get smallest subdirectory with size at or above the extra space required
+    smallest_sufficient_directory = min([size for size in total_sizes.values() \
+                                         if size >= new_space_required])
+
+    return total_size_sum, smallest_sufficient_directory
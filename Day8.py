@@ -1,34 +1,36 @@
-import numpy as np
-
-def get_input(input_file: str='Inputs/Day8_Inputs.txt') -> np.ndarray:
+from lazy import lazy_import
+np = lazy_import('numpy')
+from input_cache import cached_parser
+from inputs import iter_lines
+from memo import memoized
+from grid import Grid
+
+@cached_parser
+def get_input(input_file: str='Inputs/Day8_Inputs.txt') -> 'np.ndarray':
     """
     Parse an input file containing the heights of trees in a 100 x 100 grid.
 
     Parameters
     ----------
-    input_file : str, optional
+    input_file : str, stream or iterable, optional
         Input file containing the tree heights.
         The default is 'Inputs/Day8_Inputs.txt'.
 
     Returns
     -------
     trees : np.ndarray
-        2D numpy array of the tree heights.
+        2D numpy array of the tree heights, of type uint8.
 
     """
     # Parse input file
-    file = open(input_file)
-    trees = []
-    for line in file:
-        line = line.strip().split()
-        if len(line) > 0:
-            # Split up each row and convert tree heights to integers
-            trees.append([int(height) for height in line[0]])
+    lines = [line.strip() for line in iter_lines(input_file) if line.strip()]
 
-    file.close()
+    # Convert the digits to heights all at once, straight into a compact grid
+    trees = Grid.from_lines(lines, {str(height): height for height in range(10)}).array
 
-    return np.array(trees)
+    return trees
 
+@memoized
 def Day8_Part1(input_file: str='Inputs/Day8_Inputs.txt') -> int:
     """
     Calculates the number of trees in a grid, whose heights are given in an input file, which are
@@ -62,6 +64,7 @@ def Day8_Part1(input_file: str='Inputs/Day8_Inputs.txt') -> int:
     return visible
 
 
+@memoized
 def Day8_Part2(input_file: str='Inputs/Day8_Inputs.txt') -> int:
     """
     Calculates the highest scenic score possible for any tree in a 100 x 100 grid, whose heights
@@ -114,7 +117,7 @@ def Day8_Part2(input_file: str='Inputs/Day8_Inputs.txt') -> int:
             if len(ind_down) > 0:
                 down = min(ind_down) + 1
             else:
-                len(trees[:, x]) - 1 - y
+                down = len(trees[:, x]) - 1 - y
 
             # Calculate corresponding score
             scenic_score.append(left*right*up*down)
@@ -123,3 +126,79 @@ def Day8_Part2(input_file: str='Inputs/Day8_Inputs.txt') -> int:
     max_score = max(scenic_score)
 
     return max_score
+
+def sight_lines(heights: list) -> tuple:
+    """
+    Looking along a line of trees from one end, find whether each tree is visible from that end
+    and how many trees can be seen from each tree back towards that end. A stack of the trees
+    which are not yet blocked by a taller one is kept, so the whole line is covered in a single
+    pass.
+
+    Parameters
+    ----------
+    heights : list(int)
+        The heights of the trees in the line.
+
+    Returns
+    -------
+    visible : list(bool)
+        Whether each tree is visible from the start of the line.
+    distances : list(int)
+        The number of trees visible from each tree looking back towards the start of the line.
+
+    """
+    visible = []
+    distances = []
+    # Indices of the trees which could still block the view of later trees
+    stack = []
+    for i, height in enumerate(heights):
+        # Trees shorter than this one can never block the view of any later tree
+        while stack and heights[stack[-1]] < height:
+            stack.pop()
+        # If nothing at least as tall is left, the tree is visible from the start of the line
+        visible.append(not stack)
+        distances.append(i - stack[-1] if stack else i)
+        stack.append(i)
+
+    return visible, distances
+
+@memoized
+def Day8_solve(input_file: str='Inputs/Day8_Inputs.txt') -> tuple:
+    """
+    Calculates both the number of trees in a grid which are visible from outside the grid and the
+    highest scenic score possible for any tree in the grid, parsing the input file only once and
+    making a single pass along each row and column in each direction.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file containing the tree heights.
+        The default is 'Inputs/Day8_Inputs.txt'.
+
+    Returns
+    -------
+    visible : int
+        The number of trees visible from outside the grid.
+    max_score : int
+        The highest possible scenic score for any tree in the grid.
+
+    """
+    # Parse input file
+    trees = get_input(input_file)
+
+    visible = np.zeros(trees.shape, dtype=bool)
+    scenic_score = np.ones(trees.shape, dtype=int)
+    # Look along every row and column, from both ends
+    for lines, view in [(trees.tolist(), lambda i: (i, slice(None))),
+                        (trees.T.tolist(), lambda i: (slice(None), i))]:
+        for i, line in enumerate(lines):
+            # From the start of the line
+            line_visible, distances = sight_lines(line)
+            visible[view(i)] |= line_visible
+            scenic_score[view(i)] *= distances
+            # From the end of the line
+            line_visible, distances = sight_lines(line[::-1])
+            visible[view(i)] |= line_visible[::-1]
+            scenic_score[view(i)] *= distances[::-1]
+
+    return int(visible.sum()), int(scenic_score.max())
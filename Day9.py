@@ -1,5 +1,10 @@
-import numpy as np
+from lazy import lazy_import
+np = lazy_import('numpy')
+from input_cache import cached_parser
+from inputs import iter_lines
+from memo import memoized
 
+@cached_parser
 def get_input(input_file: str='Inputs/Day9_Inputs.txt') -> list:
     """
     Parse an input file containing a list of movements for one end of a rope in the form:
@@ -8,7 +13,7 @@ def get_input(input_file: str='Inputs/Day9_Inputs.txt') -> list:
 
     Parameters
     ----------
-    input_file : str, optional
+    input_file : str, stream or iterable, optional
         Input file containing the movements.
         The default is 'Inputs/Day9_Inputs.txt'.
 
@@ -19,17 +24,15 @@ def get_input(input_file: str='Inputs/Day9_Inputs.txt') -> list:
 
     """
     # Parse input file
-    file = open(input_file)
     moves = []
-    for line in file:
+    for line in iter_lines(input_file):
         line = line.strip().split()
         if len(line) > 0:
             moves.append([line[0], int(line[1])])
 
-    file.close()
-
     return moves
 
+@memoized
 def Day9_Part1(input_file: str='Inputs/Day9_Inputs.txt') -> int:
     """
     Calculates how many positions the tail of a rope visits, as the head of the rope follows a set
@@ -167,3 +170,52 @@ def Day9_Part2(input_file: str='Inputs/Day9_Inputs.txt', output_path: bool=True)
     number_of_pos = len(all_tail_pos)
     
     return number_of_pos
+
+# Step of the head for each direction of movement
+STEPS = {'U': (0, 1), 'D': (0, -1), 'R': (1, 0), 'L': (-1, 0)}
+
+@memoized
+def Day9_solve(input_file: str='Inputs/Day9_Inputs.txt') -> tuple:
+    """
+    Calculates how many positions the tail of a rope visits both for a rope of two knots and for a
+    rope of ten knots, from a single simulation of the ten knot rope, since the second knot of the
+    longer rope moves exactly like the tail of the shorter one.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        The input file giving the movement instructions for the head of the rope.
+        The default is 'Inputs/Day9_Inputs.txt'.
+
+    Returns
+    -------
+    short_number_of_pos : int
+        The number of different positions visited by the tail of the rope of two knots.
+    long_number_of_pos : int
+        The number of different positions visited by the tail of the rope of ten knots.
+
+    """
+    # Parse input file
+    moves = get_input(input_file)
+    # Start each knot at the same arbitrary point
+    knot_pos = [[0, 0] for i in range(10)]
+    second_pos = {(0, 0)}
+    tail_pos = {(0, 0)}
+    for direction, distance in moves:
+        dx, dy = STEPS[direction]
+        for m in range(distance):
+            knot_pos[0][0] += dx
+            knot_pos[0][1] += dy
+            for n in range(1, len(knot_pos)):
+                x = knot_pos[n-1][0] - knot_pos[n][0]
+                y = knot_pos[n-1][1] - knot_pos[n][1]
+                # If the knots are still touching, none of the following knots move either
+                if -1 <= x <= 1 and -1 <= y <= 1:
+                    break
+                # Else move one step towards the previous knot in each axis where they differ
+                knot_pos[n][0] += (x > 0) - (x < 0)
+                knot_pos[n][1] += (y > 0) - (y < 0)
+            second_pos.add(tuple(knot_pos[1]))
+            tail_pos.add(tuple(knot_pos[-1]))
+
+    return len(second_pos), len(tail_pos)
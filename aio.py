@@ -0,0 +1,359 @@
+"""
+asyncio front end for solving, so that an event loop can await the answers of many days at once
+without ever blocking on a solution:
+
+    answer = await aio.solve(16, '2', 'Inputs/Day16_Inputs.txt', timeout=60)
+
+or with a solver of its own, which is shut down at the end of the block:
+
+    async with aio.AsyncSolver(workers=4) as solver:
+        answers = await asyncio.gather(*(solver.solve(day) for day in range(1, 26)))
+
+The CPU-bound parts (HEAVY_PARTS, e.g. Day16_Part2, Day19_Part1 and Day15_Part2) are sent to a
+pool of worker processes, which import the days up front as in batch.py, while the quick ones run
+on a single background thread. The solutions swap their parsers in and out of the module namespace
+(see aoc.run_part), so that thread runs one part at a time.
+
+Inputs can be given as a path (which the process reading it opens itself), an asyncio.StreamReader
+or any async iterable of lines (which are read without blocking the event loop before the part is
+sent off), or anything else accepted by inputs.iter_lines.
+
+Only max_pending requests are sent off at once; further requests wait their turn, so a caller
+producing requests faster than the pool can solve them is slowed down rather than queueing up
+unlimited work. A request can be cancelled, and can be given a deadline covering the wait, the
+reading of the input and the solve. A part which has not started yet is dropped from the queue
+straight away, while one already running in a worker is also stopped there by its time limit
+(SIGALRM, see batch.run_job). Parts running on the thread can't be interrupted, so they carry on
+in the background and their answers are thrown away. Either way, a part which is still running
+keeps its slot until it finishes, so cancelled requests can't push more than max_pending parts
+into the pool.
+"""
+import asyncio
+import concurrent.futures
+import contextlib
+import io
+import os
+import signal
+import threading
+import time
+
+import aoc
+import batch
+
+# Parts which take long enough to be worth sending to another process, as (day, part)
+HEAVY_PARTS = {(11, '2'), (15, '2'), (15, 'solve'), (16, '2'), (16, '2_Cheating'),
+               (16, 'solve'), (17, '2'), (17, 'solve'), (19, '1'), (19, '2'), (19, 'solve'),
+               (20, '2'), (20, 'solve'), (23, '2'), (23, 'solve'), (24, '1'), (24, '1and2'),
+               (24, 'solve')}
+
+class SolveError(Exception):
+    """
+    Raised when a part fails, with the error from the part as its message.
+    """
+
+def _run_part(day: int, part: str, source, kwargs: dict, deadline: float=None) -> aoc.RunResult:
+    """
+    Run a single part inside a worker process or the background thread, unless its deadline (a
+    time.time() value) has already passed while it was queued. In a worker process, the output of
+    the part is hidden and the deadline is enforced with SIGALRM, as in batch.run_job.
+    """
+    timeout = None if deadline is None else deadline - time.time()
+    if timeout is not None and timeout <= 0:
+        raise batch.JobTimeout()
+    in_main_thread = threading.current_thread() is threading.main_thread()
+    use_alarm = in_main_thread and timeout and hasattr(signal, 'setitimer')
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, batch._raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        # Only hide the output of worker processes, since redirecting it from the thread would
+        # also hide the output of the event loop
+        with contextlib.redirect_stdout(io.StringIO()) if in_main_thread else \
+             contextlib.nullcontext():
+            return aoc.run_part(day, part, source, **kwargs)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+async def read_source(source):
+    """
+    Read an input which can only be read asynchronously (an asyncio.StreamReader or any async
+    iterable of lines) into a list of lines, without blocking the event loop. Anything else is
+    returned unchanged.
+
+    Parameters
+    ----------
+    source : str, os.PathLike, asyncio.StreamReader, async iterable or any input
+        The input.
+
+    Returns
+    -------
+    source : list(str) or any input
+        The lines of the input if it was read, or the input itself.
+
+    """
+    if isinstance(source, asyncio.StreamReader):
+        lines = []
+        while True:
+            line = await source.readline()
+            if not line:
+                break
+            lines.append(line.decode().rstrip('\r\n'))
+        return lines
+    if hasattr(source, '__aiter__'):
+        lines = []
+        async for line in source:
+            if isinstance(line, (bytes, bytearray)):
+                line = line.decode()
+            lines.append(line.rstrip('\r\n'))
+        return lines
+
+    return source
+
+class AsyncSolver:
+    """
+    Class sending parts to a pool of worker processes (or a background thread), with at most
+    max_pending requests sent off at any one time. The number currently sent off is kept in
+    pending.
+    """
+
+    def __init__(self, workers: int=None, max_pending: int=None, days: list=None,
+                 heavy_parts: set=HEAVY_PARTS, cache_directory: str=None):
+        """
+        Parameters
+        ----------
+        workers : int or NoneType, optional
+            Number of worker processes, if None then one per CPU.
+            The default is None.
+        max_pending : int or NoneType, optional
+            Number of requests which can be sent off at once, if None then twice the number of
+            workers, so each worker has a part queued up behind the one it is running.
+            The default is None.
+        days : list(int) or NoneType, optional
+            The days each worker imports when it starts, if None then every day.
+            The default is None.
+        heavy_parts : set(tuple(int, str)), optional
+            The (day, part) pairs to send to the worker processes.
+            The default is HEAVY_PARTS.
+        cache_directory : str or NoneType, optional
+            Directory for the parsed input cache shared by the workers, an empty string for the
+            default directory, or None to not use the cache.
+            The default is None.
+
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2*self.workers
+        self.days = sorted(aoc.find_days()) if days is None else list(days)
+        self.heavy_parts = heavy_parts
+        self.cache_directory = cache_directory
+        # The semaphore belongs to the event loop it is first used in, so a new one is made for
+        # each event loop the solver is used from (e.g. each asyncio.run)
+        self._semaphore = None
+        self._loop = None
+        self.pending = 0
+        # The executors are only started when first needed
+        self._processes = None
+        self._thread = None
+
+    def _slots(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        """
+        Find the semaphore limiting the requests sent off from an event loop, making a new one if
+        the solver was last used from a different event loop.
+        """
+        if self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+            self._loop = loop
+            self.pending = 0
+        return self._semaphore
+
+    def _executor(self, day: int, part: str) -> concurrent.futures.Executor:
+        """
+        Find the executor to run a part in, starting it if needed.
+        """
+        if (day, str(part)) in self.heavy_parts:
+            if self._processes is None:
+                self._processes = concurrent.futures.ProcessPoolExecutor(
+                    self.workers, initializer=batch._warm_up,
+                    initargs=(self.days, self.cache_directory))
+            return self._processes
+        if self._thread is None:
+            self._thread = concurrent.futures.ThreadPoolExecutor(1, 'aio-solver')
+        return self._thread
+
+    async def run(self, day: int, part: str='solve', source=None, timeout: float=None,
+                  **kwargs) -> aoc.RunResult:
+        """
+        Run a single part of a single day, waiting for a free slot first if max_pending requests
+        are already sent off.
+
+        Parameters
+        ----------
+        day : int
+            The day to run.
+        part : str, optional
+            The part to run, e.g. '1', '2', '1and2' or 'solve'.
+            The default is 'solve'.
+        source : str, os.PathLike, asyncio.StreamReader, async iterable or NoneType, optional
+            The input, if None then the default of the part is used.
+            The default is None.
+        timeout : float or NoneType, optional
+            Deadline in seconds for the whole request, if None then no deadline.
+            The default is None.
+        **kwargs
+            Any extra keyword arguments for the DayN_PartM function.
+
+        Raises
+        ------
+        asyncio.TimeoutError
+            If the deadline passes before the part has finished.
+        SolveError
+            If the part fails.
+
+        Returns
+        -------
+        result : aoc.RunResult
+            The answer, along with the parse and solve times in seconds.
+
+        """
+        loop = asyncio.get_running_loop()
+        # The deadline is kept as a wall clock time, which the worker processes can also check
+        deadline = None if timeout is None else time.time() + timeout
+        remaining = lambda: None if deadline is None else max(deadline - time.time(), 0.001)
+        semaphore = self._slots(loop)
+
+        # Wait for a free slot, which is the backpressure on callers when the pool is saturated
+        await asyncio.wait_for(semaphore.acquire(), remaining())
+        self.pending += 1
+        released = False
+
+        def release():
+            nonlocal released
+            if not released and semaphore is self._semaphore:
+                self.pending -= 1
+                semaphore.release()
+            released = True
+
+        def release_threadsafe(future):
+            try:
+                loop.call_soon_threadsafe(release)
+            except RuntimeError:
+                # The event loop has already closed, along with its semaphore
+                pass
+
+        try:
+            source = await asyncio.wait_for(read_source(source), remaining())
+            executor = self._executor(day, part)
+            future = executor.submit(_run_part, day, str(part), source, kwargs, deadline)
+        except BaseException:
+            release()
+            raise
+        # The slot is only given back once the part has finished (or been dropped from the
+        # queue), even if the request is cancelled or times out while it is still running
+        future.add_done_callback(release_threadsafe)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), remaining())
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            # Drop the part from the queue if it hasn't started yet
+            future.cancel()
+            raise
+        except batch.JobTimeout:
+            raise asyncio.TimeoutError() from None
+        except concurrent.futures.process.BrokenProcessPool:
+            # A worker died, so start a new pool for the next request
+            self._processes = None
+            raise SolveError(f'Day {day} Part {part}: worker process died') from None
+        except Exception as e:
+            raise SolveError(f'Day {day} Part {part}: {e!r}') from e
+
+    async def solve(self, day: int, part: str='solve', source=None, timeout: float=None,
+                    **kwargs):
+        """
+        Find the answer of a single part of a single day, see AsyncSolver.run.
+
+        Returns
+        -------
+        answer : object
+            The answer returned by the part.
+
+        """
+        return (await self.run(day, part, source, timeout, **kwargs)).answer
+
+    def shutdown(self, wait: bool=True) -> None:
+        """
+        Shut down the worker processes and the background thread, dropping any parts which haven't
+        started yet.
+
+        Parameters
+        ----------
+        wait : bool, optional
+            Whether to wait for the running parts to finish.
+            The default is True.
+
+        Returns
+        -------
+        None
+
+        """
+        for executor in (self._processes, self._thread):
+            if executor is not None:
+                executor.shutdown(wait=wait, cancel_futures=True)
+        self._processes = self._thread = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        # Shutting down waits for the running parts, so do it off the event loop
+        await asyncio.to_thread(self.shutdown)
+
+# Solver shared by the module level functions, started when first needed
+_default = None
+
+async def solve(day: int, part: str='solve', source=None, timeout: float=None, **kwargs):
+    """
+    Find the answer of a single part of a single day, using a solver shared by the whole process
+    (see AsyncSolver.run).
+
+    Parameters
+    ----------
+    day : int
+        The day to run.
+    part : str, optional
+        The part to run, e.g. '1', '2', '1and2' or 'solve'.
+        The default is 'solve'.
+    source : str, os.PathLike, asyncio.StreamReader, async iterable or NoneType, optional
+        The input, if None then the default of the part is used.
+        The default is None.
+    timeout : float or NoneType, optional
+        Deadline in seconds for the whole request, if None then no deadline.
+        The default is None.
+    **kwargs
+        Any extra keyword arguments for the DayN_PartM function.
+
+    Returns
+    -------
+    answer : object
+        The answer returned by the part.
+
+    """
+    global _default
+    if _default is None:
+        _default = AsyncSolver()
+
+    return await _default.solve(day, part, source, timeout, **kwargs)
+
+def shutdown() -> None:
+    """
+    Shut down the solver shared by the module level functions, if it was started.
+
+    Returns
+    -------
+    None
+
+    """
+    global _default
+    if _default is not None:
+        _default.shutdown()
+        _default = None
@@ -0,0 +1,390 @@
+"""
+Single entry point for running the solutions for any day, either from the command line or from
+Python. The modules are found by filename, so only the module for the requested day is ever
+imported (no sympy unless Day 21 is asked for, no tqdm unless Day 15 is...), and the time spent
+parsing the input file is reported separately from the time spent solving.
+
+Usage: python aoc.py day [--part PART] [--input INPUT_FILE] [--arg NAME=VALUE] [--cache]
+                         [--profile [FILE]] [--memory [FILE]] [--memory-limit MIB]
+                         [--memo [DATABASE] | --no-memo] [--telemetry [FILE]]
+                         [--telemetry-interval SECONDS]
+"""
+import argparse
+import ast
+import contextlib
+import glob
+import importlib.util
+import os
+import re
+import sys
+import time
+import typing
+
+import profiling
+import telemetry
+
+# Directory containing the DayN modules
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Names of the functions each day uses to parse its input file
+PARSERS = ('get_input', 'get_elf_totals', 'get_rounds')
+
+class RunResult(typing.NamedTuple):
+    """
+    Class describing the result of running one part of one day, with the time spent in each phase.
+    """
+    day: int
+    part: str
+    answer: object
+    parse_time: float
+    solve_time: float
+
+def jsonable(answer):
+    """
+    Convert an answer into something which can be written as JSON, since some parts return numpy
+    integers, tuples or fractions rather than plain Python values.
+
+    Parameters
+    ----------
+    answer : object
+        The answer returned by a DayN_PartM function.
+
+    Returns
+    -------
+    value : int, float, str, bool, list or NoneType
+        The answer as a JSON compatible value, falling back to its str() if there is no better
+        equivalent.
+
+    """
+    if answer is None or isinstance(answer, (bool, int, float, str)):
+        return answer
+    if isinstance(answer, (list, tuple)):
+        return [jsonable(a) for a in answer]
+    # numpy scalars can be converted to the matching Python type
+    if hasattr(answer, 'item') and getattr(answer, 'shape', None) == ():
+        return jsonable(answer.item())
+
+    return str(answer)
+
+def find_days() -> dict:
+    """
+    Find the module file for every day, without importing any of them.
+
+    Returns
+    -------
+    days : dict(int: str)
+        Dictionary of the form (day: module_path), e.g. {1: '.../Day1/Day1.py', 2: '.../Day2.py'}.
+
+    """
+    days = {}
+    # Most days live in the top directory, but some (Day 1) have their own directory
+    for path in glob.glob(os.path.join(ROOT, 'Day*.py')) + \
+                glob.glob(os.path.join(ROOT, 'Day*', 'Day*.py')):
+        match = re.fullmatch(r'Day(\d+)\.py', os.path.basename(path))
+        if match:
+            days[int(match.group(1))] = path
+
+    return dict(sorted(days.items()))
+
+def load_day(day: int):
+    """
+    Import the module for a single day, reusing it if it has already been imported.
+
+    Parameters
+    ----------
+    day : int
+        The day to import.
+
+    Raises
+    ------
+    ValueError
+        If there is no module for the given day.
+
+    Returns
+    -------
+    module : module
+        The imported DayN module.
+
+    """
+    name = f'Day{day}'
+    if name in sys.modules:
+        return sys.modules[name]
+
+    days = find_days()
+    if day not in days:
+        raise ValueError(f'No solution found for day {day}')
+
+    # Make sure the DayN modules can import anything else in the top directory
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    spec = importlib.util.spec_from_file_location(name, days[day])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+
+    return module
+
+def find_parts(day: int, all_parts: bool=False) -> dict:
+    """
+    Find the DayN_PartM functions for a given day.
+
+    Parameters
+    ----------
+    day : int
+        The day to find the solutions for.
+    all_parts : bool, optional
+        Whether to include alternative versions of each part, e.g. Day1_Part1_one_line or
+        Day16_Part2_Cheating, and DayN_solve (as part 'solve'), as well as the main ones.
+        The default is False.
+
+    Returns
+    -------
+    parts : dict(str: function)
+        Dictionary of the form (part: function), e.g. {'1': Day8_Part1, '2': Day8_Part2}.
+
+    """
+    module = load_day(day)
+    parts = {}
+    for name, function in vars(module).items():
+        match = re.fullmatch(rf'Day{day}_Part(\w+)', name)
+        # Main parts are just numbers, or combined parts like Day24_Part1and2
+        if match and callable(function) and \
+            (all_parts or re.fullmatch(r'\d+(and\d+)?', match.group(1))):
+            parts[match.group(1)] = function
+    # DayN_solve answers both parts from a single parse
+    if all_parts and callable(getattr(module, f'Day{day}_solve', None)):
+        parts['solve'] = getattr(module, f'Day{day}_solve')
+
+    return parts
+
+def run_part(day: int, part: str, input_file: str=None, **kwargs) -> RunResult:
+    """
+    Run a single part of a single day, timing the parsing of the input file separately from the
+    rest of the solution.
+
+    Parameters
+    ----------
+    day : int
+        The day to run.
+    part : str
+        The part to run, e.g. '1', '2', '1and2' or 'solve'.
+    input_file : str or NoneType, optional
+        Input file to run on. If None, the default of the DayN_PartM function is used.
+        The default is None.
+    **kwargs
+        Any extra keyword arguments for the DayN_PartM function.
+
+    Raises
+    ------
+    ValueError
+        If the given part does not exist for the given day.
+
+    Returns
+    -------
+    result : RunResult
+        The answer, along with the parse and solve times in seconds.
+
+    """
+    module = load_day(day)
+    parts = find_parts(day, all_parts=True)
+    if str(part) not in parts:
+        raise ValueError(f'No part {part} found for day {day}, options are {list(parts)}')
+    if input_file is not None:
+        kwargs['input_file'] = input_file
+
+    # Temporarily swap the module's parser for a timed version, since DayN_PartM looks it up in
+    # the module namespace each time it is called
+    parse_times = []
+    originals = {name: getattr(module, name) for name in PARSERS if hasattr(module, name)}
+
+    def timed(parser):
+        def timed_parser(*args, **parser_kwargs):
+            start = time.perf_counter()
+            try:
+                with profiling.phase('parse'):
+                    return parser(*args, **parser_kwargs)
+            finally:
+                parse_times.append(time.perf_counter() - start)
+        return timed_parser
+
+    for name, parser in originals.items():
+        setattr(module, name, timed(parser))
+    try:
+        start = time.perf_counter()
+        # Label the part in the collapsed stacks, memory figures and telemetry events, if these are
+        # being recorded
+        with profiling.phase(f'Day{day}_Part{part}'), telemetry.run(f'Day{day}_Part{part}'):
+            answer = parts[str(part)](**kwargs)
+        total_time = time.perf_counter() - start
+    finally:
+        for name, parser in originals.items():
+            setattr(module, name, parser)
+
+    parse_time = sum(parse_times)
+    return RunResult(day, str(part), answer, parse_time, total_time - parse_time)
+
+def run(day: int, parts: list=None, input_file: str=None, **kwargs) -> list:
+    """
+    Run several parts of a single day.
+
+    Parameters
+    ----------
+    day : int
+        The day to run.
+    parts : list(str) or NoneType, optional
+        The parts to run. If None, every main part for the day is run.
+        The default is None.
+    input_file : str or NoneType, optional
+        Input file to run on. If None, the default of each DayN_PartM function is used.
+        The default is None.
+    **kwargs
+        Any extra keyword arguments for the DayN_PartM functions.
+
+    Returns
+    -------
+    results : list(RunResult)
+        The result of each part, in order.
+
+    """
+    if parts is None:
+        parts = list(find_parts(day))
+
+    return [run_part(day, part, input_file, **kwargs) for part in parts]
+
+def parse_arg(arg: str) -> tuple:
+    """
+    Convert a command line argument of the form NAME=VALUE into a keyword argument, where VALUE is
+    evaluated as a Python literal if possible, and otherwise left as a string.
+
+    Parameters
+    ----------
+    arg : str
+        The argument, e.g. 'row_of_interest=10'.
+
+    Returns
+    -------
+    name : str
+        The name of the keyword argument.
+    value : object
+        The value of the keyword argument.
+
+    """
+    name, value = arg.split('=', 1)
+    try:
+        value = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        pass
+
+    return name, value
+
+def main(argv: list=None) -> None:
+    """
+    Command line interface, run with -h for usage.
+
+    Parameters
+    ----------
+    argv : list(str) or NoneType, optional
+        Command line arguments, if None then sys.argv is used.
+        The default is None.
+
+    Returns
+    -------
+    None
+
+    """
+    parser = argparse.ArgumentParser(description='Run the Advent of Code 2022 solutions.')
+    parser.add_argument('days', type=int, nargs='*',
+                        help='Days to run (all days if none are given).')
+    parser.add_argument('-p', '--part', action='append',
+                        help='Part to run, can be repeated (all main parts if not given).')
+    parser.add_argument('-i', '--input',
+                        help='Input file (default of each part if not given), which can be '
+                             'compressed (.gz, .bz2, .xz), or - to read from stdin.')
+    parser.add_argument('-a', '--arg', action='append', default=[], type=parse_arg,
+                        help='Extra keyword argument for the part functions, as NAME=VALUE.')
+    parser.add_argument('-l', '--list', action='store_true',
+                        help='List the available parts for each day instead of running them.')
+    parser.add_argument('-c', '--cache', nargs='?', const='', metavar='DIRECTORY',
+                        help='Cache the parsed inputs on disk (see input_cache.py).')
+    parser.add_argument('--profile', nargs='?', const='', metavar='FILE',
+                        help='Report the calls and times of the hot functions (see profiling.py), '
+                             'and write a collapsed stack file for a flame graph to FILE.')
+    parser.add_argument('--memory', nargs='?', const='', metavar='FILE',
+                        help='Report the peak memory and top allocation sites of each phase of '
+                             'each part using tracemalloc (see profiling.py), and write them to '
+                             'FILE as JSON.')
+    parser.add_argument('--memory-limit', type=float, metavar='MIB',
+                        help='With --memory, exit with an error if any part peaks more than this '
+                             'far above the memory in use before it started.')
+    parser.add_argument('--telemetry', nargs='?', const='', metavar='FILE',
+                        help='Write progress events for each part as JSON lines to FILE (see '
+                             'telemetry.py), or to stderr if no FILE is given.')
+    parser.add_argument('--telemetry-interval', type=float, default=1.0, metavar='SECONDS',
+                        help='Minimum time between progress events for each part (default 1).')
+    memo_group = parser.add_mutually_exclusive_group()
+    memo_group.add_argument('-m', '--memo', nargs='?', const='', metavar='DATABASE',
+                            help='Reuse the answers of previous runs (see memo.py).')
+    memo_group.add_argument('--no-memo', action='store_true',
+                            help='Always solve, even if AOC_MEMO is set.')
+    args = parser.parse_args(argv)
+
+    if args.cache is not None:
+        import input_cache
+        input_cache.enable(args.cache or None)
+    import memo
+    if args.memo is not None:
+        memo.enable(args.memo or None)
+    elif args.no_memo:
+        memo.disable()
+
+    days = list(args.days or find_days())
+    input_file = args.input
+    # stdin can only be read once, so keep its lines if more than one part will parse them
+    if input_file == '-' and not (len(days) == 1 and args.part and len(args.part) == 1):
+        import inputs
+        input_file = list(inputs.iter_lines('-'))
+    with contextlib.ExitStack() as stack:
+        if args.profile is not None:
+            # The marked functions are only swapped if their modules are already imported
+            for day in days:
+                load_day(day)
+            prof = stack.enter_context(profiling.profile())
+        if args.memory is not None:
+            trace = stack.enter_context(profiling.trace_memory())
+        if args.telemetry is not None:
+            writer = telemetry.JsonLinesWriter(args.telemetry or None)
+            stack.callback(writer.close)
+            stack.enter_context(telemetry.listen(writer, args.telemetry_interval))
+        for day in days:
+            if args.list:
+                print(f'Day {day}: ' + ', '.join(find_parts(day, all_parts=True)))
+                continue
+            for result in run(day, args.part, input_file, **dict(args.arg)):
+                print(f'Day {result.day} Part {result.part}: {result.answer} '
+                      f'(parse {result.parse_time*1000:.2f} ms, '
+                      f'solve {result.solve_time*1000:.2f} ms)')
+
+    if memo.is_enabled():
+        print(f'memo: {memo.stats["hits"]} hits, {memo.stats["misses"]} misses', file=sys.stderr)
+    if args.profile is not None:
+        print(prof.report(), file=sys.stderr)
+        if args.profile:
+            prof.write_collapsed(args.profile)
+    if args.memory is not None:
+        print(trace.report(), file=sys.stderr)
+        if args.memory:
+            trace.write_json(args.memory)
+        if args.memory_limit is not None:
+            # Only the parts themselves, since their phases peak no higher
+            over = [path for path, record in trace.phases.items() if ';' not in path and \
+                    record['peak_increase'] > args.memory_limit*2**20]
+            if over:
+                sys.exit(f'Memory limit of {args.memory_limit} MiB exceeded by ' +
+                         ', '.join(over))
+
+if __name__ == '__main__':
+    main()
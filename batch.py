@@ -0,0 +1,283 @@
+"""
+Batch mode for running many (day, part, input_file) jobs over a pool of worker processes. Each
+worker imports the day modules it will need once when it starts, every job has its own time limit,
+and the results are streamed out as JSON lines in the order they finish.
+
+The manifest is a JSON lines file with one job per line, e.g.
+    {"day": 15, "part": "2", "input_file": "Inputs/Day15_Inputs.txt", "timeout": 600}
+    {"day": 15, "part": "1", "input_file": "in.txt", "kwargs": {"row_of_interest": 10}}
+where only "day" is required, "part" defaults to "solve" and "input_file" to the default of the part.
+
+While the jobs run, --telemetry FILE has every worker append the progress events of its jobs
+(see telemetry.py) to FILE as JSON lines, each with the index of its job and the worker's pid, so
+a scheduler following the file can estimate when each job will finish and kill runaway jobs.
+
+Usage: python batch.py MANIFEST [--output RESULTS] [--workers N] [--timeout SECONDS] [--cache]
+                       [--telemetry FILE] [--telemetry-interval SECONDS]
+"""
+import argparse
+import concurrent.futures
+import contextlib
+import io
+import json
+import os
+import signal
+import sys
+import time
+import typing
+
+import aoc
+import lazy
+import telemetry
+
+class Job(typing.NamedTuple):
+    """
+    Class describing a single job in a batch, where index is its position in the manifest.
+    """
+    index: int
+    day: int
+    part: str = 'solve'
+    input_file: str = None
+    kwargs: dict = {}
+    timeout: float = None
+
+class JobTimeout(BaseException):
+    """
+    Raised inside a worker when a job runs for longer than its time limit. Like KeyboardInterrupt,
+    it isn't an Exception, so that the except Exception blocks inside the solutions and caches
+    (e.g. around pickling in input_cache and memo) can't swallow it.
+    """
+
+def read_manifest(lines) -> list:
+    """
+    Parse the lines of a JSON lines manifest into a list of jobs, skipping blank lines.
+
+    Parameters
+    ----------
+    lines : iterable(str)
+        The lines of the manifest, e.g. an open file.
+
+    Raises
+    ------
+    ValueError
+        If a line is not valid JSON, or does not give a day.
+
+    Returns
+    -------
+    jobs : list(Job)
+        The jobs in the manifest, in order.
+
+    """
+    jobs = []
+    for line_num, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            job = json.loads(line)
+            jobs.append(Job(len(jobs), int(job['day']), str(job.get('part', 'solve')),
+                            job.get('input_file'), job.get('kwargs', {}), job.get('timeout')))
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f'Invalid job on line {line_num} of the manifest: {e!r}') from None
+
+    return jobs
+
+def _warm_up(days: list, cache_directory: str, telemetry_path: str=None,
+             telemetry_interval: float=1.0) -> None:
+    """
+    Initializer for each worker process, which imports the modules for the given days up front,
+    along with the modules they only import when first used (numpy, sympy, tqdm..., see
+    lazy.preload), so that the first job for each day doesn't pay for the imports.
+
+    Parameters
+    ----------
+    days : list(int)
+        The days to import.
+    cache_directory : str or NoneType
+        Directory of the parsed input cache to use, or None to leave the cache alone. An empty
+        string uses the default directory.
+    telemetry_path : str or NoneType, optional
+        File to append the telemetry events to, or None to not send any.
+        The default is None.
+    telemetry_interval : float, optional
+        Minimum time in seconds between progress events for each job.
+        The default is 1.
+
+    Returns
+    -------
+    None
+
+    """
+    # Leave interrupting the batch to the parent process
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if cache_directory is not None:
+        import input_cache
+        input_cache.enable(cache_directory or None)
+    if telemetry_path is not None:
+        telemetry.subscribe(telemetry.JsonLinesWriter(telemetry_path), telemetry_interval)
+    for day in days:
+        # Any errors importing a day are reported by the jobs for that day instead
+        try:
+            aoc.load_day(day)
+        except Exception:
+            pass
+    lazy.preload()
+
+def _raise_timeout(signum, frame):
+    raise JobTimeout()
+
+def run_job(job: Job) -> dict:
+    """
+    Run a single job, catching any errors so that one bad input doesn't stop the batch. The time
+    limit is enforced with SIGALRM, so it can only interrupt Python code, and isn't available on
+    platforms without it (Windows).
+
+    Parameters
+    ----------
+    job : Job
+        The job to run.
+
+    Returns
+    -------
+    result : dict
+        The job, along with the answer, anything it printed, the parse and solve times in
+        seconds, the worker pid and an error message (None if it succeeded).
+
+    """
+    result = {'index': job.index, 'day': job.day, 'part': job.part, 'input_file': job.input_file,
+              'answer': None, 'output': '', 'parse_time': None, 'solve_time': None,
+              'wall_time': None, 'error': None, 'worker': os.getpid()}
+    use_alarm = job.timeout and hasattr(signal, 'setitimer')
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, job.timeout)
+    # Some parts print their answers (Day10_Part2), which would corrupt the streamed results
+    output = io.StringIO()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(output), \
+             telemetry.tagged(job=job.index, worker=result['worker']):
+            run_result = aoc.run_part(job.day, job.part, job.input_file, **job.kwargs)
+        result['answer'] = aoc.jsonable(run_result.answer)
+        result['parse_time'] = run_result.parse_time
+        result['solve_time'] = run_result.solve_time
+    except JobTimeout:
+        result['error'] = f'Timed out after {job.timeout} s'
+    except Exception as e:
+        result['error'] = repr(e)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    result['wall_time'] = time.perf_counter() - start
+    result['output'] = output.getvalue()
+
+    return result
+
+def run_batch(jobs: list, workers: int=None, timeout: float=None, cache_directory: str=None,
+              telemetry_path: str=None, telemetry_interval: float=1.0):
+    """
+    Run a list of jobs over a pool of worker processes, yielding the results as they finish.
+    Only a few jobs per worker are submitted at a time, so that huge manifests don't all sit in
+    the pool's queue at once, and each result can be written out as soon as it is ready.
+
+    Parameters
+    ----------
+    jobs : list(Job)
+        The jobs to run.
+    workers : int or NoneType, optional
+        Number of worker processes, if None then one per CPU.
+        The default is None.
+    timeout : float or NoneType, optional
+        Time limit in seconds for jobs which don't give their own, if None then no limit.
+        The default is None.
+    cache_directory : str or NoneType, optional
+        Directory for the parsed input cache shared by the workers, an empty string for the
+        default directory, or None to not use the cache.
+        The default is None.
+    telemetry_path : str or NoneType, optional
+        File for the workers to append the telemetry events of the jobs to as JSON lines, or None
+        to not send any.
+        The default is None.
+    telemetry_interval : float, optional
+        Minimum time in seconds between progress events for each job.
+        The default is 1.
+
+    Yields
+    ------
+    result : dict
+        The result of each job, as returned by run_job, in the order they finish.
+
+    """
+    workers = workers or os.cpu_count() or 1
+    jobs = [job if job.timeout is not None else job._replace(timeout=timeout) for job in jobs]
+    days = sorted({job.day for job in jobs} & set(aoc.find_days()))
+    pending = iter(jobs)
+    with concurrent.futures.ProcessPoolExecutor(workers, initializer=_warm_up,
+                                                initargs=(days, cache_directory, telemetry_path,
+                                                          telemetry_interval)) as executor:
+        running = set()
+        while True:
+            # Keep every worker busy, with a couple of jobs queued up behind it
+            for job in pending:
+                running.add(executor.submit(run_job, job))
+                if len(running) >= 3*workers:
+                    break
+            if not running:
+                break
+            done, running = concurrent.futures.wait(running,
+                                                    return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+def main(argv: list=None) -> None:
+    """
+    Command line interface, run with -h for usage.
+
+    Parameters
+    ----------
+    argv : list(str) or NoneType, optional
+        Command line arguments, if None then sys.argv is used.
+        The default is None.
+
+    Returns
+    -------
+    None
+
+    """
+    parser = argparse.ArgumentParser(description='Run a manifest of jobs over many processes.')
+    parser.add_argument('manifest', help='JSON lines file of jobs, or - to read from stdin.')
+    parser.add_argument('-o', '--output', help='JSON lines file for the results (default stdout).')
+    parser.add_argument('-j', '--workers', type=int, help='Number of worker processes.')
+    parser.add_argument('-t', '--timeout', type=float,
+                        help='Time limit in seconds for jobs which do not give their own.')
+    parser.add_argument('-c', '--cache', nargs='?', const='', metavar='DIRECTORY',
+                        help='Cache the parsed inputs on disk (see input_cache.py).')
+    parser.add_argument('--telemetry', metavar='FILE',
+                        help='File to append the progress events of the jobs to as JSON lines '
+                             '(see telemetry.py).')
+    parser.add_argument('--telemetry-interval', type=float, default=1.0, metavar='SECONDS',
+                        help='Minimum time between progress events for each job (default 1).')
+    args = parser.parse_args(argv)
+
+    if args.manifest == '-':
+        jobs = read_manifest(sys.stdin)
+    else:
+        with open(args.manifest) as f:
+            jobs = read_manifest(f)
+
+    out = open(args.output, 'w') if args.output else sys.stdout
+    failed = 0
+    try:
+        for result in run_batch(jobs, args.workers, args.timeout, args.cache, args.telemetry,
+                                args.telemetry_interval):
+            failed += result['error'] is not None
+            out.write(json.dumps(result) + '\n')
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f'{len(jobs) - failed}/{len(jobs)} jobs succeeded', file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,506 @@
+"""
+Benchmark suite running every DayN_PartM over seeded synthetic inputs of increasing size (from
+generators.py), recording the wall time, the time spent parsing, the peak memory and the fitted
+scaling exponent (time ~ size^k) of each part, and saving everything to a JSON baseline.
+
+With --search, the searches of search.py are instead compared against the list.pop(0) breadth-
+first search the solutions used before, on open n x n grids.
+
+With --imports, the cold start of each day is measured instead: the time for a fresh interpreter
+to import the day, and to import it and run its first part on the smallest input, against the time
+for a fresh interpreter to do nothing at all, along with which of the heavy dependencies (numpy,
+sympy and tqdm, see lazy.py) each of these ended up importing.
+
+By default the sizes run from about the size of the puzzle inputs up, so that the whole suite runs
+in minutes, while --scale production uses sizes 10-1000x larger, at the scale of the production
+inputs (e.g. Day 6 datastreams of up to 1e9 characters), which takes far longer.
+
+Usage: python benchmark.py [days] [--sizes N N ...] [--scale default|production] [--repeat R]
+                           [--output FILE]
+       python benchmark.py --search [--sizes N N ...] [--repeat R]
+       python benchmark.py --imports [days] [--sizes N] [--repeat R]
+"""
+import argparse
+import ast
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import aoc
+import generators
+import memo
+import search
+
+# Default input sizes for each day, chosen so the smallest is near the size of the real puzzle
+# input and each size is ~4x the last
+DEFAULT_SIZES = {1: [2500, 10000, 40000], 2: [2500, 10000, 40000], 3: [300, 1200, 4800],
+                 4: [1000, 4000, 16000], 5: [500, 2000, 8000], 6: [4000, 16000, 64000],
+                 7: [250, 1000, 4000], 8: [25, 50, 100], 9: [500, 2000, 8000],
+                 10: [150, 600, 2400], 11: [8, 16, 32], 12: [20, 40, 80], 13: [150, 600, 2400],
+                 14: [25, 50, 100], 15: [25, 50, 100], 16: [15, 60, 240], 17: [250, 1000, 4000],
+                 18: [250, 500, 1000], 19: [1, 2, 4], 20: [500, 1000, 2000], 21: [50, 100, 200],
+                 22: [10, 20, 40], 23: [20, 40, 80], 24: [5, 10, 20], 25: [100, 400, 1600]}
+
+# Input sizes at the scale of the production inputs, 10-1000x larger than the puzzle inputs (e.g.
+# Day 6 datastreams of 1e6-1e9 characters, Day 18 droplets of 1e5 cubes, Day 20 lists of 1e5
+# numbers). The largest inputs take minutes to generate and GBs of memory (about 2 GB for the
+# largest Day 6 datastream), and the searches (Days 16, 19 and 24) only get as far as --max-time
+# allows
+PRODUCTION_SIZES = {1: [25000, 250000, 2500000], 2: [25000, 250000, 2500000],
+                    3: [3000, 30000, 300000], 4: [10000, 100000, 1000000],
+                    5: [5000, 50000, 500000], 6: [10**6, 10**7, 10**8, 10**9],
+                    7: [2500, 25000, 250000], 8: [250, 1000, 4000], 9: [5000, 50000, 500000],
+                    10: [1500, 15000, 150000], 11: [80, 320, 1280], 12: [200, 800, 3200],
+                    13: [1500, 15000, 150000], 14: [250, 1000, 4000], 15: [250, 2500, 25000],
+                    16: [60, 240, 676], 17: [2500, 25000, 250000], 18: [10**4, 3*10**4, 10**5],
+                    19: [10, 30, 100], 20: [10**4, 3*10**4, 10**5], 21: [500, 5000, 50000],
+                    22: [100, 400, 1600], 23: [100, 200, 400], 24: [20, 40, 80],
+                    25: [1000, 10000, 100000]}
+
+# Size sets selected by --scale
+SCALES = {'default': DEFAULT_SIZES, 'production': PRODUCTION_SIZES}
+
+# Extra keyword arguments for parts which need them, as functions of the input size
+PART_KWARGS = {(9, '2'): lambda size: {'output_path': False},
+               (15, '1'): lambda size: {'row_of_interest': 2000},
+               (15, '2'): lambda size: {'possible_coords': aoc.load_day(15).RangeSet([(0, 4000)])}}
+
+# Dependencies which are slow to import, and which the days only import on first use
+HEAVY_MODULES = ('numpy', 'sympy', 'tqdm')
+
+# Python snippet importing a day (and possibly running a part), then printing which of the heavy
+# dependencies were imported
+IMPORT_RUNNER = ('import sys; sys.path[:0] = [{root!r}, {directory!r}]; import {name}; {call}; '
+                 'print([m for m in {heavy!r} if m in sys.modules])')
+
+def fit_exponent(sizes: list, times: list) -> float:
+    """
+    Fit the exponent k of time ~ size^k with a least squares straight line through the points in
+    log-log space.
+
+    Parameters
+    ----------
+    sizes : list(int)
+        The input sizes.
+    times : list(float)
+        The time taken for each input size.
+
+    Returns
+    -------
+    exponent : float or NoneType
+        The fitted exponent, or None if there are fewer than two usable points.
+
+    """
+    points = [(math.log(s), math.log(t)) for s, t in zip(sizes, times) if s > 0 and t > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, y in points)/len(points)
+    mean_y = sum(y for x, y in points)/len(points)
+    var_x = sum((x - mean_x)**2 for x, y in points)
+    if var_x == 0:
+        return None
+
+    return sum((x - mean_x)*(y - mean_y) for x, y in points)/var_x
+
+def measure(day: int, part: str, input_file: str, repeat: int=1, warmup: int=0,
+            **kwargs) -> dict:
+    """
+    Measure the wall time and peak memory of a single part on a single input file. The timing
+    runs and the memory run are kept separate, since tracing memory slows everything down.
+
+    Parameters
+    ----------
+    day : int
+        The day to run.
+    part : str
+        The part to run.
+    input_file : str
+        The input file to run on.
+    repeat : int, optional
+        The number of timing runs, the fastest of which is kept.
+        The default is 1.
+    warmup : int, optional
+        The number of untimed runs made first, e.g. to fill the parser caches.
+        The default is 0.
+    **kwargs
+        Any extra keyword arguments for the DayN_PartM function.
+
+    Returns
+    -------
+    record : dict
+        The best wall_time, parse_time and solve_time in seconds and the peak_memory in bytes,
+        along with the answer and the wall time of every timing run (times).
+
+    """
+    best = None
+    times = []
+    # Some parts print their answers, so hide the output, and always solve rather than reusing the
+    # answers in the memo
+    with contextlib.redirect_stdout(io.StringIO()), memo.bypass():
+        for i in range(warmup):
+            aoc.run_part(day, part, input_file, **kwargs)
+        for i in range(repeat):
+            result = aoc.run_part(day, part, input_file, **kwargs)
+            times.append(result.parse_time + result.solve_time)
+            if best is None or result.parse_time + result.solve_time < \
+                                 best.parse_time + best.solve_time:
+                best = result
+
+        tracemalloc.start()
+        try:
+            aoc.run_part(day, part, input_file, **kwargs)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return {'wall_time': best.parse_time + best.solve_time, 'parse_time': best.parse_time,
+            'solve_time': best.solve_time, 'peak_memory': peak_memory, 'answer': str(best.answer),
+            'times': times}
+
+def run_benchmarks(days: list=None, sizes: list=None, seed: int=0, repeat: int=1,
+                   max_time: float=30.0, verbose: bool=True, scale: str='default') -> dict:
+    """
+    Run every main part of the given days over synthetic inputs of each size. Once a part takes
+    longer than max_time, larger sizes are skipped for that part.
+
+    Parameters
+    ----------
+    days : list(int) or NoneType, optional
+        The days to benchmark, if None then every day is benchmarked.
+        The default is None.
+    sizes : list(int) or NoneType, optional
+        The input sizes to use for every day, if None then the sizes of the scale are used.
+        The default is None.
+    seed : int, optional
+        Seed for the input generators.
+        The default is 0.
+    repeat : int, optional
+        The number of timing runs for each measurement.
+        The default is 1.
+    max_time : float, optional
+        The time in seconds after which larger sizes are skipped.
+        The default is 30.
+    verbose : bool, optional
+        Whether to print each measurement as it is made.
+        The default is True.
+    scale : str, optional
+        The sizes to use for each day if none are given, either 'default' (DEFAULT_SIZES, from the
+        size of the puzzle inputs up) or 'production' (PRODUCTION_SIZES).
+        The default is 'default'.
+
+    Returns
+    -------
+    baseline : dict
+        Dictionary with the machine details ('meta'), every measurement ('results') and the fitted
+        scaling exponents of each part ('scaling').
+
+    """
+    days = days or list(aoc.find_days())
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for day in days:
+            parts = list(aoc.find_parts(day))
+            too_slow = set()
+            for size in sizes or SCALES[scale][day]:
+                # Don't generate inputs which no part is going to run on
+                if too_slow.issuperset(parts):
+                    break
+                # Write the input once for all parts
+                input_file = os.path.join(directory, f'Day{day}_{size}.txt')
+                with open(input_file, 'w') as f:
+                    f.write(generators.generate(day, size, seed))
+                for part in parts:
+                    if part in too_slow:
+                        continue
+                    kwargs = PART_KWARGS.get((day, part), lambda size: {})(size)
+                    record = {'day': day, 'part': part, 'size': size,
+                              'bytes': os.path.getsize(input_file)}
+                    record.update(measure(day, part, input_file, repeat, **kwargs))
+                    results.append(record)
+                    if verbose:
+                        print(f'Day {day} Part {part} size {size}: '
+                              f'{record["wall_time"]:.4f} s '
+                              f'({record["parse_time"]:.4f} s parsing), '
+                              f'{record["peak_memory"]/1e6:.2f} MB', file=sys.stderr)
+                    if record['wall_time'] > max_time:
+                        too_slow.add(part)
+                # Free up the disk space before writing the next input
+                os.remove(input_file)
+
+    # Fit the scaling exponent for each part
+    scaling = {}
+    for day in days:
+        for part in sorted({r['part'] for r in results if r['day'] == day}):
+            records = [r for r in results if r['day'] == day and r['part'] == part]
+            scaling[f'Day{day}_Part{part}'] = {
+                'time': fit_exponent([r['size'] for r in records],
+                                     [r['wall_time'] for r in records]),
+                'memory': fit_exponent([r['size'] for r in records],
+                                       [r['peak_memory'] for r in records])}
+
+    meta = {'python': platform.python_version(), 'machine': platform.machine(),
+            'platform': platform.platform(), 'seed': seed, 'repeat': repeat, 'scale': scale,
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+    return {'meta': meta, 'results': results, 'scaling': scaling}
+
+def _list_bfs(start, neighbours):
+    # The breadth-first search previously written out in each solution, popping from the front of
+    # a list and remembering states in a set
+    queue = [(start, 0)]
+    visited = {start}
+    while queue:
+        state, distance = queue.pop(0)
+        for next_state in neighbours(state):
+            if next_state not in visited:
+                visited.add(next_state)
+                queue.append((next_state, distance + 1))
+
+    return distance
+
+def search_benchmarks(sizes: list=None, repeat: int=1, verbose: bool=True) -> list:
+    """
+    Time each search in search.py across an open n x n grid, from one corner until every square
+    has been reached, against the list.pop(0) breadth-first search it replaced.
+
+    Parameters
+    ----------
+    sizes : list(int) or NoneType, optional
+        The side lengths of the grids, if None then [50, 100, 200, 400].
+        The default is None.
+    repeat : int, optional
+        The number of timing runs for each measurement, the fastest of which is kept.
+        The default is 1.
+    verbose : bool, optional
+        Whether to print each measurement as it is made.
+        The default is True.
+
+    Returns
+    -------
+    results : list(dict)
+        The time in seconds of each search on each size of grid, along with the largest distance
+        found (which should be the same for every search).
+
+    """
+    results = []
+    for n in sizes or [50, 100, 200, 400]:
+        def neighbours(point):
+            x, y = point
+            return [(x + dx, y + dy) for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)) \
+                    if 0 <= x + dx < n and 0 <= y + dy < n]
+        weighted = lambda point: [(next_point, 1) for next_point in neighbours(point)]
+        index = lambda point: point[0]*n + point[1]
+        # Heuristic towards the far corner, which is the last square reached
+        heuristic = lambda point: 2*(n - 1) - point[0] - point[1]
+
+        searches = {'list_bfs': lambda: _list_bfs((0, 0), neighbours),
+                    'bfs_set': lambda: max(d for s, d in search.bfs([(0, 0)], neighbours)),
+                    'bfs_bytearray': lambda: max(d for s, d in search.bfs([(0, 0)], neighbours,
+                                                                          index, n*n)),
+                    'dijkstra_set': lambda: max(d for s, d in search.dijkstra([(0, 0)],
+                                                                              weighted)),
+                    'dijkstra_array': lambda: max(d for s, d in search.dijkstra([(0, 0)], weighted,
+                                                                                index=index,
+                                                                                size=n*n)),
+                    'astar': lambda: max(d for s, d in search.astar([(0, 0)], weighted, heuristic,
+                                                                    index, n*n))}
+        for name, run in searches.items():
+            best = None
+            for i in range(repeat):
+                start = time.perf_counter()
+                distance = run()
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            results.append({'search': name, 'size': n, 'time': best, 'distance': distance})
+            if verbose:
+                print(f'{name} {n}x{n}: {best:.4f} s (distance {distance})', file=sys.stderr)
+
+    return results
+
+def _time_process(code: str, repeat: int=1, timeout: float=None) -> tuple:
+    """
+    Time a fresh interpreter running a snippet of code, keeping the fastest of several runs.
+
+    Parameters
+    ----------
+    code : str
+        The code to run, whose last line of output is read as a Python literal.
+    repeat : int, optional
+        The number of runs, the fastest of which is kept.
+        The default is 1.
+    timeout : float or NoneType, optional
+        Time limit for each run in seconds, if None then no limit.
+        The default is None.
+
+    Returns
+    -------
+    wall_time : float or NoneType
+        The fastest time in seconds, or None if the code failed or timed out.
+    output : object
+        The last line of output of the fastest run, evaluated as a Python literal.
+
+    """
+    # Keep the optional caches out of the timings, since opening them imports more
+    env = {key: value for key, value in os.environ.items()
+           if key not in ('AOC_MEMO', 'AOC_INPUT_CACHE')}
+    best, output = None, None
+    for i in range(repeat):
+        start = time.perf_counter()
+        try:
+            result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                    env=env, cwd=aoc.ROOT, timeout=timeout, check=True)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+            return None, None
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+            output = ast.literal_eval(result.stdout.strip().splitlines()[-1]) \
+                     if result.stdout.strip() else None
+
+    return best, output
+
+def import_benchmarks(days: list=None, size: int=None, seed: int=0, repeat: int=5,
+                      max_time: float=30.0, verbose: bool=True) -> dict:
+    """
+    Measure the cold start of each day in a fresh interpreter: importing the day, and importing it
+    then running its first part on a synthetic input, each compared to an interpreter which does
+    nothing.
+
+    Parameters
+    ----------
+    days : list(int) or NoneType, optional
+        The days to measure, if None then every day is measured.
+        The default is None.
+    size : int or NoneType, optional
+        The input size to run the first parts on, if None then the smallest of DEFAULT_SIZES.
+        The default is None.
+    seed : int, optional
+        Seed for the input generators.
+        The default is 0.
+    repeat : int, optional
+        The number of runs of each measurement, the fastest of which is kept.
+        The default is 5.
+    max_time : float, optional
+        Time limit in seconds for each run of a first part.
+        The default is 30.
+    verbose : bool, optional
+        Whether to print each measurement as it is made.
+        The default is True.
+
+    Returns
+    -------
+    results : dict
+        The time in seconds of an interpreter doing nothing ('bare'), and for each day the time
+        taken to import it and to import it and run its first part, along with the heavy
+        dependencies imported by each ('days').
+
+    """
+    bare = _time_process('print([])', repeat)[0]
+    if verbose:
+        print(f'bare interpreter: {bare*1000:.1f} ms', file=sys.stderr)
+    results = {'bare': bare, 'days': []}
+    modules = aoc.find_days()
+    with tempfile.TemporaryDirectory() as directory:
+        for day in days or list(modules):
+            name = f'Day{day}'
+            runner = lambda call: IMPORT_RUNNER.format(
+                root=aoc.ROOT, directory=os.path.dirname(modules[day]), name=name, call=call,
+                heavy=HEAVY_MODULES)
+            record = {'day': day}
+            record['import_time'], record['import_modules'] = _time_process(runner('pass'),
+                                                                            repeat)
+
+            day_size = size or DEFAULT_SIZES[day][0]
+            input_file = os.path.join(directory, f'Day{day}_{day_size}.txt')
+            with open(input_file, 'w') as f:
+                f.write(generators.generate(day, day_size, seed))
+            part = next(iter(aoc.find_parts(day)))
+            kwargs = PART_KWARGS.get((day, part), lambda size: {})(day_size)
+            call = f'{name}.{name}_Part{part}({input_file!r}, **{kwargs!r})'
+            record['part'] = part
+            record['run_time'], record['run_modules'] = _time_process(runner(call), repeat,
+                                                                      max_time)
+            results['days'].append(record)
+            if verbose:
+                print(format_import_record(record, bare), file=sys.stderr)
+
+    return results
+
+def format_import_record(record: dict, bare: float) -> str:
+    """
+    Describe the cold start of one day, as measured by import_benchmarks.
+    """
+    describe = lambda t, modules: '-' if t is None else \
+        f'{t*1000:.1f} ms (+{(t - bare)*1000:.1f}) [{", ".join(modules) or "no heavy imports"}]'
+
+    return (f'Day {record["day"]}: import '
+            f'{describe(record["import_time"], record["import_modules"])}, '
+            f'import + Part {record["part"]} '
+            f'{describe(record["run_time"], record["run_modules"])}')
+
+def main(argv: list=None) -> None:
+    """
+    Command line interface, run with -h for usage.
+
+    Parameters
+    ----------
+    argv : list(str) or NoneType, optional
+        Command line arguments, if None then sys.argv is used.
+        The default is None.
+
+    Returns
+    -------
+    None
+
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the solutions on synthetic inputs.')
+    parser.add_argument('days', type=int, nargs='*', help='Days to run (all days if none given).')
+    parser.add_argument('-s', '--sizes', type=int, nargs='+',
+                        help='Input sizes to use for every day (defaults differ for each day).')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='default',
+                        help='Sizes to use for each day when --sizes is not given: default (from '
+                             'puzzle size up) or production (10-1000x larger, slow).')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the input generators.')
+    parser.add_argument('-r', '--repeat', type=int, default=1,
+                        help='Number of timing runs per measurement (fastest is kept).')
+    parser.add_argument('-t', '--max-time', type=float, default=30.0,
+                        help='Skip larger sizes once a part takes longer than this (seconds).')
+    parser.add_argument('-o', '--output', default='benchmark.json',
+                        help='JSON file to write the baseline to.')
+    parser.add_argument('--search', action='store_true',
+                        help='Benchmark the searches of search.py on open grids instead.')
+    parser.add_argument('--imports', action='store_true',
+                        help='Measure the cold start (import time, and time to the first answer) '
+                             'of each day in a fresh interpreter instead.')
+    args = parser.parse_args(argv)
+
+    if args.search:
+        search_benchmarks(args.sizes, args.repeat)
+        return
+    if args.imports:
+        import_benchmarks(args.days, args.sizes[0] if args.sizes else None, args.seed,
+                          max(args.repeat, 3), args.max_time)
+        return
+
+    baseline = run_benchmarks(args.days, args.sizes, args.seed, args.repeat, args.max_time,
+                              scale=args.scale)
+    with open(args.output, 'w') as f:
+        json.dump(baseline, f, indent=1)
+
+    # Summarise the scaling of each part, worst first
+    for name, exponents in sorted(baseline['scaling'].items(),
+                                  key=lambda item: -(item[1]['time'] or 0)):
+        if exponents['time'] is not None:
+            print(f'{name}: time ~ n^{exponents["time"]:.2f}, '
+                  f'memory ~ n^{exponents["memory"] or 0:.2f}')
+
+if __name__ == '__main__':
+    main()
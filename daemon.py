@@ -0,0 +1,384 @@
+"""
+Long-lived solver daemon which keeps every DayN module imported and the parsed input cache warm,
+and answers solve requests over a local Unix domain socket. This skips starting Python, importing
+numpy/sympy/tqdm and building module level tables (e.g. Day22.FACE_CONNECTIONS) on every run.
+
+Requests and responses are single lines of JSON. A request is a job in the same form as the
+manifest lines of batch.py, e.g.
+    {"day": 15, "part": "1", "input_file": "/abs/path/in.txt", "kwargs": {"row_of_interest": 10}}
+and the response is the result from batch.run_job, with the answer and the timings. The commands
+{"command": "ping"}, {"command": "stats"} and {"command": "shutdown"} are also understood. A
+connection can send any number of requests, which are answered in order. Any number of clients can
+be connected at once, and the requests waiting on each connection are answered in turn, one at a
+time.
+
+Usage: python daemon.py serve [--socket PATH] [--cache [DIRECTORY]] [--timeout SECONDS]
+       python daemon.py solve DAY [--part PART] [--input INPUT_FILE] [--arg NAME=VALUE]
+       python daemon.py stats
+       python daemon.py stop
+"""
+import argparse
+import json
+import os
+import selectors
+import socket
+import sys
+import tempfile
+import time
+
+import aoc
+import batch
+import input_cache
+import lazy
+
+# Socket used when none is given, one per user
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), f'aoc-{os.getuid()}.sock')
+
+class Connection:
+    """
+    Class holding the state of a single client connection: its socket, the bytes received which
+    don't make up a whole request yet, and the responses which haven't been sent yet.
+    """
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.received = bytearray()
+        self.unsent = bytearray()
+        # Whether the client has finished sending
+        self.finished = False
+
+    def next_request(self) -> bytes:
+        """
+        Take the next whole line received (or what is left once the client has finished sending),
+        or None if there isn't one yet.
+        """
+        end = self.received.find(b'\n')
+        if end == -1:
+            if not self.finished or not self.received:
+                return None
+            end = len(self.received)
+        line = bytes(self.received[:end])
+        del self.received[:end + 1]
+        return line
+
+class SolverServer:
+    """
+    Unix socket server which accepts any number of connections at once, reading their requests
+    with a selector, but runs the requested solutions one at a time in its own (main) thread, so
+    that the SIGALRM based time limits from batch.run_job still work, and the solutions never run
+    concurrently with each other. Connections with requests waiting take turns, one request each,
+    so a client which keeps its connection open (or sends many requests) never holds up the rest
+    for longer than one solve.
+    """
+
+    def __init__(self, socket_path: str, timeout: float=None):
+        # Clear out the socket of any previous daemon which wasn't shut down cleanly
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self.socket_path = socket_path
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(socket_path)
+        self.listener.listen()
+        self.listener.setblocking(False)
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        self.connections = []
+        self.job_timeout = timeout
+        self.requests = 0
+        self.started = time.time()
+        self.stopping = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close every connection and stop listening.
+        """
+        for connection in list(self.connections):
+            self._drop(connection)
+        self.selector.close()
+        self.listener.close()
+
+    def _drop(self, connection: Connection) -> None:
+        """
+        Close a single connection.
+        """
+        self.selector.unregister(connection.sock)
+        connection.sock.close()
+        self.connections.remove(connection)
+
+    def _send(self, connection: Connection) -> None:
+        """
+        Send as much of the unsent responses of a connection as the socket takes without blocking,
+        and only watch for the socket becoming writable while there is more left.
+        """
+        try:
+            sent = connection.sock.send(connection.unsent) if connection.unsent else 0
+        except (BlockingIOError, InterruptedError):
+            sent = 0
+        except OSError:
+            # The client has gone away, so there is no one to send the rest to
+            connection.unsent.clear()
+            connection.finished = True
+            return
+        del connection.unsent[:sent]
+        # Once the client has finished sending, only watch for the socket becoming writable, as
+        # it would otherwise be readable (at its end) all the time
+        events = (selectors.EVENT_WRITE if connection.unsent else 0) | \
+                 (0 if connection.finished else selectors.EVENT_READ)
+        self.selector.modify(connection.sock, events or selectors.EVENT_READ, connection)
+
+    def _poll(self, wait: bool) -> None:
+        """
+        Accept new connections, and receive and send whatever is ready on the existing ones,
+        waiting for something to happen if wait is given.
+        """
+        for key, events in self.selector.select(None if wait else 0):
+            if key.fileobj is self.listener:
+                try:
+                    sock, address = self.listener.accept()
+                except (BlockingIOError, InterruptedError):
+                    continue
+                sock.setblocking(False)
+                connection = Connection(sock)
+                self.connections.append(connection)
+                self.selector.register(sock, selectors.EVENT_READ, connection)
+                continue
+            connection = key.data
+            if events & selectors.EVENT_READ:
+                try:
+                    data = connection.sock.recv(2**16)
+                except (BlockingIOError, InterruptedError):
+                    data = None
+                except OSError:
+                    data = b''
+                if data == b'':
+                    connection.finished = True
+                    self._send(connection)
+                elif data:
+                    connection.received += data
+            if events & selectors.EVENT_WRITE:
+                self._send(connection)
+
+    def serve_until_shutdown(self) -> None:
+        """
+        Serve requests until one of them asks for a shutdown, answering one waiting request from
+        each connection in turn.
+        """
+        while not self.stopping:
+            # Only wait for the sockets when there are no requests waiting to be answered
+            waiting = [c for c in self.connections if b'\n' in c.received or \
+                       (c.finished and c.received)]
+            self._poll(wait=not waiting)
+            for connection in list(self.connections):
+                line = connection.next_request()
+                if line is not None and line.strip():
+                    response = self.respond(line)
+                    connection.unsent += json.dumps(response).encode() + b'\n'
+                    self._send(connection)
+                    if self.stopping:
+                        break
+                if connection.finished and not connection.received and not connection.unsent:
+                    self._drop(connection)
+
+        # Finish sending the responses, including the one to the shutdown request
+        for connection in self.connections:
+            if connection.unsent:
+                try:
+                    connection.sock.setblocking(True)
+                    connection.sock.sendall(connection.unsent)
+                except OSError:
+                    pass
+
+    def respond(self, line: bytes) -> dict:
+        """
+        Build the response to a single request line.
+
+        Parameters
+        ----------
+        line : bytes
+            The request, as a line of JSON.
+
+        Returns
+        -------
+        response : dict
+            The result of the job, or of the command.
+
+        """
+        self.requests += 1
+        try:
+            request = json.loads(line)
+            command = request.get('command', 'solve')
+        except (ValueError, AttributeError) as e:
+            return {'error': f'Invalid request: {e!r}'}
+
+        if command == 'ping':
+            return {'ok': True}
+        if command == 'stats':
+            return {'requests': self.requests, 'uptime': time.time() - self.started,
+                    'days': sorted(int(name[3:]) for name in sys.modules \
+                                   if name[:3] == 'Day' and name[3:].isdigit()),
+                    'cache': dict(input_cache.stats)}
+        if command == 'shutdown':
+            self.stopping = True
+            return {'ok': True}
+        if command != 'solve':
+            return {'error': f'Unknown command {command!r}'}
+
+        try:
+            [job] = batch.read_manifest([line.decode()])
+        except ValueError as e:
+            return {'error': str(e)}
+        if job.timeout is None:
+            job = job._replace(timeout=self.job_timeout)
+        return batch.run_job(job._replace(index=self.requests))
+
+def serve(socket_path: str=DEFAULT_SOCKET, cache_directory: str='', timeout: float=None) -> None:
+    """
+    Import every day, turn on the parsed input cache and serve requests until a shutdown request
+    is received (or the process is interrupted).
+
+    Parameters
+    ----------
+    socket_path : str, optional
+        Path of the Unix socket to listen on.
+        The default is DEFAULT_SOCKET.
+    cache_directory : str or NoneType, optional
+        Directory for the parsed input cache, an empty string for the default directory, or None
+        to not use the cache.
+        The default is ''.
+    timeout : float or NoneType, optional
+        Time limit in seconds for requests which don't give their own, if None then no limit.
+        The default is None.
+
+    Returns
+    -------
+    None
+
+    """
+    for day in aoc.find_days():
+        aoc.load_day(day)
+    # The days only import numpy, sympy and tqdm when first used, so import them now instead
+    lazy.preload()
+    if cache_directory is not None:
+        input_cache.enable(cache_directory or None)
+
+    with SolverServer(socket_path, timeout) as server:
+        try:
+            server.serve_until_shutdown()
+        finally:
+            os.unlink(socket_path)
+
+def request(message: dict, socket_path: str=DEFAULT_SOCKET) -> dict:
+    """
+    Send a single request to a running daemon and wait for the response.
+
+    Parameters
+    ----------
+    message : dict
+        The request, e.g. {'day': 8, 'part': '1', 'input_file': '/abs/path/in.txt'}.
+    socket_path : str, optional
+        Path of the daemon's Unix socket.
+        The default is DEFAULT_SOCKET.
+
+    Returns
+    -------
+    response : dict
+        The daemon's response.
+
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        with sock.makefile('rwb') as f:
+            f.write(json.dumps(message).encode() + b'\n')
+            f.flush()
+            return json.loads(f.readline())
+
+def solve(day: int, part: str='solve', input_file: str=None, socket_path: str=DEFAULT_SOCKET,
+          **kwargs) -> dict:
+    """
+    Ask a running daemon to run one part of one day.
+
+    Parameters
+    ----------
+    day : int
+        The day to run.
+    part : str, optional
+        The part to run.
+        The default is 'solve'.
+    input_file : str or NoneType, optional
+        Input file to run on, relative to the current directory rather than the daemon's. If None,
+        the default of the DayN_PartM function is used (relative to the daemon's directory).
+        The default is None.
+    socket_path : str, optional
+        Path of the daemon's Unix socket.
+        The default is DEFAULT_SOCKET.
+    **kwargs
+        Any extra keyword arguments for the DayN_PartM function, which must be JSON compatible.
+
+    Returns
+    -------
+    response : dict
+        The result of the job, as returned by batch.run_job.
+
+    """
+    message = {'day': day, 'part': str(part), 'kwargs': kwargs}
+    if input_file is not None:
+        message['input_file'] = os.path.abspath(input_file)
+
+    return request(message, socket_path)
+
+def main(argv: list=None) -> None:
+    """
+    Command line interface, run with -h for usage.
+
+    Parameters
+    ----------
+    argv : list(str) or NoneType, optional
+        Command line arguments, if None then sys.argv is used.
+        The default is None.
+
+    Returns
+    -------
+    None
+
+    """
+    parser = argparse.ArgumentParser(description='Warm solver daemon on a Unix socket.')
+    parser.add_argument('-s', '--socket', default=DEFAULT_SOCKET, help='Path of the socket.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve_parser = commands.add_parser('serve', help='Start the daemon.')
+    serve_parser.add_argument('-c', '--cache', nargs='?', const='', default='',
+                              metavar='DIRECTORY', help='Directory for the parsed input cache.')
+    serve_parser.add_argument('-t', '--timeout', type=float,
+                              help='Time limit in seconds for each request.')
+    solve_parser = commands.add_parser('solve', help='Run a part on a running daemon.')
+    solve_parser.add_argument('day', type=int, help='Day to run.')
+    solve_parser.add_argument('-p', '--part', default='solve', help='Part to run.')
+    solve_parser.add_argument('-i', '--input', help='Input file.')
+    solve_parser.add_argument('-a', '--arg', action='append', default=[], type=aoc.parse_arg,
+                              help='Extra keyword argument for the part, as NAME=VALUE.')
+    commands.add_parser('stats', help='Show the statistics of a running daemon.')
+    commands.add_parser('stop', help='Shut down a running daemon.')
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        serve(args.socket, args.cache, args.timeout)
+    elif args.command == 'solve':
+        result = solve(args.day, args.part, args.input, args.socket, **dict(args.arg))
+        print(result['output'], end='')
+        if result['error'] is not None:
+            sys.exit(result['error'])
+        print(f'Day {result["day"]} Part {result["part"]}: {result["answer"]} '
+              f'(parse {result["parse_time"]*1000:.2f} ms, '
+              f'solve {result["solve_time"]*1000:.2f} ms)')
+    elif args.command == 'stats':
+        print(json.dumps(request({'command': 'stats'}, args.socket), indent=1))
+    else:
+        request({'command': 'shutdown'}, args.socket)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,536 @@
+"""
+Seeded generators for synthetic puzzle inputs of any size, for benchmarking and stress testing the
+solutions on inputs much larger than the real puzzle inputs. Each generator takes a size parameter
+and a seed, along with optional knobs for the shape of the input (e.g. how deep the Day 7 directory
+tree is, how many Day 16 valves have a non-zero flow rate, or how wide the Day 24 valley is), and
+returns the text of an input file which the corresponding get_input can parse. The same size, seed
+and knobs always give the same input.
+
+Inputs can also be written straight to a file (compressed if it ends in .gz, .bz2 or .xz) with
+write, or from the command line.
+
+Usage: python generators.py DAY SIZE [--seed SEED] [--output FILE] [--arg NAME=VALUE]
+"""
+import argparse
+import os
+import random
+import string
+import sys
+
+def day1(size: int, seed: int=0) -> str:
+    """
+    Calories carried by ``size`` elves, each carrying 1-10 items, separated by blank lines.
+    """
+    rng = random.Random(seed)
+    elves = ['\n'.join(str(rng.randint(1000, 60000)) for i in range(rng.randint(1, 10))) \
+             for e in range(size)]
+    return '\n\n'.join(elves) + '\n'
+
+def day2(size: int, seed: int=0) -> str:
+    """
+    Strategy guide with ``size`` rounds of Rock, Paper, Scissors.
+    """
+    rng = random.Random(seed)
+    return ''.join(f'{rng.choice("ABC")} {rng.choice("XYZ")}\n' for i in range(size))
+
+def day3(size: int, seed: int=0) -> str:
+    """
+    ``size`` rucksacks (rounded up to a multiple of three), where the two compartments of each
+    rucksack share exactly one item, and each group of three rucksacks shares exactly one item.
+    """
+    rng = random.Random(seed)
+    rucksacks = []
+    for group in range((size + 2)//3):
+        letters = list(string.ascii_letters)
+        rng.shuffle(letters)
+        # One item shared by the whole group, then 17 items for each elf which no-one else has
+        badge, pools = letters[0], [letters[1 + 17*i: 18 + 17*i] for i in range(3)]
+        for pool in pools:
+            # One item shared between the compartments, the rest split between them
+            shared, first, second = pool[0], pool[1:9], pool[9:]
+            length = rng.randint(8, 24)
+            c1 = [shared, badge] + [rng.choice(first) for i in range(length - 2)]
+            c2 = [shared] + [rng.choice(second) for i in range(length - 1)]
+            rng.shuffle(c1)
+            rng.shuffle(c2)
+            rucksacks.append(''.join(c1 + c2))
+
+    return '\n'.join(rucksacks) + '\n'
+
+def day4(size: int, seed: int=0) -> str:
+    """
+    Section assignments for ``size`` pairs of elves.
+    """
+    rng = random.Random(seed)
+    lines = []
+    for i in range(size):
+        a, b, c, d = sorted(rng.randint(1, 99) for j in range(2)) + \
+                     sorted(rng.randint(1, 99) for j in range(2))
+        lines.append(f'{a}-{b},{c}-{d}')
+
+    return '\n'.join(lines) + '\n'
+
+def day5(size: int, seed: int=0) -> str:
+    """
+    Nine stacks of crates, followed by ``size`` valid rearrangement instructions.
+    """
+    rng = random.Random(seed)
+    stacks = [[rng.choice(string.ascii_uppercase) for i in range(rng.randint(1, 8))] \
+              for s in range(9)]
+    # Draw the stacks from the top down
+    rows = []
+    for level in range(max(len(s) for s in stacks))[::-1]:
+        rows.append(' '.join(f'[{s[level]}]' if len(s) > level else '   ' for s in stacks))
+    rows.append(' '.join(f' {i + 1} ' for i in range(9)))
+
+    # Track the heights of the stacks so every instruction is possible
+    heights = [len(s) for s in stacks]
+    instructions = []
+    for i in range(size):
+        source = rng.choice([s for s in range(9) if heights[s] > 1])
+        target = rng.choice([s for s in range(9) if s != source])
+        number = rng.randint(1, heights[source] - 1)
+        heights[source] -= number
+        heights[target] += number
+        instructions.append(f'move {number} from {source + 1} to {target + 1}')
+
+    return '\n'.join(rows) + '\n\n' + '\n'.join(instructions) + '\n'
+
+def day6(size: int, seed: int=0) -> str:
+    """
+    Datastream of ``size`` characters, where the start-of-packet and start-of-message markers are
+    right at the end, so the whole stream has to be scanned.
+    """
+    rng = random.Random(seed)
+    marker = 'defghijklmnopq'
+    return ''.join(rng.choices('abc', k=max(0, size - len(marker)))) + marker + '\n'
+
+def day7(size: int, seed: int=0, dir_fraction: float=0.3, nesting: float=0.0) -> str:
+    """
+    Terminal transcript exploring a file system with ``size`` files and directories, of which
+    roughly ``dir_fraction`` are directories. Each new entry goes into the most recently created
+    directory with probability ``nesting``, and otherwise into a random one, so values of
+    ``nesting`` near 1 give very deep directory trees.
+    """
+    rng = random.Random(seed)
+    # Build a random tree, where each new entry goes into an existing directory
+    children = {0: []}
+    directories = [0]
+    for n in range(1, size + 1):
+        parent = directories[-1] if nesting and rng.random() < nesting else \
+                 rng.choice(directories)
+        children[parent].append(n)
+        if rng.random() < dir_fraction:
+            children[n] = []
+            directories.append(n)
+
+    lines = ['$ cd /']
+    # Explore the tree depth first without recursing, since it can be far deeper than the
+    # recursion limit, where None marks the end of a directory
+    stack = [0]
+    while stack:
+        directory = stack.pop()
+        if directory is None:
+            lines.append('$ cd ..')
+            continue
+        if directory:
+            lines.append(f'$ cd d{directory}')
+        lines.append('$ ls')
+        for child in children[directory]:
+            lines.append(f'dir d{child}' if child in children else \
+                         f'{rng.randint(1000, 300000)} f{child}.txt')
+        for child in reversed(children[directory]):
+            if child in children:
+                stack += [None, child]
+
+    return '\n'.join(lines) + '\n'
+
+def day8(size: int, seed: int=0) -> str:
+    """
+    ``size`` x ``size`` grid of tree heights.
+    """
+    rng = random.Random(seed)
+    return ''.join(''.join(rng.choices('0123456789', k=size)) + '\n' for i in range(size))
+
+def day9(size: int, seed: int=0) -> str:
+    """
+    ``size`` movements of the head of the rope.
+    """
+    rng = random.Random(seed)
+    return ''.join(f'{rng.choice("UDLR")} {rng.randint(1, 20)}\n' for i in range(size))
+
+def day10(size: int, seed: int=0) -> str:
+    """
+    CPU program of ``size`` instructions (at least enough for 240 cycles).
+    """
+    rng = random.Random(seed)
+    return ''.join('noop\n' if rng.random() < 0.4 else f'addx {rng.randint(-10, 10)}\n' \
+                   for i in range(max(size, 240)))
+
+def day11(size: int, seed: int=0) -> str:
+    """
+    Eight monkeys holding ``size`` items between them.
+    """
+    rng = random.Random(seed)
+    primes = [2, 3, 5, 7, 11, 13, 17, 19, 23]
+    rng.shuffle(primes)
+    operations = ['old * old'] + [f'old * {rng.randint(2, 19)}'] + \
+                 [f'old + {rng.randint(1, 8)}' for i in range(6)]
+    rng.shuffle(operations)
+    items = [[] for m in range(8)]
+    for i in range(size):
+        items[rng.randrange(8)].append(str(rng.randint(50, 99)))
+
+    monkeys = []
+    for m in range(8):
+        true, false = rng.sample([n for n in range(8) if n != m], 2)
+        monkeys.append(f'Monkey {m}:\n'
+                       f'  Starting items: {", ".join(items[m])}\n'
+                       f'  Operation: new = {operations[m]}\n'
+                       f'  Test: divisible by {primes[m]}\n'
+                       f'    If true: throw to monkey {true}\n'
+                       f'    If false: throw to monkey {false}\n')
+
+    return '\n'.join(monkeys)
+
+def day12(size: int, seed: int=0) -> str:
+    """
+    ``size`` x ``size`` heightmap rising steadily from S in one corner to E in the other, with
+    scattered low pits.
+    """
+    rng = random.Random(seed)
+    rows = []
+    for y in range(size):
+        row = ''
+        for x in range(size):
+            height = (x + y)*25//max(1, 2*(size - 1))
+            if rng.random() < 0.2:
+                height = max(0, height - rng.randint(1, 3))
+            row += chr(97 + height)
+        rows.append(row)
+    rows[0] = 'S' + rows[0][1:]
+    rows[-1] = rows[-1][:-1] + 'E'
+
+    return '\n'.join(rows) + '\n'
+
+def day13(size: int, seed: int=0) -> str:
+    """
+    ``size`` pairs of nested list packets.
+    """
+    rng = random.Random(seed)
+    def packet(depth):
+        return [packet(depth + 1) if depth < 4 and rng.random() < 0.3 else rng.randint(0, 10) \
+                for i in range(rng.randint(0, 5))]
+
+    return '\n\n'.join(f'{packet(0)}\n{packet(0)}'.replace(' ', '') for i in range(size)) + '\n'
+
+def day14(size: int, seed: int=0) -> str:
+    """
+    ``size`` paths of rock above a small basin which catches the sand. The cave is kept shallow,
+    since Day14_Part1 rebuilds the set of blocked points for every step of every unit of sand.
+    """
+    rng = random.Random(seed)
+    lines = ['495,32 -> 495,36 -> 505,36 -> 505,32']
+    for i in range(size):
+        x, y = rng.randint(480, 520), rng.randint(5, 28)
+        points = [(x, y)]
+        for j in range(rng.randint(1, 4)):
+            # Alternate between horizontal and vertical segments
+            if j % 2:
+                y = min(30, max(5, y + rng.randint(-3, 3)))
+            else:
+                x = min(520, max(480, x + rng.randint(-3, 3)))
+            points.append((x, y))
+        lines.append(' -> '.join(f'{x},{y}' for x, y in points))
+
+    return '\n'.join(lines) + '\n'
+
+def day15(size: int, seed: int=0, extent: int=4000) -> str:
+    """
+    ``size`` sensors and their closest beacons, spread over a square ``extent`` units wide.
+    """
+    rng = random.Random(seed)
+    lines = []
+    for i in range(size):
+        sx, sy = rng.randint(0, extent), rng.randint(0, extent)
+        bx, by = sx + rng.randint(-extent//10, extent//10), sy + rng.randint(-extent//10, extent//10)
+        lines.append(f'Sensor at x={sx}, y={sy}: closest beacon is at x={bx}, y={by}')
+
+    return '\n'.join(lines) + '\n'
+
+def day16(size: int, seed: int=0, flowing: int=8) -> str:
+    """
+    ``size`` connected valves (at most 676), of which up to ``flowing`` have a non-zero flow rate.
+    The real inputs have 15, and the solutions slow down very quickly as this rises.
+    """
+    rng = random.Random(seed)
+    size = min(size, 26*26)
+    names = ['AA'] + rng.sample([a + b for a in string.ascii_uppercase \
+                                 for b in string.ascii_uppercase if a + b != 'AA'], size - 1)
+    # Connect the valves with a random tree, plus a few extra tunnels
+    tunnels = {name: set() for name in names}
+    for n in range(1, size):
+        other = names[rng.randrange(n)]
+        tunnels[names[n]].add(other)
+        tunnels[other].add(names[n])
+    for i in range(size//4):
+        a, b = rng.sample(names, 2)
+        tunnels[a].add(b)
+        tunnels[b].add(a)
+    flowing = set(rng.sample(names[1:], min(flowing, size - 1)))
+
+    lines = []
+    for name in names:
+        flow_rate = rng.randint(1, 25) if name in flowing else 0
+        others = sorted(tunnels[name])
+        if len(others) == 1:
+            lines.append(f'Valve {name} has flow rate={flow_rate}; tunnel leads to valve {others[0]}')
+        else:
+            lines.append(f'Valve {name} has flow rate={flow_rate}; tunnels lead to valves '
+                         + ', '.join(others))
+
+    return '\n'.join(lines) + '\n'
+
+def day17(size: int, seed: int=0) -> str:
+    """
+    Jet pattern of ``size`` directions.
+    """
+    rng = random.Random(seed)
+    return ''.join(rng.choices('<>', k=size)) + '\n'
+
+def day18(size: int, seed: int=0) -> str:
+    """
+    Lava droplet of ``size`` cubes, as a lumpy ball with some air pockets inside.
+    """
+    rng = random.Random(seed)
+    # Choose a radius so the ball contains roughly twice as many cubes as needed
+    radius = max(2, int((2*size*3/(4*3.14159))**(1/3)) + 1)
+    ball = [(x, y, z) for x in range(-radius, radius + 1) for y in range(-radius, radius + 1) \
+            for z in range(-radius, radius + 1) if x*x + y*y + z*z <= radius*radius]
+    cubes = rng.sample(ball, min(size, len(ball)))
+
+    return '\n'.join(f'{x + radius},{y + radius},{z + radius}' for x, y, z in cubes) + '\n'
+
+def day19(size: int, seed: int=0) -> str:
+    """
+    ``size`` blueprints of robot costs.
+    """
+    rng = random.Random(seed)
+    lines = []
+    for i in range(1, size + 1):
+        lines.append(f'Blueprint {i}: Each ore robot costs {rng.randint(2, 4)} ore. '
+                     f'Each clay robot costs {rng.randint(2, 4)} ore. '
+                     f'Each obsidian robot costs {rng.randint(2, 4)} ore and '
+                     f'{rng.randint(5, 20)} clay. '
+                     f'Each geode robot costs {rng.randint(2, 4)} ore and '
+                     f'{rng.randint(5, 20)} obsidian.')
+
+    return '\n'.join(lines) + '\n'
+
+def day20(size: int, seed: int=0) -> str:
+    """
+    Encrypted list of ``size`` numbers, containing exactly one zero.
+    """
+    rng = random.Random(seed)
+    values = [rng.choice([-1, 1])*rng.randint(1, 10000) for i in range(size - 1)]
+    values.insert(rng.randint(0, len(values)), 0)
+
+    return '\n'.join(str(v) for v in values) + '\n'
+
+def day21(size: int, seed: int=0) -> str:
+    """
+    ``size`` monkeys (rounded up to an odd number), forming one expression tree under root, in
+    which humn appears exactly once and every division is exact.
+    """
+    rng = random.Random(seed)
+    names = set()
+    def new_name():
+        name = ''.join(rng.choices(string.ascii_lowercase, k=4))
+        while name in names or name in ('root', 'humn'):
+            name = ''.join(rng.choices(string.ascii_lowercase, k=4))
+        names.add(name)
+        return name
+
+    # Start with the leaves, including humn, then repeatedly combine two random monkeys
+    pool = [('humn', rng.randint(1, 10))] + [(new_name(), rng.randint(1, 10)) \
+                                             for i in range(max(1, size//2))]
+    lines = [f'{name}: {value}' for name, value in pool]
+    while len(pool) > 2:
+        (a, a_value), (b, b_value) = [pool.pop(rng.randrange(len(pool))) for i in range(2)]
+        options = ['+', '-']
+        if abs(a_value*b_value) < 10**9:
+            options.append('*')
+        if b_value != 0 and a_value % b_value == 0:
+            options.append('/')
+        operation = rng.choice(options)
+        value = {'+': a_value + b_value, '-': a_value - b_value, '*': a_value*b_value,
+                 '/': a_value//b_value if b_value else 0}[operation]
+        name = new_name()
+        lines.append(f'{name}: {a} {operation} {b}')
+        pool.append((name, value))
+    lines.append(f'root: {pool[0][0]} + {pool[1][0]}')
+    rng.shuffle(lines)
+
+    return '\n'.join(lines) + '\n'
+
+# Layout of the cube net used for Day 22, as (row, column) of each face in units of side length
+CUBE_NET = [(0, 1), (0, 2), (1, 1), (2, 0), (2, 1), (3, 0)]
+
+def day22(size: int, seed: int=0, wall_fraction: float=0.1, moves: int=None,
+          net: list=CUBE_NET) -> str:
+    """
+    Cube net with a side length of ``size``, laid out as ``net`` (the (row, column) of each face in
+    units of side length, with a face in the top row), with roughly ``wall_fraction`` of the tiles
+    walls, followed by a path of ``moves`` instructions (``4*size`` if not given).
+    """
+    rng = random.Random(seed)
+    rows = [[' ']*size*(1 + max(c for r, c in net)) \
+            for i in range(size*(1 + max(r for r, c in net)))]
+    for face_row, face_col in net:
+        for y in range(face_row*size, (face_row + 1)*size):
+            for x in range(face_col*size, (face_col + 1)*size):
+                rows[y][x] = '#' if rng.random() < wall_fraction else '.'
+    # The start is the first open tile on the top row
+    rows[0][size*min(c for r, c in net if r == 0)] = '.'
+    moves = 4*size if moves is None else moves
+    path = ''.join(f'{rng.randint(1, 2*size)}{rng.choice("LR")}' for i in range(moves))
+
+    return '\n'.join(''.join(r).rstrip() for r in rows) + '\n\n' + path + f'{size}\n'
+
+def day23(size: int, seed: int=0) -> str:
+    """
+    ``size`` x ``size`` grove with roughly half the spaces occupied by elves.
+    """
+    rng = random.Random(seed)
+    return ''.join(''.join(rng.choices('.#', k=size)) + '\n' for i in range(size))
+
+def day24(size: int, seed: int=0, width: int=None, blizzard_fraction: float=0.3) -> str:
+    """
+    Valley ``size`` rows by ``width`` columns (``3*size`` if not given), with blizzards in roughly
+    ``blizzard_fraction`` of the spaces and no vertical blizzards in the entrance and exit columns.
+    """
+    rng = random.Random(seed)
+    width = 3*size if width is None else width
+    rows = ['#.' + '#'*width]
+    for i in range(size):
+        row = ''
+        for j in range(width):
+            options = '<>' if j in (0, width - 1) else '<>^v'
+            row += rng.choice(options) if rng.random() < blizzard_fraction else '.'
+        rows.append('#' + row + '#')
+    rows.append('#'*width + '.#')
+
+    return '\n'.join(rows) + '\n'
+
+def day25(size: int, seed: int=0) -> str:
+    """
+    ``size`` numbers written in SNAFU format.
+    """
+    rng = random.Random(seed)
+    digits = '=-012'
+    return ''.join(rng.choice('12') + ''.join(rng.choices(digits, k=rng.randint(0, 15))) + '\n' \
+                   for i in range(size))
+
+# Generator for every day
+GENERATORS = {int(name[3:]): function for name, function in dict(globals()).items() \
+              if name.startswith('day') and name[3:].isdigit()}
+
+def generate(day: int, size: int, seed: int=0, **knobs) -> str:
+    """
+    Generate a synthetic input for a given day.
+
+    Parameters
+    ----------
+    day : int
+        The day to generate an input for.
+    size : int
+        The size of the input, see the generator for each day for what this means.
+    seed : int, optional
+        Seed for the random number generator.
+        The default is 0.
+    **knobs
+        Any extra options of the generator for the day, e.g. flowing=40 for Day 16.
+
+    Raises
+    ------
+    ValueError
+        If there is no generator for the given day.
+
+    Returns
+    -------
+    text : str
+        The contents of the input file.
+
+    """
+    if day not in GENERATORS:
+        raise ValueError(f'No generator for day {day}')
+
+    return GENERATORS[day](size, seed, **knobs)
+
+def write(day: int, size: int, path: str, seed: int=0, **knobs) -> str:
+    """
+    Generate a synthetic input for a given day and write it to a file, which is compressed if its
+    name ends in .gz, .bz2 or .xz (see inputs.OPENERS).
+
+    Parameters
+    ----------
+    day : int
+        The day to generate an input for.
+    size : int
+        The size of the input, see the generator for each day for what this means.
+    path : str
+        The file to write.
+    seed : int, optional
+        Seed for the random number generator.
+        The default is 0.
+    **knobs
+        Any extra options of the generator for the day.
+
+    Returns
+    -------
+    path : str
+        The file written.
+
+    """
+    import inputs
+    text = generate(day, size, seed, **knobs)
+    opener = inputs.OPENERS.get(os.path.splitext(path)[1].lower(), open)
+    with opener(path, 'wt') as f:
+        f.write(text)
+
+    return path
+
+def main(argv: list=None) -> None:
+    """
+    Command line interface, run with -h for usage.
+
+    Parameters
+    ----------
+    argv : list(str) or NoneType, optional
+        Command line arguments, if None then sys.argv is used.
+        The default is None.
+
+    Returns
+    -------
+    None
+
+    """
+    import aoc
+    parser = argparse.ArgumentParser(description='Generate a synthetic puzzle input.')
+    parser.add_argument('day', type=int, help='Day to generate an input for.')
+    parser.add_argument('size', type=int, help='Size of the input (meaning differs for each day).')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the generator.')
+    parser.add_argument('-o', '--output',
+                        help='File to write (default stdout), compressed if it ends in .gz, .bz2 '
+                             'or .xz.')
+    parser.add_argument('-a', '--arg', action='append', default=[], type=aoc.parse_arg,
+                        help='Extra option for the generator, as NAME=VALUE.')
+    args = parser.parse_args(argv)
+
+    if args.output:
+        write(args.day, args.size, args.output, args.seed, **dict(args.arg))
+    else:
+        sys.stdout.write(generate(args.day, args.size, args.seed, **dict(args.arg)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+"""
+Compact 2D grid of small integers (0-255), shared by the days which work on grids. The cells are
+stored row by row in a single bytearray, so the hot loops of a solution can work directly on flat
+indices into Grid.data, stepping between neighbours with fixed offsets (see Grid.offsets) instead
+of building a tuple for every lookup. Coordinates can start anywhere (including negative values),
+reading outside the grid just gives a constant value rather than an error, and writing outside it
+grows the grid to fit.
+"""
+
+class Grid:
+    """
+    Class for a rectangular grid of values from 0 to 255, covering x0 <= x < x0 + width and
+    y0 <= y < y0 + height, where the cell (x, y) is stored at data[(y - y0)*width + (x - x0)].
+    New cells are set to fill, and reading any cell outside the grid gives outside.
+    """
+
+    def __init__(self, width: int, height: int, fill: int=0, x0: int=0, y0: int=0,
+                 outside: int=None, data: bytearray=None):
+        self.width = width
+        self.height = height
+        self.x0 = x0
+        self.y0 = y0
+        self.fill = fill
+        self.outside = fill if outside is None else outside
+        if data is None:
+            data = bytearray([fill])*(width*height)
+        self.data = data
+
+    @classmethod
+    def from_lines(cls, lines: list, values: dict=None, fill: int=0, x0: int=0, y0: int=0,
+                   outside: int=None):
+        """
+        Create a grid from rows of text, with the first row at y0, padding any short rows with
+        fill.
+
+        Parameters
+        ----------
+        lines : list(str)
+            The rows of the grid, without newlines.
+        values : dict(str: int) or NoneType, optional
+            The value of each character, if None then the character codes are used.
+            The default is None.
+        fill : int, optional
+            The value of new cells, and of the padding of short rows.
+            The default is 0.
+        x0 : int, optional
+            The x coordinate of the first column.
+            The default is 0.
+        y0 : int, optional
+            The y coordinate of the first row.
+            The default is 0.
+        outside : int or NoneType, optional
+            The value read outside the grid, if None then the same as fill.
+            The default is None.
+
+        Returns
+        -------
+        grid : Grid
+            The new grid.
+
+        """
+        width = max((len(line) for line in lines), default=0)
+        # Translate all of the characters at once with a lookup table
+        table = bytearray(range(256))
+        for char, value in (values or {}).items():
+            table[ord(char)] = value
+        data = bytearray().join(line.encode().translate(table).ljust(width, bytes([fill])) \
+                                for line in lines)
+
+        return cls(width, len(lines), fill, x0, y0, outside, data)
+
+    def __repr__(self):
+        return f'Grid({self.width}x{self.height} at ({self.x0}, {self.y0}))'
+
+    def __getitem__(self, point: tuple) -> int:
+        x, y = point[0] - self.x0, point[1] - self.y0
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.data[y*self.width + x]
+        return self.outside
+
+    def __setitem__(self, point: tuple, value: int):
+        if not self.in_bounds(*point):
+            self.extend_to(*point)
+        self.data[(point[1] - self.y0)*self.width + point[0] - self.x0] = value
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        """
+        Check whether a point is inside the grid.
+        """
+        return 0 <= x - self.x0 < self.width and 0 <= y - self.y0 < self.height
+
+    def index(self, x: int, y: int) -> int:
+        """
+        Find the flat index of a point in Grid.data. The point must be inside the grid.
+        """
+        return (y - self.y0)*self.width + x - self.x0
+
+    def point(self, index: int) -> tuple:
+        """
+        Find the point (x, y) at a flat index in Grid.data.
+        """
+        y, x = divmod(index, self.width)
+        return x + self.x0, y + self.y0
+
+    def offsets(self, directions: list) -> list:
+        """
+        Convert a list of steps (dx, dy) into the steps between flat indices in Grid.data. These
+        stay correct until the width of the grid changes, and only stay inside the grid if it has
+        been padded (see Grid.padded) at least as much as the largest step.
+
+        Parameters
+        ----------
+        directions : list(tuple(int, int))
+            The steps, e.g. [(1, 0), (-1, 0), (0, 1), (0, -1)].
+
+        Returns
+        -------
+        offsets : list(int)
+            The corresponding steps between flat indices.
+
+        """
+        return [dx + dy*self.width for dx, dy in directions]
+
+    def extend_to(self, x: int, y: int, margin: int=None) -> None:
+        """
+        Grow the grid so that it includes a given point, plus a margin beyond it so that growing
+        one cell at a time doesn't copy the whole grid every time. Growing only towards larger y
+        leaves the flat indices of the existing cells unchanged.
+
+        Parameters
+        ----------
+        x : int
+            The x coordinate which must be inside the grid.
+        y : int
+            The y coordinate which must be inside the grid.
+        margin : int or NoneType, optional
+            The number of extra cells to add beyond the point, if None then half the current size
+            in that direction (so growing is amortised constant time per cell).
+            The default is None.
+
+        Returns
+        -------
+        None
+
+        """
+        x1, y1 = self.x0 + self.width, self.y0 + self.height
+        x_margin = (self.width//2 + 1) if margin is None else margin
+        y_margin = (self.height//2 + 1) if margin is None else margin
+        new_x0 = min(self.x0, x - x_margin) if x < self.x0 else self.x0
+        new_y0 = min(self.y0, y - y_margin) if y < self.y0 else self.y0
+        new_x1 = x + 1 + x_margin if x >= x1 else x1
+        new_y1 = y + 1 + y_margin if y >= y1 else y1
+        self._resize(new_x0, new_y0, new_x1 - new_x0, new_y1 - new_y0)
+
+    def padded(self, pad: int=1, value: int=None):
+        """
+        Create a copy of the grid with a border of a given width around it, so that stepping from
+        any cell of the original grid by up to pad cells in each direction stays inside Grid.data.
+
+        Parameters
+        ----------
+        pad : int, optional
+            The width of the border.
+            The default is 1.
+        value : int or NoneType, optional
+            The value of the cells in the border, if None then the value read outside the grid.
+            The default is None.
+
+        Returns
+        -------
+        grid : Grid
+            The padded copy, with the same coordinates for the original cells.
+
+        """
+        grid = self.copy()
+        grid._resize(self.x0 - pad, self.y0 - pad, self.width + 2*pad, self.height + 2*pad,
+                     self.outside if value is None else value)
+
+        return grid
+
+    def _resize(self, x0: int, y0: int, width: int, height: int, value: int=None) -> None:
+        # Copy each old row into place in the new storage, with any new cells set to value
+        data = bytearray([self.fill if value is None else value])*(width*height)
+        start = (self.y0 - y0)*width + self.x0 - x0
+        for row in range(self.height):
+            data[start + row*width: start + row*width + self.width] = \
+                self.data[row*self.width: (row + 1)*self.width]
+        self.data, self.x0, self.y0, self.width, self.height = data, x0, y0, width, height
+
+    def copy(self):
+        """
+        Create an independent copy of the grid.
+        """
+        return Grid(self.width, self.height, self.fill, self.x0, self.y0, self.outside,
+                    bytearray(self.data))
+
+    def count(self, value: int) -> int:
+        """
+        Count the cells with a given value.
+        """
+        return self.data.count(value)
+
+    def find(self, value: int) -> list:
+        """
+        Find every point (x, y) with a given value, in order of their flat indices.
+        """
+        points = []
+        index = self.data.find(value)
+        while index != -1:
+            points.append(self.point(index))
+            index = self.data.find(value, index + 1)
+
+        return points
+
+    def to_lines(self, symbols: dict=None) -> list:
+        """
+        Draw the grid as rows of text, the inverse of Grid.from_lines.
+
+        Parameters
+        ----------
+        symbols : dict(int: str) or NoneType, optional
+            The character for each value, if None then the values are used as character codes.
+            The default is None.
+
+        Returns
+        -------
+        lines : list(str)
+            The rows of the grid, from y0 upwards.
+
+        """
+        table = bytearray(range(256))
+        for value, char in (symbols or {}).items():
+            table[value] = ord(char)
+        text = self.data.translate(table).decode('latin-1')
+
+        return [text[i: i + self.width] for i in range(0, len(text), self.width)]
+
+    @property
+    def array(self):
+        """
+        2D numpy array of shape (height, width) sharing its memory with the grid, so it is indexed
+        [y - y0, x - x0]. The view stops following the grid if it grows, since the storage is
+        then replaced.
+        """
+        import numpy as np
+
+        return np.frombuffer(self.data, dtype=np.uint8).reshape(self.height, self.width)
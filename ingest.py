@@ -0,0 +1,211 @@
+"""
+Vectorised parsing of the integers in numeric inputs, shared by the days whose inputs are mostly
+numbers. Rather than splitting each line and calling int() on every token, the whole input is read
+once (see inputs.read_bytes) and scanned with numpy: the digits are found with a single comparison
+over the bytes, and every number is built at once from its digits and powers of ten. The result is
+a contiguous int64 array, with any structure (lines, or groups separated by blank lines) returned
+as an array of offsets into it, so group g is values[offsets[g]: offsets[g + 1]].
+
+Numbers can have at most 18 digits, and a '-' directly before a number makes it negative unless
+signed=False is given (e.g. for ranges like '2-4').
+
+numpy is only imported once something is parsed (see lazy.py), so importing a day which uses this
+module doesn't import numpy by itself.
+"""
+import functools
+
+import inputs
+from lazy import lazy_import
+np = lazy_import('numpy')
+
+@functools.lru_cache(maxsize=None)
+def powers() -> 'np.ndarray':
+    """
+    Powers of ten for building numbers from their digits, made on first use.
+    """
+    return 10**np.arange(19, dtype=np.int64)
+
+def _scan(array: 'np.ndarray', signed: bool=True) -> tuple:
+    """
+    Find every integer in a buffer.
+
+    Parameters
+    ----------
+    array : np.ndarray(uint8)
+        The bytes of the buffer to scan.
+    signed : bool, optional
+        Whether a '-' directly before a number makes it negative.
+        The default is True.
+
+    Raises
+    ------
+    ValueError
+        If a number has too many digits to fit in an int64.
+
+    Returns
+    -------
+    values : np.ndarray(int64)
+        The integers, in order.
+    starts : np.ndarray(int64)
+        The position of the first digit of each integer in the buffer.
+
+    """
+    is_digit = (array >= 48) & (array <= 57)
+    # A number starts at a digit with no digit before it, and ends at one with no digit after it
+    edges = np.diff(is_digit.astype(np.int8), prepend=np.int8(0), append=np.int8(0))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    lengths = ends - starts
+    if len(lengths) and lengths.max() > 18:
+        raise ValueError(f'Number with {lengths.max()} digits is too long to parse')
+
+    # Weight each digit by the power of ten for its place in its number, then add up each number
+    positions = np.flatnonzero(is_digit)
+    number = np.repeat(np.arange(len(starts)), lengths)
+    digits = (array[positions] - 48).astype(np.int64)*powers()[ends[number] - 1 - positions]
+    values = np.add.reduceat(digits, np.cumsum(lengths) - lengths) if len(starts) \
+             else np.zeros(0, dtype=np.int64)
+
+    if signed and len(starts):
+        negative = (starts > 0) & (array[np.maximum(starts - 1, 0)] == ord('-'))
+        values[negative] *= -1
+
+    return values, starts
+
+def read_ints(source, signed: bool=True) -> 'np.ndarray':
+    """
+    Read every integer in an input, ignoring anything else.
+
+    Parameters
+    ----------
+    source : str, os.PathLike, stream or iterable
+        The input, in any form accepted by inputs.iter_lines.
+    signed : bool, optional
+        Whether a '-' directly before a number makes it negative.
+        The default is True.
+
+    Returns
+    -------
+    values : np.ndarray(int64)
+        The integers, in order.
+
+    """
+    return _scan(np.frombuffer(inputs.read_bytes(source), dtype=np.uint8), signed)[0]
+
+def read_int_groups(source, signed: bool=True) -> tuple:
+    """
+    Read every integer in an input made up of groups separated by blank lines (e.g. Day 1). Every
+    blank line starts a new group, so consecutive blank lines give empty groups.
+
+    Parameters
+    ----------
+    source : str, os.PathLike, stream or iterable
+        The input, in any form accepted by inputs.iter_lines.
+    signed : bool, optional
+        Whether a '-' directly before a number makes it negative.
+        The default is True.
+
+    Returns
+    -------
+    values : np.ndarray(int64)
+        The integers, in order.
+    offsets : np.ndarray(int64)
+        The index in values of the start of each group, followed by len(values).
+
+    """
+    return int_groups(inputs.read_bytes(source), signed)
+
+def int_groups(data, signed: bool=True) -> tuple:
+    """
+    Find every integer in a buffer made up of groups separated by blank lines, as read_int_groups
+    but for a buffer already in memory, e.g. each piece from inputs.iter_chunks.
+
+    Parameters
+    ----------
+    data : bytes-like
+        The buffer to scan, e.g. bytes, a memoryview or an mmap.
+    signed : bool, optional
+        Whether a '-' directly before a number makes it negative.
+        The default is True.
+
+    Returns
+    -------
+    values : np.ndarray(int64)
+        The integers, in order.
+    offsets : np.ndarray(int64)
+        The index in values of the start of each group, followed by len(values).
+
+    """
+    array = np.frombuffer(data, dtype=np.uint8)
+    # Drop any carriage returns, so only newlines need checking
+    if (array == ord('\r')).any():
+        array = array[array != ord('\r')]
+    values, starts = _scan(array, signed)
+    # A blank line is a newline at the very start, or straight after another newline
+    newlines = array == ord('\n')
+    blank = np.flatnonzero(newlines & np.concatenate(([True], newlines[:-1])))
+    offsets = np.concatenate(([0], np.searchsorted(starts, blank), [len(values)]))
+
+    return values, offsets.astype(np.int64)
+
+def read_int_rows(source, signed: bool=True) -> tuple:
+    """
+    Read every integer in an input, split up by line (e.g. comma separated coordinates on each
+    line for Day 18). Lines without any integers are skipped.
+
+    Parameters
+    ----------
+    source : str, os.PathLike, stream or iterable
+        The input, in any form accepted by inputs.iter_lines.
+    signed : bool, optional
+        Whether a '-' directly before a number makes it negative.
+        The default is True.
+
+    Returns
+    -------
+    values : np.ndarray(int64)
+        The integers, in order.
+    offsets : np.ndarray(int64)
+        The index in values of the start of each line, followed by len(values).
+
+    """
+    array = np.frombuffer(inputs.read_bytes(source), dtype=np.uint8)
+    values, starts = _scan(array, signed)
+    # Every line ends at a newline, or at the end of the input
+    ends = np.append(np.flatnonzero(array == ord('\n')), len(array))
+    offsets = np.unique(np.concatenate(([0], np.searchsorted(starts, ends))))
+
+    return values, offsets.astype(np.int64)
+
+def read_int_table(source, signed: bool=True) -> 'np.ndarray':
+    """
+    Read an input with the same number of integers on every line (ignoring lines without any) as
+    a 2D array, with one row per line.
+
+    Parameters
+    ----------
+    source : str, os.PathLike, stream or iterable
+        The input, in any form accepted by inputs.iter_lines.
+    signed : bool, optional
+        Whether a '-' directly before a number makes it negative.
+        The default is True.
+
+    Raises
+    ------
+    ValueError
+        If the lines have different numbers of integers.
+
+    Returns
+    -------
+    table : np.ndarray(int64)
+        Array of shape (lines, integers_per_line).
+
+    """
+    values, offsets = read_int_rows(source, signed)
+    widths = np.diff(offsets)
+    if len(widths) == 0:
+        return values.reshape(0, 0)
+    if (widths != widths[0]).any():
+        raise ValueError(f'Lines have between {widths.min()} and {widths.max()} integers')
+
+    return values.reshape(len(widths), widths[0])
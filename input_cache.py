@@ -0,0 +1,317 @@
+"""
+Opt-in cache for the parsed inputs of every day, shared by all of the get_input functions. Each
+parsed structure is stored under a key built from the SHA-256 of the input file's contents and a
+hash of the parser itself (its code, its version number and any extra arguments). Entries are
+pickled to disk and the pickles are also kept in memory. Both stores are bounded in size and
+evict the least recently used entries first. Every hit is unpickled again, so solutions which
+modify their parsed input in place (e.g. Day 5's stacks or Day 11's monkeys) never share an
+object.
+
+The cache is off by default and every decorated parser just calls straight through. Turn it on
+with enable(), the --cache flag of aoc.py, or by setting the AOC_INPUT_CACHE environment
+variable to a cache directory (or to 1 to use the default one).
+"""
+import collections
+import functools
+import os
+import types
+
+from lazy import lazy_import
+# Only needed once the cache is used, so not imported with every day
+hashlib = lazy_import('hashlib')
+inspect = lazy_import('inspect')
+pickle = lazy_import('pickle')
+tempfile = lazy_import('tempfile')
+
+# Default location of the on-disk cache, next to the DayN modules
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.input_cache')
+
+# Bump if the format of the cache entries ever changes, to invalidate every old entry
+CACHE_FORMAT = 1
+
+# Current cache settings, or None if the cache is disabled
+_settings = None
+# In-memory LRU store of (key: pickled bytes)
+_memory = collections.OrderedDict()
+# Content hashes of the input files already read, keyed by (path, size, modification time)
+_file_hashes = {}
+# Number of hits in each store and of misses since the cache was enabled
+stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+def enable(directory: str=None, max_disk_bytes: int=256*2**20,
+           max_memory_bytes: int=64*2**20) -> None:
+    """
+    Turn on the cache for every decorated parser.
+
+    Parameters
+    ----------
+    directory : str or NoneType, optional
+        Directory to store the cache entries in, if None then DEFAULT_DIRECTORY is used.
+        The default is None.
+    max_disk_bytes : int, optional
+        Maximum total size of the entries stored on disk.
+        The default is 256 MiB.
+    max_memory_bytes : int, optional
+        Maximum total size of the entries kept in memory.
+        The default is 64 MiB.
+
+    Returns
+    -------
+    None
+
+    """
+    global _settings
+    directory = directory or DEFAULT_DIRECTORY
+    os.makedirs(directory, exist_ok=True)
+    _settings = {'directory': directory, 'max_disk_bytes': max_disk_bytes,
+                 'max_memory_bytes': max_memory_bytes}
+    for name in stats:
+        stats[name] = 0
+
+def disable() -> None:
+    """
+    Turn off the cache and empty the in-memory store, leaving the on-disk store in place.
+
+    Returns
+    -------
+    None
+
+    """
+    global _settings
+    _settings = None
+    _memory.clear()
+
+def is_enabled() -> bool:
+    """
+    Check whether the cache is turned on.
+
+    Returns
+    -------
+    enabled : bool
+        Whether the cache is turned on.
+
+    """
+    return _settings is not None
+
+def clear(directory: str=None) -> None:
+    """
+    Remove every cache entry, from memory and from disk.
+
+    Parameters
+    ----------
+    directory : str or NoneType, optional
+        Directory of the on-disk store. If None, the directory of the current settings is used, or
+        DEFAULT_DIRECTORY if the cache is disabled.
+        The default is None.
+
+    Returns
+    -------
+    None
+
+    """
+    _memory.clear()
+    directory = directory or (_settings or {}).get('directory', DEFAULT_DIRECTORY)
+    if os.path.isdir(directory):
+        for name in os.listdir(directory):
+            if name.endswith('.pickle'):
+                os.remove(os.path.join(directory, name))
+
+def code_hash(code: types.CodeType, digest=None):
+    """
+    Hash the bytecode and constants of a code object, including any nested functions or
+    comprehensions, so that any edit to a parser changes its hash.
+
+    Parameters
+    ----------
+    code : types.CodeType
+        The code object to hash.
+    digest : hashlib object or NoneType, optional
+        Digest to add the hash of the code to, if None then a new SHA-256 digest is created.
+        The default is None.
+
+    Returns
+    -------
+    digest : hashlib object
+        The digest, updated with the code.
+
+    """
+    digest = digest or hashlib.sha256()
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        # Nested code objects have their memory address in their repr, so hash them recursively
+        if isinstance(const, types.CodeType):
+            code_hash(const, digest)
+        else:
+            digest.update(repr(const).encode())
+
+    return digest
+
+def file_hash(path: str) -> str:
+    """
+    Find the SHA-256 of the contents of a file, reusing the last result if the file has not been
+    modified since.
+
+    Parameters
+    ----------
+    path : str
+        The file to hash.
+
+    Returns
+    -------
+    hexdigest : str
+        The SHA-256 of the file contents.
+
+    """
+    info = os.stat(path)
+    stamp = (os.path.abspath(path), info.st_size, info.st_mtime_ns)
+    if stamp not in _file_hashes:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(2**20), b''):
+                digest.update(chunk)
+        _file_hashes[stamp] = digest.hexdigest()
+
+    return _file_hashes[stamp]
+
+def _remember(key: str, data: bytes) -> None:
+    """
+    Add an entry to the in-memory store, evicting the least recently used entries if it is full.
+    """
+    _memory[key] = data
+    _memory.move_to_end(key)
+    total = sum(len(value) for value in _memory.values())
+    while total > _settings['max_memory_bytes'] and len(_memory) > 1:
+        total -= len(_memory.popitem(last=False)[1])
+    # Entries larger than the whole store are not kept at all
+    if total > _settings['max_memory_bytes']:
+        _memory.clear()
+
+def _load(key: str) -> bytes:
+    """
+    Look up an entry in the in-memory store and then on disk, returning None if it is missing.
+    """
+    if key in _memory:
+        _memory.move_to_end(key)
+        stats['memory_hits'] += 1
+        return _memory[key]
+
+    path = os.path.join(_settings['directory'], f'{key}.pickle')
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    # Mark the entry as recently used for the on-disk eviction
+    os.utime(path)
+    stats['disk_hits'] += 1
+    _remember(key, data)
+
+    return data
+
+def _store(key: str, data: bytes) -> None:
+    """
+    Add an entry to both stores, evicting the least recently used entries on disk if it is full.
+    """
+    _remember(key, data)
+    directory = _settings['directory']
+    # Write to a temporary file first so that no other process can read a half-written entry
+    handle, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(handle, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, os.path.join(directory, f'{key}.pickle'))
+
+    entries = []
+    for name in os.listdir(directory):
+        if name.endswith('.pickle'):
+            try:
+                info = os.stat(os.path.join(directory, name))
+            except OSError:
+                continue
+            entries.append((info.st_mtime_ns, info.st_size, name))
+    total = sum(size for mtime, size, name in entries)
+    # Remove the oldest entries until the store fits
+    for mtime, size, name in sorted(entries):
+        if total <= _settings['max_disk_bytes']:
+            break
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
+        total -= size
+
+def cached_parser(parser=None, *, version: int=1):
+    """
+    Decorator adding the cache to a parser function, which takes the path to an input file as its
+    input_file argument. Can be used either bare, as @cached_parser, or as
+    @cached_parser(version=2) to invalidate old entries by hand.
+
+    Parameters
+    ----------
+    parser : function or NoneType, optional
+        The parser to decorate.
+        The default is None.
+    version : int, optional
+        Version number of the parser, which is part of the cache key. Changes to the code of the
+        parser already invalidate old entries, so this only needs to be bumped if the parsed
+        structure changes in some other way, e.g. a class it uses is changed.
+        The default is 1.
+
+    Returns
+    -------
+    wrapper : function
+        The parser, which looks up its result in the cache when the cache is enabled.
+
+    """
+    if parser is None:
+        return functools.partial(cached_parser, version=version)
+
+    # Signature and identity of the parser, only worked out when first needed to keep imports fast
+    signature, identity = [], []
+
+    @functools.wraps(parser)
+    def wrapper(*args, **kwargs):
+        if _settings is None:
+            return parser(*args, **kwargs)
+
+        if not identity:
+            signature.append(inspect.signature(parser))
+            identity.append(code_hash(parser.__code__, hashlib.sha256(
+                f'{CACHE_FORMAT}:{parser.__module__}.{parser.__qualname__}:{version}:'.encode())))
+        arguments = signature[0].bind(*args, **kwargs)
+        arguments.apply_defaults()
+        arguments = dict(arguments.arguments)
+        input_file = arguments.pop('input_file', None)
+        # Only files on disk can be cached, anything else is just parsed
+        if not isinstance(input_file, (str, os.PathLike)) or not os.path.isfile(input_file):
+            return parser(*args, **kwargs)
+
+        digest = identity[0].copy()
+        digest.update(file_hash(input_file).encode())
+        digest.update(repr(sorted(arguments.items())).encode())
+        key = digest.hexdigest()
+
+        data = _load(key)
+        if data is not None:
+            try:
+                return pickle.loads(data)
+            except Exception:
+                # Entry is corrupt or refers to something which no longer exists, so parse again
+                _memory.pop(key, None)
+
+        stats['misses'] += 1
+        result = parser(*args, **kwargs)
+        try:
+            data = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # Some structures cannot be pickled, in which case they are just never cached
+            return result
+        _store(key, data)
+
+        return result
+
+    return wrapper
+
+# Allow the cache to be turned on without changing any code
+if os.environ.get('AOC_INPUT_CACHE'):
+    enable(None if os.environ['AOC_INPUT_CACHE'] == '1' else os.environ['AOC_INPUT_CACHE'])
@@ -0,0 +1,350 @@
+"""
+Reading of puzzle inputs from anywhere, shared by the parsers of every day. An input can be given
+as:
+    - a path to a file, which is decompressed on the fly if it ends in .gz, .bz2 or .xz (or .lzma),
+      or '-' for stdin
+    - an open stream, in text or binary mode (a file, sys.stdin, socket.makefile('rb'),
+      gzip.open(...) etc.)
+    - any other iterable of lines, as str or bytes (a list, a generator...)
+and the lines are read one at a time, so the whole input is never held in memory unless the parser
+itself needs it. Streams and iterators can only be read once, so these are not cached by
+input_cache (which only caches files on disk).
+
+For inputs too large to hold in memory, map_input memory maps a file so that solutions can scan
+its bytes directly, with the operating system paging them in and out as needed, and iter_chunks
+splits an input into large pieces which can each be parsed on their own (e.g. with ingest.py).
+"""
+import bz2
+import contextlib
+import gzip
+import io
+import lzma
+import mmap
+import os
+import sys
+
+# Functions opening each kind of compressed file, by file extension
+OPENERS = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open, '.lzma': lzma.open}
+
+# Default size in bytes of the pieces yielded by iter_chunks
+CHUNK_SIZE = 2**24
+
+def _open(path: str, mode: str='t'):
+    """
+    Open a file in text ('t') or binary ('b') mode, decompressing it if needed.
+    """
+    opener = OPENERS.get(os.path.splitext(path)[1].lower())
+    if opener is None:
+        return open(path, 'r' + mode)
+
+    return opener(path, 'r' + mode)
+
+def iter_lines(source):
+    """
+    Generate the lines of an input one at a time, without their line endings. Files opened from a
+    path are closed once all of the lines have been read (or the generator is discarded), while
+    streams which are passed in are left open.
+
+    Parameters
+    ----------
+    source : str, os.PathLike, stream or iterable
+        The input, as a path, an open text or binary stream, or an iterable of str or bytes lines.
+
+    Yields
+    ------
+    line : str
+        Each line of the input, with any trailing newline ('\\n' or '\\r\\n') removed.
+
+    """
+    if isinstance(source, (str, os.PathLike)):
+        if source == '-':
+            yield from iter_lines(sys.stdin)
+            return
+        with _open(os.fspath(source)) as f:
+            for line in f:
+                yield line.rstrip('\r\n')
+        return
+
+    for line in source:
+        # Binary streams give bytes
+        if isinstance(line, (bytes, bytearray)):
+            line = line.decode()
+        yield line.rstrip('\r\n')
+
+def read_text(source) -> str:
+    """
+    Read a whole input as a single string, with every line ending converted to '\\n'.
+
+    Parameters
+    ----------
+    source : str, os.PathLike, stream or iterable
+        The input, in any form accepted by iter_lines.
+
+    Returns
+    -------
+    text : str
+        The contents of the input.
+
+    """
+    return ''.join(line + '\n' for line in iter_lines(source))
+
+def read_bytes(source) -> bytes:
+    """
+    Read a whole input as a single bytes object, e.g. for scanning it with numpy (see ingest.py).
+    Files and streams are read in one go rather than line by line.
+
+    Parameters
+    ----------
+    source : str, os.PathLike, stream or iterable
+        The input, in any form accepted by iter_lines.
+
+    Returns
+    -------
+    data : bytes
+        The contents of the input.
+
+    """
+    if isinstance(source, (str, os.PathLike)):
+        if source == '-':
+            return read_bytes(sys.stdin)
+        with _open(os.fspath(source), 'b') as f:
+            return f.read()
+
+    if hasattr(source, 'read'):
+        # Text streams have a binary buffer underneath them (sys.stdin, open files...)
+        if hasattr(source, 'buffer'):
+            return source.buffer.read()
+        data = source.read()
+        return data.encode() if isinstance(data, str) else bytes(data)
+
+    return ''.join(line + '\n' for line in iter_lines(source)).encode()
+
+def _is_plain_file(source) -> bool:
+    """
+    Check whether an input is a path to an uncompressed file, which can be memory mapped.
+    """
+    return isinstance(source, (str, os.PathLike)) and source != '-' and \
+           os.path.splitext(source)[1].lower() not in OPENERS and os.path.isfile(source)
+
+@contextlib.contextmanager
+def map_input(source):
+    """
+    Context manager giving the whole of an input as a read-only bytes-like buffer. Uncompressed
+    files are memory mapped, so nothing is read until it is used and the file can be larger than
+    the available memory, while anything else is read into memory with read_bytes.
+
+    The buffer supports len(), indexing (giving ints), slicing (giving bytes) and find()/rfind(),
+    and memoryview(buffer) slices it without copying. Any memoryviews must be released before the
+    context closes.
+
+    Parameters
+    ----------
+    source : str, os.PathLike, stream or iterable
+        The input, in any form accepted by iter_lines.
+
+    Yields
+    ------
+    buffer : mmap.mmap or bytes
+        The contents of the input.
+
+    """
+    if not _is_plain_file(source) or os.path.getsize(source) == 0:
+        # Empty files can't be mapped
+        yield read_bytes(source)
+        return
+
+    with open(source, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        yield buffer
+
+def _aligned(buffer, start: int, position: int, separator: bytes) -> int:
+    """
+    Find the last separator at or before position (where there has to be one) which bytes.split
+    would cut at, i.e. scanning from start for separators which don't overlap. This is only ever
+    before position inside a run of overlapping separators, e.g. b'\n\n\n' for b'\n\n'.
+    """
+    size = len(separator)
+    if size == 1:
+        return position
+    # Go back to the first of the run of overlapping separators
+    first = position
+    while True:
+        earlier = buffer.rfind(separator, max(start, first - size + 1), first + size - 1)
+        if earlier == -1 or earlier >= first:
+            break
+        first = earlier
+    # Then forward through the run, skipping any separator which overlaps the last one cut at
+    cut = first
+    while True:
+        after = buffer.find(separator, cut + size, position + size)
+        if after == -1:
+            return cut
+        cut = after
+
+def _pieces(buffer, start: int, end: int, separator: bytes, chunk_size: int):
+    """
+    Split buffer[start: end] into pieces of roughly chunk_size bytes, at separators which
+    bytes.split would cut at (see _aligned), yielding the (start, end) offsets of each piece. A
+    separator at the very end doesn't start another piece, and nothing is yielded if the range
+    is empty. This is the one rule for where iter_chunks cuts, whichever way the input is read.
+    """
+    if start >= end:
+        return
+    size = len(separator)
+    # A separator at the very end doesn't start another piece
+    stop = end
+    if end - start >= size and buffer[end - size: end] == separator and \
+            _aligned(buffer, start, end - size, separator) == end - size:
+        stop = end - size
+    while start + chunk_size < stop:
+        # Cut at the last separator within range, or if there isn't one, the next one
+        cut = buffer.rfind(separator, start, start + chunk_size)
+        if cut == -1:
+            cut = buffer.find(separator, start, stop)
+            if cut == -1:
+                break
+        cut = _aligned(buffer, start, cut, separator)
+        yield start, cut
+        start = cut + size
+    yield start, stop
+
+def split_ranges(source, parts: int, separator: bytes=b'\n') -> list:
+    """
+    Split an uncompressed file into byte ranges of roughly equal size, cutting only at separators
+    (which are left out of the ranges), so that each range can be read on its own with
+    iter_chunks(source, separator, start=start, end=end), e.g. by a different process. With
+    separator=b'\n\n' no group of lines is ever split between ranges. Only the bytes around each
+    cut are read.
+
+    Parameters
+    ----------
+    source : str or os.PathLike
+        The input, which has to be an uncompressed file to be split. Anything else is returned
+        as a single range.
+    parts : int
+        The number of ranges to aim for. There are fewer if the file has too few separators.
+    separator : bytes, optional
+        The bytes which the file can be split at.
+        The default is b'\n'.
+
+    Returns
+    -------
+    ranges : list(tuple(int, int or NoneType))
+        The (start, end) byte offsets of each range, in order, where an end of None means the end
+        of the input.
+
+    """
+    if not _is_plain_file(source):
+        return [(0, None)]
+
+    ranges = []
+    start = 0
+    with map_input(source) as buffer:
+        for i in range(1, parts):
+            # Cut at the first separator after the even split which bytes.split would cut at, and
+            # never make an empty range
+            cut = buffer.find(separator, max(start + 1, len(buffer)*i//parts))
+            if cut != -1:
+                cut = _aligned(buffer, start, cut, separator)
+                if cut == start:
+                    cut = buffer.find(separator, start + len(separator))
+                    if cut != -1:
+                        cut = _aligned(buffer, start, cut, separator)
+            if cut == -1:
+                break
+            ranges.append((start, cut))
+            start = cut + len(separator)
+        ranges.append((start, len(buffer)))
+
+    return ranges
+
+def iter_chunks(source, separator: bytes=b'\n', chunk_size: int=CHUNK_SIZE, start: int=0,
+                end: int=None):
+    """
+    Split an input into pieces of roughly chunk_size bytes, cutting only at separators (which are
+    removed), so that each piece can be parsed on its own, e.g. separator=b'\n\n' never splits up
+    a group of lines. Only one piece is held in memory at a time, so the input can be larger than
+    the available memory. Uncompressed files are memory mapped, and their pieces are memoryviews
+    into the file which are only valid until the next piece is requested. Uncompressed files can
+    also be read from start to end only, e.g. one of the ranges from split_ranges.
+
+    The pieces only ever cut where bytes.split(separator) would (so in a run of separators which
+    overlap, e.g. b'\n\n\n\n' for b'\n\n', at the first of each pair), and a separator at the very
+    end doesn't start another piece. For the same chunk_size, the pieces are the same whether the
+    input is memory mapped or read as a stream.
+
+    Parameters
+    ----------
+    source : str, os.PathLike, stream or iterable
+        The input, in any form accepted by iter_lines.
+    separator : bytes, optional
+        The bytes which the pieces can be split at.
+        The default is b'\n'.
+    chunk_size : int, optional
+        The size in bytes to aim for. Pieces are longer if there is no separator in range.
+        The default is CHUNK_SIZE (16 MiB).
+    start : int, optional
+        Byte offset to start reading from, only for uncompressed files.
+        The default is 0.
+    end : int or NoneType, optional
+        Byte offset to stop reading at, only for uncompressed files, if None then the end of the
+        input.
+        The default is None.
+
+    Raises
+    ------
+    ValueError
+        If a start or end is given for an input which isn't an uncompressed file.
+
+    Yields
+    ------
+    chunk : memoryview or bytes
+        Each piece of the input, in order.
+
+    """
+    if _is_plain_file(source):
+        with map_input(source) as buffer:
+            end = len(buffer) if end is None else min(end, len(buffer))
+            for piece_start, piece_end in _pieces(buffer, start, end, separator, chunk_size):
+                with memoryview(buffer)[piece_start: piece_end] as chunk:
+                    yield chunk
+        return
+    if start or end is not None:
+        raise ValueError('Only uncompressed files can be read from a byte range')
+
+    # Anything else is read one block at a time into a buffer, which is cut in the same way as a
+    # mapped file once it holds more than a piece (see _pieces)
+    if isinstance(source, (str, os.PathLike)):
+        context = _open(os.fspath(source), 'b') if source != '-' else \
+                  contextlib.nullcontext(sys.stdin.buffer)
+    elif hasattr(source, 'read'):
+        context = contextlib.nullcontext(getattr(source, 'buffer', source))
+    else:
+        # Iterables of lines are read in full
+        context = contextlib.nullcontext(io.BytesIO(read_bytes(source)))
+    size = len(separator)
+    with context as stream:
+        buffer = bytearray()
+        # How far the buffer has been searched for a separator after the current window
+        searched = 0
+        while True:
+            block = stream.read(chunk_size)
+            if not block:
+                break
+            buffer += block.encode() if isinstance(block, str) else block
+            # Cut while there is more than a piece (and a separator) left, after which a mapped
+            # file would be cut as well, whatever follows
+            while len(buffer) > chunk_size + size:
+                cut = buffer.rfind(separator, 0, chunk_size)
+                if cut == -1:
+                    # Wait for more of the input if there isn't a separator yet
+                    cut = buffer.find(separator, searched)
+                    if cut == -1:
+                        searched = max(0, len(buffer) - size + 1)
+                        break
+                cut = _aligned(buffer, 0, cut, separator)
+                yield bytes(buffer[:cut])
+                del buffer[:cut + size]
+                searched = 0
+        # Whatever is left is cut exactly as a mapped file would be
+        for piece_start, piece_end in _pieces(buffer, 0, len(buffer), separator, chunk_size):
+            yield bytes(buffer[piece_start: piece_end])
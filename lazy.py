@@ -0,0 +1,136 @@
+"""
+Lazy imports for the heavy dependencies (numpy, sympy and tqdm), so that importing a day only pays
+for them once a function which needs them actually runs:
+
+    np = lazy_import('numpy')
+
+np is then a stand-in module, and the first time any attribute of it is looked up (np.where, ...)
+the real module is imported and its namespace copied into the stand-in, so every later lookup is a
+plain module attribute lookup with no extra cost. If the module has already been imported by
+something else, it is returned directly and no stand-in is made.
+
+Attributes which are looked up when a function is defined count as uses, so annotations such as
+-> np.ndarray need to be strings (or come after from __future__ import annotations).
+
+Long-lived processes which import the days up front to save time on their first request (the
+daemon and the batch and aio workers) call preload() afterwards, so that they also import whatever
+those days stand in for.
+"""
+import importlib
+import sys
+import threading
+import types
+
+# Every stand-in made so far, for preload()
+_stand_ins = []
+
+class LazyModule(types.ModuleType):
+    """
+    Class standing in for a module which hasn't been imported yet, importing it on first use.
+    """
+
+    def __init__(self, name: str, on_load=None):
+        """
+        Parameters
+        ----------
+        name : str
+            The full name of the module, e.g. 'numpy' or 'sympy.parsing.sympy_parser'.
+        on_load : function or NoneType, optional
+            Function to call with the real module once it has been imported, e.g. to configure it.
+            The default is None.
+
+        """
+        super().__init__(name)
+        _stand_ins.append(self)
+        # Stored in the instance dictionary, where they are overwritten by the real module
+        self.__dict__['_lazy_on_load'] = on_load
+        self.__dict__['_lazy_lock'] = threading.Lock()
+
+    def _load(self) -> types.ModuleType:
+        """
+        Import the real module and copy its namespace into this one, only the first time.
+        """
+        with self.__dict__['_lazy_lock']:
+            module = sys.modules.get(self.__name__)
+            if module is None or '_lazy_on_load' in self.__dict__:
+                on_load = self.__dict__.get('_lazy_on_load')
+                module = importlib.import_module(self.__name__)
+                self.__dict__.update(module.__dict__)
+                self.__dict__.pop('_lazy_on_load', None)
+                if on_load is not None:
+                    on_load(module)
+        return module
+
+    def __getattr__(self, attribute: str):
+        # Only reached for attributes which aren't in the namespace yet, i.e. before loading
+        return getattr(self._load(), attribute)
+
+    def __dir__(self) -> list:
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        loaded = '_lazy_on_load' not in self.__dict__
+        return f'<lazy module {self.__name__!r} ({"loaded" if loaded else "not loaded"})>'
+
+def lazy_import(name: str, on_load=None) -> types.ModuleType:
+    """
+    Import a module on first use rather than straight away.
+
+    Parameters
+    ----------
+    name : str
+        The full name of the module, e.g. 'numpy' or 'sympy.parsing.sympy_parser'.
+    on_load : function or NoneType, optional
+        Function to call with the real module once it has been imported, e.g. to configure it.
+        Called straight away if the module has already been imported.
+        The default is None.
+
+    Returns
+    -------
+    module : module
+        The module if it has already been imported, otherwise a LazyModule standing in for it.
+
+    """
+    if name in sys.modules:
+        module = sys.modules[name]
+        if on_load is not None:
+            on_load(module)
+        return module
+
+    return LazyModule(name, on_load)
+
+def is_loaded(name: str) -> bool:
+    """
+    Check whether a module has really been imported (and not just stood in for).
+
+    Parameters
+    ----------
+    name : str
+        The full name of the module.
+
+    Returns
+    -------
+    loaded : bool
+        Whether the module is in sys.modules.
+
+    """
+    return name in sys.modules
+
+def preload() -> list:
+    """
+    Import every module which has been stood in for so far but not used yet, e.g. after importing
+    the days in a long-lived process, so that its first request doesn't pay for the imports.
+
+    Returns
+    -------
+    names : list(str)
+        The names of the modules which were imported.
+
+    """
+    names = []
+    for module in list(_stand_ins):
+        if '_lazy_on_load' in module.__dict__:
+            module._load()
+            names.append(module.__name__)
+
+    return names
@@ -0,0 +1,312 @@
+"""
+Opt-in persistent memo of the answers of the DayN_PartM and DayN_solve functions, so asking the
+same question twice (e.g. Day15_Part1 with the same row_of_interest for the same sensor file)
+returns the stored answer instead of solving again. Each answer is stored in a SQLite database
+under a key built from:
+    - the name of the function and a version number which can be bumped by hand
+    - a hash of the function's code and of the source file of its module, so editing the day
+      (including any helper it calls) invalidates its answers
+    - every argument other than input_file
+    - the SHA-256 of the input file's contents (see input_cache.file_hash)
+Only inputs which are files on disk are memoised, anything else (streams, stdin, lists of lines)
+is always solved. Entries older than max_age_days are dropped, and once the stored answers take
+up more than max_bytes the least recently used are evicted.
+
+The memo is off by default and every decorated function just calls straight through. Turn it on
+with enable(), the --memo flag of aoc.py, or by setting the AOC_MEMO environment variable to a
+database path (or to 1 to use the default one). Within a bypass() block (or with the --no-memo
+flag of aoc.py) it is skipped entirely, neither reading nor storing answers.
+"""
+import contextlib
+import functools
+import os
+import time
+
+import input_cache
+from lazy import lazy_import
+# Only needed once the memo is used, so not imported with every day
+hashlib = lazy_import('hashlib')
+inspect = lazy_import('inspect')
+pickle = lazy_import('pickle')
+sqlite3 = lazy_import('sqlite3')
+
+# Default location of the database, next to the DayN modules
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.memo.sqlite')
+
+# Bump if the format of the entries ever changes, to invalidate every old entry
+MEMO_FORMAT = 1
+
+# Current memo settings, or None if the memo is disabled
+_settings = None
+# Open connection to the database, and the process it was opened in (connections can't be shared
+# with the workers of batch.py)
+_connection = None
+_connection_pid = None
+# Number of nested bypass() blocks currently open
+_bypassed = 0
+# Number of hits, misses, stored answers and evicted answers since the memo was enabled
+stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+def enable(path: str=None, max_bytes: int=64*2**20, max_age_days: float=30) -> None:
+    """
+    Turn on the memo for every decorated function.
+
+    Parameters
+    ----------
+    path : str or NoneType, optional
+        Path of the SQLite database, if None then DEFAULT_PATH is used.
+        The default is None.
+    max_bytes : int, optional
+        Maximum total size of the stored (pickled) answers.
+        The default is 64 MiB.
+    max_age_days : float, optional
+        Age in days after which an answer is dropped, however often it is used.
+        The default is 30.
+
+    Returns
+    -------
+    None
+
+    """
+    global _settings
+    disable()
+    _settings = {'path': path or DEFAULT_PATH, 'max_bytes': max_bytes,
+                 'max_age': max_age_days*24*60*60}
+    for name in stats:
+        stats[name] = 0
+
+def disable() -> None:
+    """
+    Turn off the memo and close the database, leaving the stored answers in place.
+
+    Returns
+    -------
+    None
+
+    """
+    global _settings, _connection
+    _settings = None
+    if _connection is not None and _connection_pid == os.getpid():
+        _connection.close()
+    _connection = None
+
+def is_enabled() -> bool:
+    """
+    Check whether the memo is turned on (and not bypassed).
+
+    Returns
+    -------
+    enabled : bool
+        Whether the memo is turned on.
+
+    """
+    return _settings is not None and not _bypassed
+
+@contextlib.contextmanager
+def bypass():
+    """
+    Context manager skipping the memo for any calls made inside it, e.g. to time the real
+    solutions while the memo is enabled.
+
+    Yields
+    ------
+    None
+
+    """
+    global _bypassed
+    _bypassed += 1
+    try:
+        yield
+    finally:
+        _bypassed -= 1
+
+def _connect() -> 'sqlite3.Connection':
+    """
+    Open the database (once per process), creating its table if needed.
+    """
+    global _connection, _connection_pid
+    if _connection is None or _connection_pid != os.getpid():
+        directory = os.path.dirname(os.path.abspath(_settings['path']))
+        os.makedirs(directory, exist_ok=True)
+        # Several processes (e.g. the workers of batch.py) can share the database
+        _connection = sqlite3.connect(_settings['path'], timeout=30, isolation_level=None)
+        _connection.execute('CREATE TABLE IF NOT EXISTS answers (key TEXT PRIMARY KEY, '
+                            'function TEXT, answer BLOB, size INTEGER, created REAL, '
+                            'accessed REAL)')
+        _connection_pid = os.getpid()
+
+    return _connection
+
+def clear(path: str=None) -> None:
+    """
+    Remove every stored answer.
+
+    Parameters
+    ----------
+    path : str or NoneType, optional
+        Path of the database. If None, the path of the current settings is used, or DEFAULT_PATH
+        if the memo is disabled.
+        The default is None.
+
+    Returns
+    -------
+    None
+
+    """
+    path = path or (_settings or {}).get('path', DEFAULT_PATH)
+    if _settings is not None and path == _settings['path']:
+        _connect().execute('DELETE FROM answers')
+    elif os.path.isfile(path):
+        with contextlib.closing(sqlite3.connect(path, timeout=30)) as connection:
+            with connection:
+                connection.execute('DELETE FROM answers')
+
+def summary() -> dict:
+    """
+    Describe the stored answers.
+
+    Returns
+    -------
+    summary : dict
+        The number of answers and their total size in bytes for each function, along with the
+        hit and miss counts since the memo was enabled.
+
+    """
+    functions = {}
+    if _settings is not None:
+        for function, count, size in _connect().execute(
+                'SELECT function, COUNT(*), SUM(size) FROM answers GROUP BY function'):
+            functions[function] = {'answers': count, 'bytes': size}
+
+    return {'functions': functions, **stats}
+
+def _lookup(key: str):
+    """
+    Find a stored answer, returning it pickled, or None if it is missing or too old.
+    """
+    connection = _connect()
+    now = time.time()
+    row = connection.execute('SELECT answer, created FROM answers WHERE key = ?',
+                             (key,)).fetchone()
+    if row is None:
+        return None
+    if now - row[1] > _settings['max_age']:
+        connection.execute('DELETE FROM answers WHERE key = ?', (key,))
+        stats['evictions'] += 1
+        return None
+    # Mark the answer as recently used for the eviction
+    connection.execute('UPDATE answers SET accessed = ? WHERE key = ?', (now, key))
+
+    return row[0]
+
+def _store(key: str, function: str, data: bytes) -> None:
+    """
+    Store a pickled answer, then evict old and least recently used answers until the rest fit.
+    """
+    connection = _connect()
+    now = time.time()
+    with connection:
+        connection.execute('INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?)',
+                           (key, function, data, len(data), now, now))
+        stats['stores'] += 1
+        stats['evictions'] += connection.execute('DELETE FROM answers WHERE created < ?',
+                                                 (now - _settings['max_age'],)).rowcount
+        total = connection.execute('SELECT COALESCE(SUM(size), 0) FROM answers').fetchone()[0]
+        if total > _settings['max_bytes']:
+            for old_key, size in connection.execute('SELECT key, size FROM answers '
+                                                    'ORDER BY accessed').fetchall():
+                if total <= _settings['max_bytes']:
+                    break
+                connection.execute('DELETE FROM answers WHERE key = ?', (old_key,))
+                stats['evictions'] += 1
+                total -= size
+
+def memoized(function=None, *, version: int=1):
+    """
+    Decorator adding the memo to a DayN_PartM or DayN_solve function, which takes the path to an
+    input file as its input_file argument. Can be used either bare, as @memoized, or as
+    @memoized(version=2) to invalidate old answers by hand. Functions with side effects (printing
+    or writing files) should not be memoised, since these are skipped on a hit.
+
+    Parameters
+    ----------
+    function : function or NoneType, optional
+        The function to decorate.
+        The default is None.
+    version : int, optional
+        Version number of the function, which is part of the memo key. Changes to its module
+        already invalidate old answers, so this only needs to be bumped if a shared module it
+        uses (e.g. search.py) changes its answers.
+        The default is 1.
+
+    Returns
+    -------
+    wrapper : function
+        The function, which looks up its answer in the memo when the memo is enabled.
+
+    """
+    if function is None:
+        return functools.partial(memoized, version=version)
+
+    name = f'{function.__module__}.{function.__qualname__}'
+    # Signature and identity of the function, only worked out when first needed to keep imports
+    # fast
+    signature, identity = [], []
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not is_enabled():
+            return function(*args, **kwargs)
+
+        if not signature:
+            signature.append(inspect.signature(function))
+        arguments = signature[0].bind(*args, **kwargs)
+        arguments.apply_defaults()
+        arguments = dict(arguments.arguments)
+        input_file = arguments.pop('input_file', None)
+        # Only files on disk can be memoised, anything else is just solved
+        if not isinstance(input_file, (str, os.PathLike)) or not os.path.isfile(input_file):
+            return function(*args, **kwargs)
+        parameters = repr(sorted(arguments.items()))
+        # Arguments without a stable repr (which includes their memory address) can't be keys
+        if ' at 0x' in parameters:
+            return function(*args, **kwargs)
+
+        if not identity:
+            digest = input_cache.code_hash(function.__code__, hashlib.sha256(
+                f'{MEMO_FORMAT}:{name}:{version}:'.encode()))
+            source = function.__globals__.get('__file__')
+            if source and os.path.isfile(source):
+                digest.update(input_cache.file_hash(source).encode())
+            identity.append(digest)
+        digest = identity[0].copy()
+        digest.update(input_cache.file_hash(input_file).encode())
+        digest.update(parameters.encode())
+        key = digest.hexdigest()
+
+        data = _lookup(key)
+        if data is not None:
+            try:
+                answer = pickle.loads(data)
+                stats['hits'] += 1
+                return answer
+            except Exception:
+                # Entry is corrupt or refers to something which no longer exists, so solve again
+                pass
+
+        stats['misses'] += 1
+        answer = function(*args, **kwargs)
+        try:
+            data = pickle.dumps(answer, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # Some answers cannot be pickled, in which case they are just never memoised
+            return answer
+        _store(key, name, data)
+
+        return answer
+
+    return wrapper
+
+# Allow the memo to be turned on without changing any code
+if os.environ.get('AOC_MEMO'):
+    enable(None if os.environ['AOC_MEMO'] == '1' else os.environ['AOC_MEMO'])
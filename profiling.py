@@ -0,0 +1,547 @@
+"""
+Opt-in profiling of the hot functions in each day, e.g. how many times Day13.compare_order is
+called by a sort, or how many nodes the recursive Day19.find_max_geodes search expands.
+
+Functions are marked with the @hot decorator, which only adds them to a registry and returns them
+unchanged, so marked functions cost nothing while no profile is running. Entering profile() swaps
+every marked function for a counting version in its module (in the same way aoc.run_part times the
+parsers), which works because the days look their functions up in the module namespace each time
+they are called, including recursive calls. Leaving it puts the originals back.
+
+For each marked function the profile records the number of calls, the number of values yielded by
+generators (the nodes of the searches in search.py), the cumulative time (counting recursive calls
+only once) and the self time. The self times can also be written out as a collapsed stack file,
+which flamegraph.pl, speedscope or inferno can draw as a flame graph.
+
+    with profiling.profile() as prof:
+        Day13.Day13_Part2('Inputs/Day13_Inputs.txt')
+    print(prof.report())
+    prof.write_collapsed('day13.folded')
+
+Memory is accounted in the same opt-in way. Solutions mark their phases (parse, precompute,
+search...) with phase(), which adds a frame to the running profile, and while trace_memory() is
+open also records the peak memory traced by tracemalloc, the peak RSS (on Linux) and the top
+allocation sites of each phase. Outside of a profile or memory trace, phase() does nothing.
+
+    with profiling.trace_memory() as trace:
+        Day24.Day24_Part1('Inputs/Day24_Inputs.txt')
+    print(trace.report())
+    trace.write_json('day24_memory.json')
+"""
+import contextlib
+import functools
+import sys
+import time
+
+from lazy import lazy_import
+# Only needed once something is profiled, so not imported with every day
+inspect = lazy_import('inspect')
+
+# Every marked function, as (module name, attribute name, label, function)
+HOT = []
+
+# The profile currently running, if any
+_active = None
+
+def hot(function=None, name: str=None):
+    """
+    Decorator marking a module level function as worth profiling. It can be used bare (@hot) or
+    with a label for the reports (@hot(name='Day19 geode search')).
+
+    Parameters
+    ----------
+    function : function or NoneType, optional
+        The function to mark, if None then a decorator is returned.
+        The default is None.
+    name : str or NoneType, optional
+        Label for the function in the reports, if None then module.function is used.
+        The default is None.
+
+    Returns
+    -------
+    function : function
+        The same function, unchanged.
+
+    """
+    if function is None:
+        return lambda function: hot(function, name)
+
+    HOT.append((function.__module__, function.__name__,
+                name or f'{function.__module__}.{function.__qualname__}', function))
+
+    return function
+
+class Stats:
+    """
+    Class holding the counters of a single marked function.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.nodes = 0
+        self.cumulative_time = 0.0
+        self.self_time = 0.0
+        # Number of calls currently running, so recursive calls are only timed once
+        self.depth = 0
+
+class Profile:
+    """
+    Class recording the counters of the marked functions, along with the self time of every stack
+    of marked functions seen (for the collapsed stack file).
+    """
+
+    def __init__(self, root: str='all'):
+        self.stats = {}
+        self.stacks = {}
+        # Stack of (label, time entered, time spent in the frames called from it)
+        self.stack = [(root, time.perf_counter(), 0.0)]
+
+    def enter(self, label: str) -> None:
+        """
+        Start timing a frame, called when a marked function (or a frame()) is entered.
+        """
+        stats = self.stats.get(label)
+        if stats is None:
+            stats = self.stats[label] = Stats()
+        stats.depth += 1
+        self.stack.append((label, time.perf_counter(), 0.0))
+
+    def exit(self) -> None:
+        """
+        Stop timing the innermost frame, adding its times to the counters and to its stack.
+        """
+        label, start, children = self.stack.pop()
+        elapsed = time.perf_counter() - start
+        stats = self.stats[label]
+        stats.depth -= 1
+        # Only the outermost of any recursive calls adds to the cumulative time
+        if not stats.depth:
+            stats.cumulative_time += elapsed
+        stats.self_time += elapsed - children
+        path = tuple(frame[0] for frame in self.stack) + (label,)
+        self.stacks[path] = self.stacks.get(path, 0.0) + elapsed - children
+        # The time spent in this frame is not the parent's own time
+        parent, parent_start, parent_children = self.stack[-1]
+        self.stack[-1] = (parent, parent_start, parent_children + elapsed)
+
+    def wrap(self, function, label: str):
+        """
+        Create the counting version of a marked function.
+        """
+        if inspect.isgeneratorfunction(function):
+            @functools.wraps(function)
+            def counted(*args, **kwargs):
+                self.stats.setdefault(label, Stats()).calls += 1
+                generator = function(*args, **kwargs)
+                while True:
+                    # Only the time spent inside the generator counts, not in the loop using it
+                    self.enter(label)
+                    try:
+                        value = next(generator)
+                    except StopIteration as stop:
+                        return stop.value
+                    finally:
+                        self.exit()
+                    self.stats[label].nodes += 1
+                    yield value
+        else:
+            @functools.wraps(function)
+            def counted(*args, **kwargs):
+                self.enter(label)
+                self.stats[label].calls += 1
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.exit()
+
+        return counted
+
+    def report(self) -> str:
+        """
+        Build a table of the counters of every function called, slowest first.
+
+        Returns
+        -------
+        report : str
+            The table, with one line per function.
+
+        """
+        lines = [f'{"function":<40} {"calls":>10} {"nodes":>10} {"cumulative s":>13} '
+                 f'{"self s":>10}']
+        for label, stats in sorted(self.stats.items(), key=lambda item: -item[1].cumulative_time):
+            lines.append(f'{label:<40} {stats.calls:>10} {stats.nodes:>10} '
+                         f'{stats.cumulative_time:>13.4f} {stats.self_time:>10.4f}')
+
+        return '\n'.join(lines)
+
+    def collapsed(self) -> list:
+        """
+        Build the lines of a collapsed stack file, one per stack of frames, each giving the self
+        time of the innermost frame in microseconds, e.g. 'all;Day13_Part2;Day13.compare_order 52'.
+
+        Returns
+        -------
+        lines : list(str)
+            The lines of the file, without newlines.
+
+        """
+        # Time outside any frame belongs to the root
+        root, start, children = self.stack[0]
+        stacks = dict(self.stacks)
+        stacks[(root,)] = stacks.get((root,), 0.0) + time.perf_counter() - start - children
+
+        return [f'{";".join(path)} {round(seconds*1e6)}' for path, seconds in stacks.items() \
+                if round(seconds*1e6) > 0]
+
+    def write_collapsed(self, path: str) -> None:
+        """
+        Write the collapsed stack file (see Profile.collapsed) for drawing a flame graph.
+        """
+        with open(path, 'w') as f:
+            f.writelines(line + '\n' for line in self.collapsed())
+
+@contextlib.contextmanager
+def profile(root: str='all'):
+    """
+    Context manager which profiles every marked function while it is open. Profiles can't be
+    nested.
+
+    Parameters
+    ----------
+    root : str, optional
+        Label of the outermost frame in the collapsed stacks.
+        The default is 'all'.
+
+    Raises
+    ------
+    RuntimeError
+        If a profile is already running.
+
+    Yields
+    ------
+    profile : Profile
+        The profile, which can be read once the context is closed.
+
+    """
+    global _active
+    if _active is not None:
+        raise RuntimeError('A profile is already running')
+
+    prof = Profile(root)
+    swapped = []
+    for module_name, attribute, label, function in HOT:
+        module = sys.modules.get(module_name)
+        # Skip any function which has been replaced since it was marked
+        if module is not None and getattr(module, attribute, None) is function:
+            setattr(module, attribute, prof.wrap(function, label))
+            swapped.append((module, attribute, function))
+    _active = prof
+    try:
+        yield prof
+    finally:
+        _active = None
+        for module, attribute, function in swapped:
+            setattr(module, attribute, function)
+
+@contextlib.contextmanager
+def frame(label: str):
+    """
+    Context manager adding a named frame to the running profile, e.g. around each part run by
+    aoc.py, so the collapsed stacks show which part each function was called from. Does nothing if
+    no profile is running.
+
+    Parameters
+    ----------
+    label : str
+        Label of the frame.
+
+    Yields
+    ------
+    None
+
+    """
+    prof = _active
+    if prof is None:
+        yield
+        return
+    prof.enter(label)
+    prof.stats[label].calls += 1
+    try:
+        yield
+    finally:
+        prof.exit()
+
+tracemalloc = lazy_import('tracemalloc')
+try:
+    import resource
+except ImportError:
+    # Peak RSS is only available on Unix
+    resource = None
+
+# The memory trace currently running, if any
+_active_memory = None
+
+def peak_rss() -> int:
+    """
+    Find the peak resident set size of the process so far, in bytes, or None if it is not
+    available on this platform. This is the peak of the whole run so far, unless the peak has been
+    reset by reset_rss_peak.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux gives KiB, macOS gives bytes
+    return peak if sys.platform == 'darwin' else peak*1024
+
+# Linux lets a process reset its own peak RSS (VmHWM) to its current RSS, by writing 5 to this file
+_CLEAR_REFS = '/proc/self/clear_refs'
+_STATUS = '/proc/self/status'
+
+def reset_rss_peak() -> bool:
+    """
+    Reset the peak resident set size of the process to its current size, so that
+    phase_rss_peak() gives the peak from now on. Only possible on Linux.
+
+    Returns
+    -------
+    reset : bool
+        Whether the peak could be reset.
+
+    """
+    try:
+        with open(_CLEAR_REFS, 'w') as f:
+            f.write('5')
+    except OSError:
+        return False
+    return True
+
+def phase_rss_peak() -> int:
+    """
+    Find the peak resident set size of the process since it was last reset by reset_rss_peak(),
+    in bytes, or None if it is not available on this platform.
+    """
+    try:
+        with open(_STATUS) as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    # Given in kB
+                    return int(line.split()[1])*1024
+    except OSError:
+        pass
+    return None
+
+class MemoryTrace:
+    """
+    Class recording the memory used by each phase marked with phase(), using tracemalloc. For each
+    phase (identified by its stack of labels, e.g. 'Day24_Part1;search') it records the peak
+    traced memory, how far this rose above the memory in use when the phase began, the memory
+    still held when it ended, the peak RSS during the phase, and the source lines which allocated
+    most of the memory still held at the end. The peak RSS of each phase needs the peak to be
+    reset when the phase begins, which is only possible on Linux, elsewhere it is None (see
+    peak_rss for the peak of the whole process).
+    """
+
+    def __init__(self, top: int=5):
+        self.top = top
+        self.phases = {}
+        # Stack of [label, peak so far, memory in use on entry, snapshot on entry, peak RSS so far]
+        self.stack = []
+        # Whether the peak RSS can be reset for each phase, only checked on first use
+        self.rss = None
+        # Resetting the peak RSS also resets the process peak, so keep track of it here
+        self.process_rss = peak_rss()
+
+    def enter(self, label: str) -> None:
+        """
+        Start recording a phase.
+        """
+        # The peak so far belongs to the enclosing phase, before it is reset for this one
+        if self.stack:
+            self.stack[-1][1] = max(self.stack[-1][1], tracemalloc.get_traced_memory()[1])
+            self.stack[-1][4] = self._rss_max(self.stack[-1][4], phase_rss_peak())
+        snapshot = self._snapshot() if self.top else None
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        if self.rss is not False:
+            self.process_rss = self._rss_max(self.process_rss, peak_rss())
+            self.rss = reset_rss_peak()
+        rss = phase_rss_peak() if self.rss else None
+        self.stack.append([label, current, current, snapshot, rss])
+
+    def exit(self) -> None:
+        """
+        Stop recording the innermost phase, adding its figures to the phases recorded.
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        label, peak_so_far, start, snapshot, rss = self.stack.pop()
+        peak = max(peak, peak_so_far)
+        if self.rss:
+            rss = self._rss_max(rss, phase_rss_peak())
+        sites = []
+        if snapshot is not None:
+            for stat in self._snapshot().compare_to(snapshot, 'lineno')[:self.top]:
+                if stat.size_diff <= 0:
+                    break
+                frame = stat.traceback[0]
+                sites.append({'site': f'{frame.filename}:{frame.lineno}',
+                              'bytes': stat.size_diff, 'blocks': stat.count_diff})
+            del snapshot
+        # Forget the memory taken by the snapshots themselves
+        tracemalloc.reset_peak()
+
+        path = ';'.join([frame[0] for frame in self.stack] + [label])
+        record = self.phases.get(path)
+        if record is None:
+            record = self.phases[path] = {'calls': 0, 'peak_traced': 0, 'peak_increase': 0,
+                                          'retained': 0, 'peak_rss': rss, 'top': []}
+        record['calls'] += 1
+        record['retained'] = max(record['retained'], current - start)
+        record['peak_rss'] = self._rss_max(record['peak_rss'], rss)
+        # Keep the allocation sites of the call which used the most memory
+        if peak - start >= record['peak_increase']:
+            record['peak_increase'] = peak - start
+            record['top'] = sites
+        record['peak_traced'] = max(record['peak_traced'], peak)
+        # The enclosing phase peaked at least as high as this one
+        if self.stack:
+            self.stack[-1][1] = max(self.stack[-1][1], peak)
+            self.stack[-1][4] = self._rss_max(self.stack[-1][4], rss)
+
+    @staticmethod
+    def _rss_max(a: int, b: int) -> int:
+        """
+        Find the larger of two peak RSS figures, either of which can be None if it is unknown.
+        """
+        return b if a is None else a if b is None else max(a, b)
+
+    @staticmethod
+    def _snapshot() -> 'tracemalloc.Snapshot':
+        """
+        Take a snapshot of the traced memory, leaving out the allocations of tracemalloc and of the
+        trace itself.
+        """
+        return tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__),
+             tracemalloc.Filter(False, '<frozen importlib._bootstrap*>')))
+
+    def report(self) -> str:
+        """
+        Build a table of the memory used by every phase, in the order they were first entered,
+        followed by the top allocation sites of each.
+
+        Returns
+        -------
+        report : str
+            The table, with one line per phase and allocation site.
+
+        """
+        mib = lambda size: f'{size/2**20:.2f}' if size is not None else '-'
+        lines = [f'{"phase":<40} {"calls":>6} {"peak MiB":>10} {"increase MiB":>13} '
+                 f'{"retained MiB":>13} {"peak RSS MiB":>13}']
+        for path, record in self.phases.items():
+            lines.append(f'{path:<40} {record["calls"]:>6} {mib(record["peak_traced"]):>10} '
+                         f'{mib(record["peak_increase"]):>13} {mib(record["retained"]):>13} '
+                         f'{mib(record["peak_rss"]):>13}')
+            for site in record['top']:
+                lines.append(f'    {mib(site["bytes"]):>8} MiB in {site["blocks"]:>7} blocks  '
+                             f'{site["site"]}')
+
+        return '\n'.join(lines)
+
+    def to_json(self) -> dict:
+        """
+        Describe the memory used by every phase, for writing out as JSON.
+
+        Returns
+        -------
+        data : dict
+            The figures of each phase ('phases'), as a dictionary of the form (phase: figures),
+            and the peak RSS of the whole process so far ('process_peak_rss'), where all sizes
+            are in bytes.
+
+        """
+        return {'phases': self.phases,
+                'process_peak_rss': self._rss_max(self.process_rss, peak_rss())}
+
+    def write_json(self, path: str) -> None:
+        """
+        Write the figures of every phase (see MemoryTrace.to_json) to a JSON file.
+        """
+        import json
+        with open(path, 'w') as f:
+            json.dump(self.to_json(), f, indent=2)
+
+@contextlib.contextmanager
+def trace_memory(top: int=5, frames: int=1):
+    """
+    Context manager which records the memory used by every phase() entered while it is open, using
+    tracemalloc. Tracing slows everything down considerably, so times measured inside it are not
+    representative. Memory traces can't be nested.
+
+    Parameters
+    ----------
+    top : int, optional
+        Number of allocation sites to keep for each phase, or 0 to skip finding them (which also
+        skips the snapshots, which are slow for large heaps).
+        The default is 5.
+    frames : int, optional
+        Number of frames of each allocation's traceback to keep.
+        The default is 1.
+
+    Raises
+    ------
+    RuntimeError
+        If a memory trace is already running.
+
+    Yields
+    ------
+    trace : MemoryTrace
+        The memory trace, which can be read once the context is closed.
+
+    """
+    global _active_memory
+    if _active_memory is not None:
+        raise RuntimeError('A memory trace is already running')
+
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(frames)
+    _active_memory = MemoryTrace(top)
+    try:
+        yield _active_memory
+    finally:
+        trace, _active_memory = _active_memory, None
+        # Close any phases left open by an exception
+        while trace.stack:
+            trace.exit()
+        if started:
+            tracemalloc.stop()
+
+@contextlib.contextmanager
+def phase(label: str):
+    """
+    Context manager marking a phase of a solution, e.g. 'parse', 'precompute' or 'search', which
+    appears as a frame in the running profile (see frame) and has its memory recorded by the
+    running memory trace (see trace_memory). Does nothing if neither is running.
+
+    Parameters
+    ----------
+    label : str
+        Label of the phase.
+
+    Yields
+    ------
+    None
+
+    """
+    trace = _active_memory
+    if trace is None:
+        with frame(label):
+            yield
+        return
+    trace.enter(label)
+    try:
+        with frame(label):
+            yield
+    finally:
+        trace.exit()
@@ -0,0 +1,441 @@
+"""
+Performance regression gate for the DayN_PartM functions. A baseline of the timings and peak memory
+of each (day, part, input size) is recorded over the seeded synthetic inputs of generators.py and
+stored as JSON in the repository (baselines.json by default). Checking re-runs every entry of the
+baseline the same way and compares the new timings with the stored ones.
+
+Single timings are too noisy to compare, so every entry is run several times after a few warm-up
+runs, and the two sets of timings are compared with a one-sided Mann-Whitney U test, which makes no
+assumption about the shape of the timing distribution. An entry only counts as slower if the test
+is significant and its median time also rose by more than the threshold (and by at least a
+millisecond), so that tiny but consistent differences don't fail the check. Peak memory is
+deterministic, so it is simply compared against its own threshold, and the answers are compared
+too. Everything runs offline with the standard library and the repository's own modules.
+
+Baselines should be recorded and checked on the same machine, since timings from different
+machines can't be compared.
+
+Usage: python regression.py record [days] [--sizes N N ...] [--repeat R] [--warmup W]
+                                   [--baseline FILE]
+       python regression.py check [days] [--threshold T] [--memory-threshold M] [--alpha A]
+                                  [--baseline FILE]
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import aoc
+import benchmark
+import generators
+
+# Default location of the baselines, next to the DayN modules
+DEFAULT_PATH = os.path.join(aoc.ROOT, 'baselines.json')
+
+def entry_name(day: int, part: str, size: int) -> str:
+    """
+    Name of a baseline entry, e.g. 'Day15_Part1@25'.
+    """
+    return f'Day{day}_Part{part}@{size}'
+
+def mann_whitney_u(baseline: list, new: list) -> tuple:
+    """
+    One-sided Mann-Whitney U test of whether the values in new tend to be larger than those in
+    baseline. The p-value is exact for small samples without ties, and otherwise uses the normal
+    approximation with a correction for ties.
+
+    Parameters
+    ----------
+    baseline : list(float)
+        The baseline values, e.g. timings.
+    new : list(float)
+        The new values.
+
+    Returns
+    -------
+    u : float
+        The U statistic of new, the number of (baseline, new) pairs where the new value is larger
+        (with ties counting a half).
+    p_value : float
+        The probability of a U at least this large if both sets come from the same distribution.
+
+    """
+    m, n = len(new), len(baseline)
+    if not m or not n:
+        return 0.0, 1.0
+
+    # Rank all of the values together, giving tied values the average of their ranks
+    values = sorted([(value, 0) for value in baseline] + [(value, 1) for value in new])
+    ranks = [0.0]*len(values)
+    ties = []
+    i = 0
+    while i < len(values):
+        j = i
+        while j + 1 < len(values) and values[j + 1][0] == values[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j)/2 + 1
+        if j > i:
+            ties.append(j - i + 1)
+        i = j + 1
+    u = sum(rank for rank, (value, group) in zip(ranks, values) if group) - m*(m + 1)/2
+
+    if not ties and m*n <= 400:
+        # Count the orderings of the two groups giving each U, building up one value at a time
+        counts = {(0, 0): [1]}
+        for i in range(m + 1):
+            for j in range(n + 1):
+                if i or j:
+                    # The last value is either a new one (adding j to U) or a baseline one
+                    from_new = [0]*j + counts[i - 1, j] if i else []
+                    from_baseline = counts[i, j - 1] if j else []
+                    counts[i, j] = [a + b for a, b in zip(
+                        from_new + [0]*(len(from_baseline) - len(from_new)),
+                        from_baseline + [0]*(len(from_new) - len(from_baseline)))]
+        distribution = counts[m, n]
+        p_value = sum(distribution[int(u):])/sum(distribution)
+    else:
+        total = m + n
+        sigma = math.sqrt(m*n/12*((total + 1) -
+                                  sum(t**3 - t for t in ties)/(total*(total - 1))))
+        if sigma == 0:
+            return u, 1.0
+        # Continuity correction, since U only takes half-integer steps
+        z = (u - m*n/2 - 0.5)/sigma
+        p_value = 0.5*math.erfc(z/math.sqrt(2))
+
+    return u, min(p_value, 1.0)
+
+def load(path: str=DEFAULT_PATH) -> dict:
+    """
+    Load the stored baselines, or an empty set of baselines if there are none.
+
+    Parameters
+    ----------
+    path : str, optional
+        Path of the baseline file.
+        The default is DEFAULT_PATH.
+
+    Returns
+    -------
+    baselines : dict
+        Dictionary with the machine details ('meta') and every entry ('entries'), keyed by
+        entry_name.
+
+    """
+    if not os.path.isfile(path):
+        return {'meta': {}, 'entries': {}}
+    with open(path) as f:
+        return json.load(f)
+
+def measure_entries(entries: list, seed: int=0, repeat: int=10, warmup: int=2,
+                    verbose: bool=True) -> dict:
+    """
+    Run each (day, part, size) several times over its synthetic input.
+
+    Parameters
+    ----------
+    entries : list(tuple(int, str, int))
+        The (day, part, size) of each entry to run.
+    seed : int, optional
+        Seed for the input generators.
+        The default is 0.
+    repeat : int, optional
+        The number of timed runs of each entry.
+        The default is 10.
+    warmup : int, optional
+        The number of untimed runs of each entry made first.
+        The default is 2.
+    verbose : bool, optional
+        Whether to print each entry as it is measured.
+        The default is True.
+
+    Returns
+    -------
+    results : dict
+        Dictionary of the form (entry_name: record), where each record has the times of every
+        run in seconds, the peak_memory in bytes and the answer.
+
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for day, part, size in entries:
+            input_file = os.path.join(directory, f'Day{day}_{size}.txt')
+            if not os.path.isfile(input_file):
+                with open(input_file, 'w') as f:
+                    f.write(generators.generate(day, size, seed))
+            kwargs = benchmark.PART_KWARGS.get((day, part), lambda size: {})(size)
+            record = benchmark.measure(day, part, input_file, repeat, warmup, **kwargs)
+            name = entry_name(day, part, size)
+            results[name] = {'day': day, 'part': part, 'size': size, 'times': record['times'],
+                             'peak_memory': record['peak_memory'], 'answer': record['answer']}
+            if verbose:
+                print(f'{name}: median {statistics.median(record["times"]):.4f} s, '
+                      f'{record["peak_memory"]/2**20:.2f} MiB', file=sys.stderr)
+
+    return results
+
+def record(days: list=None, sizes: list=None, seed: int=0, repeat: int=10, warmup: int=2,
+           path: str=DEFAULT_PATH, verbose: bool=True) -> dict:
+    """
+    Record the baselines of every main part of the given days, replacing any existing entries for
+    those days and keeping the rest.
+
+    Parameters
+    ----------
+    days : list(int) or NoneType, optional
+        The days to record, if None then every day is recorded.
+        The default is None.
+    sizes : list(int) or NoneType, optional
+        The input sizes to use for every day, if None then the smallest size of each day in
+        benchmark.DEFAULT_SIZES is used.
+        The default is None.
+    seed : int, optional
+        Seed for the input generators.
+        The default is 0.
+    repeat : int, optional
+        The number of timed runs of each entry.
+        The default is 10.
+    warmup : int, optional
+        The number of untimed runs of each entry made first.
+        The default is 2.
+    path : str, optional
+        Path of the baseline file.
+        The default is DEFAULT_PATH.
+    verbose : bool, optional
+        Whether to print each entry as it is measured.
+        The default is True.
+
+    Returns
+    -------
+    baselines : dict
+        The baselines, as written to the file.
+
+    """
+    days = days or list(aoc.find_days())
+    entries = [(day, part, size) for day in days
+               for size in sizes or benchmark.DEFAULT_SIZES[day][:1]
+               for part in aoc.find_parts(day)]
+
+    baselines = load(path)
+    baselines['entries'] = {name: entry for name, entry in baselines['entries'].items()
+                            if entry['day'] not in days}
+    baselines['entries'].update(measure_entries(entries, seed, repeat, warmup, verbose))
+    baselines['meta'] = {'python': platform.python_version(), 'machine': platform.machine(),
+                         'platform': platform.platform(), 'seed': seed, 'repeat': repeat,
+                         'warmup': warmup, 'date': time.strftime('%Y-%m-%dT%H:%M:%S')}
+    with open(path, 'w') as f:
+        json.dump(baselines, f, indent=1, sort_keys=True)
+
+    return baselines
+
+def compare(baseline: dict, new: dict, threshold: float=0.1, memory_threshold: float=0.2,
+            alpha: float=0.01, min_change: float=0.001) -> dict:
+    """
+    Compare the new measurements of a single entry with its baseline.
+
+    Parameters
+    ----------
+    baseline : dict
+        The baseline record of the entry.
+    new : dict
+        The new record of the entry.
+    threshold : float, optional
+        Fraction by which the median time has to rise to count as slower.
+        The default is 0.1.
+    memory_threshold : float, optional
+        Fraction by which the peak memory has to rise to count as a regression.
+        The default is 0.2.
+    alpha : float, optional
+        Significance level of the Mann-Whitney U test.
+        The default is 0.01.
+    min_change : float, optional
+        Time in seconds by which the median time also has to rise to count as slower, since
+        parts taking a few milliseconds are dominated by timer and scheduling noise.
+        The default is 0.001.
+
+    Returns
+    -------
+    comparison : dict
+        The baseline and new median times, the relative time change, the p-value, the baseline
+        and new peak memory, and the status, one of 'ok', 'slower', 'memory' or 'answer' (or
+        several of these joined with '+').
+
+    """
+    old_median = statistics.median(baseline['times'])
+    new_median = statistics.median(new['times'])
+    change = (new_median - old_median)/old_median if old_median > 0 else 0.0
+    p_value = mann_whitney_u(baseline['times'], new['times'])[1]
+
+    problems = []
+    if new['answer'] != baseline['answer']:
+        problems.append('answer')
+    if p_value < alpha and change > threshold and new_median - old_median > min_change:
+        problems.append('slower')
+    if new['peak_memory'] > baseline['peak_memory']*(1 + memory_threshold):
+        problems.append('memory')
+
+    return {'old_median': old_median, 'new_median': new_median, 'change': change,
+            'p_value': p_value, 'old_memory': baseline['peak_memory'],
+            'new_memory': new['peak_memory'], 'status': '+'.join(problems) or 'ok'}
+
+def check(days: list=None, threshold: float=0.1, memory_threshold: float=0.2, alpha: float=0.01,
+          path: str=DEFAULT_PATH, verbose: bool=True) -> dict:
+    """
+    Re-run every entry of the baselines (for the given days) with the same seed, repetitions and
+    warm-up, and compare the results with the baselines.
+
+    Parameters
+    ----------
+    days : list(int) or NoneType, optional
+        The days to check, if None then every day in the baselines is checked.
+        The default is None.
+    threshold : float, optional
+        Fraction by which the median time has to rise to count as slower.
+        The default is 0.1.
+    memory_threshold : float, optional
+        Fraction by which the peak memory has to rise to count as a regression.
+        The default is 0.2.
+    alpha : float, optional
+        Significance level of the Mann-Whitney U test.
+        The default is 0.01.
+    path : str, optional
+        Path of the baseline file.
+        The default is DEFAULT_PATH.
+    verbose : bool, optional
+        Whether to print each entry as it is measured.
+        The default is True.
+
+    Raises
+    ------
+    ValueError
+        If there are no baselines to check against.
+
+    Returns
+    -------
+    comparisons : dict
+        Dictionary of the form (entry_name: comparison), see compare.
+
+    """
+    baselines = load(path)
+    stored = {name: entry for name, entry in baselines['entries'].items()
+              if not days or entry['day'] in days}
+    if not stored:
+        raise ValueError(f'No baselines to check against in {path}, record them first')
+
+    meta = baselines['meta']
+    if (meta.get('machine'), meta.get('python')) != (platform.machine(),
+                                                     platform.python_version()):
+        print(f'Warning: baselines were recorded with Python {meta.get("python")} on '
+              f'{meta.get("machine")}, so timings may not be comparable', file=sys.stderr)
+
+    entries = [(entry['day'], entry['part'], entry['size']) for entry in stored.values()]
+    new = measure_entries(entries, meta.get('seed', 0), meta.get('repeat', 10),
+                          meta.get('warmup', 2), verbose)
+
+    return {name: compare(stored[name], new[name], threshold, memory_threshold, alpha)
+            for name in stored}
+
+def format_comparisons(comparisons: dict) -> str:
+    """
+    Build a table of the comparison of every entry, with any regressions listed at the end.
+
+    Parameters
+    ----------
+    comparisons : dict
+        Dictionary of the form (entry_name: comparison), as returned by check.
+
+    Returns
+    -------
+    table : str
+        The table, with one line per entry.
+
+    """
+    lines = [f'{"entry":<24} {"baseline s":>11} {"new s":>11} {"change":>8} {"p":>8} '
+             f'{"baseline MiB":>13} {"new MiB":>9}  status']
+    for name, c in comparisons.items():
+        lines.append(f'{name:<24} {c["old_median"]:>11.4f} {c["new_median"]:>11.4f} '
+                     f'{c["change"]:>+8.1%} {c["p_value"]:>8.4f} '
+                     f'{c["old_memory"]/2**20:>13.2f} {c["new_memory"]/2**20:>9.2f}  '
+                     f'{c["status"]}')
+
+    regressions = [name for name, c in comparisons.items() if c['status'] != 'ok']
+    if regressions:
+        lines.append('')
+        lines.append(f'{len(regressions)} regression(s):')
+        for name in regressions:
+            c = comparisons[name]
+            for problem in c['status'].split('+'):
+                if problem == 'slower':
+                    lines.append(f'  {name}: median time {c["old_median"]:.4f} s -> '
+                                 f'{c["new_median"]:.4f} s ({c["change"]:+.1%}, '
+                                 f'p = {c["p_value"]:.4f})')
+                elif problem == 'memory':
+                    lines.append(f'  {name}: peak memory {c["old_memory"]/2**20:.2f} MiB -> '
+                                 f'{c["new_memory"]/2**20:.2f} MiB')
+                else:
+                    lines.append(f'  {name}: answer changed')
+
+    return '\n'.join(lines)
+
+def main(argv: list=None) -> None:
+    """
+    Command line interface, run with -h for usage.
+
+    Parameters
+    ----------
+    argv : list(str) or NoneType, optional
+        Command line arguments, if None then sys.argv is used.
+        The default is None.
+
+    Returns
+    -------
+    None
+
+    """
+    parser = argparse.ArgumentParser(description='Record or check the performance baselines.')
+    parser.add_argument('command', choices=['record', 'check'],
+                        help='Record new baselines, or check against the stored ones.')
+    parser.add_argument('days', type=int, nargs='*', help='Days to run (all days if none given).')
+    parser.add_argument('-b', '--baseline', default=DEFAULT_PATH,
+                        help='JSON file the baselines are stored in.')
+    parser.add_argument('-s', '--sizes', type=int, nargs='+',
+                        help='Input sizes to record for every day (smallest benchmark size of '
+                             'each day if not given).')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the input generators.')
+    parser.add_argument('-r', '--repeat', type=int, default=10,
+                        help='Number of timed runs of each entry when recording.')
+    parser.add_argument('-w', '--warmup', type=int, default=2,
+                        help='Number of untimed runs of each entry first when recording.')
+    parser.add_argument('-t', '--threshold', type=float, default=0.1,
+                        help='Fraction the median time must rise by to fail the check.')
+    parser.add_argument('-m', '--memory-threshold', type=float, default=0.2,
+                        help='Fraction the peak memory must rise by to fail the check.')
+    parser.add_argument('-a', '--alpha', type=float, default=0.01,
+                        help='Significance level of the Mann-Whitney U test.')
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        baselines = record(args.days, args.sizes, args.seed, args.repeat, args.warmup,
+                           args.baseline)
+        print(f'Recorded {len(baselines["entries"])} entries in {args.baseline}')
+        return
+
+    try:
+        comparisons = check(args.days, args.threshold, args.memory_threshold, args.alpha,
+                            args.baseline)
+    except ValueError as e:
+        # No baselines have been recorded on this machine (none are kept in the repository, as
+        # timings from one machine don't carry over to another)
+        sys.exit(f'{e} with: python regression.py record')
+    print(format_comparisons(comparisons))
+    if any(c['status'] != 'ok' for c in comparisons.values()):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
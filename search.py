@@ -0,0 +1,206 @@
+"""
+Breadth-first, Dijkstra and A* searches over implicit graphs, shared by the days which search a
+grid or a state space. The graph is never built: each search just takes the start states and a
+function giving the neighbours of a state.
+
+Every search is a generator yielding (state, distance) once for each state, in order of
+increasing distance (or of distance plus heuristic for A*). Stopping at a goal is just breaking
+out of the loop, and anything not yet reached is never expanded, e.g.
+    for state, distance in bfs([start], neighbours):
+        if state == goal:
+            break
+
+States are remembered in a set by default. If the states can be numbered from 0 to size - 1
+(e.g. flat indices into a Grid), passing index and size keeps them in a bytearray instead.
+"""
+from collections import deque
+import heapq
+import itertools
+
+from profiling import hot
+
+class _Visited:
+    """
+    Set of the states reached so far, stored either in a set or a bytearray of flags.
+    """
+
+    def __init__(self, index=None, size: int=None):
+        if index is not None and size is not None:
+            self.flags = bytearray(size)
+            self.index = index
+        else:
+            self.seen = set()
+            self.index = None
+
+    def add(self, state) -> bool:
+        # Mark the state as reached, returning whether it was new
+        if self.index is None:
+            if state in self.seen:
+                return False
+            self.seen.add(state)
+        else:
+            i = self.index(state)
+            if self.flags[i]:
+                return False
+            self.flags[i] = 1
+        return True
+
+@hot
+def bfs(starts, neighbours, index=None, size: int=None):
+    """
+    Breadth-first search from one or more start states, where every step has a distance of 1.
+
+    Parameters
+    ----------
+    starts : iterable
+        The start states, which all have a distance of 0.
+    neighbours : function
+        Function taking a state and returning an iterable of the states one step away from it.
+    index : function or NoneType, optional
+        Function numbering each state from 0 to size - 1, to remember the states reached in a
+        bytearray rather than a set. Only used if size is also given.
+        The default is None.
+    size : int or NoneType, optional
+        The number of possible states, if index is given.
+        The default is None.
+
+    Yields
+    ------
+    state : object
+        Each state reached, in order of distance.
+    distance : int
+        The fewest number of steps from any start state to the state.
+
+    """
+    visited = _Visited(index, size)
+    queue = deque((start, 0) for start in starts if visited.add(start))
+    # The loop is written out for each kind of visited set, since this is the hot path
+    if visited.index is None:
+        seen = visited.seen
+        while queue:
+            state, distance = queue.popleft()
+            yield state, distance
+            for next_state in neighbours(state):
+                if next_state not in seen:
+                    seen.add(next_state)
+                    queue.append((next_state, distance + 1))
+    else:
+        flags = visited.flags
+        while queue:
+            state, distance = queue.popleft()
+            yield state, distance
+            for next_state in neighbours(state):
+                i = index(next_state)
+                if not flags[i]:
+                    flags[i] = 1
+                    queue.append((next_state, distance + 1))
+
+@hot
+def dijkstra(starts, neighbours, heuristic=None, index=None, size: int=None):
+    """
+    Dijkstra's search from one or more start states, where each step has its own non-negative
+    cost. With a heuristic this becomes A* (see astar).
+
+    Parameters
+    ----------
+    starts : iterable
+        The start states, which all have a distance of 0.
+    neighbours : function
+        Function taking a state and returning an iterable of (next_state, cost) pairs.
+    heuristic : function or NoneType, optional
+        Function giving a lower bound on the remaining distance from a state to the goal, if None
+        then every state is searched in order of distance.
+        The default is None.
+    index : function or NoneType, optional
+        Function numbering each state from 0 to size - 1, to remember the states settled in a
+        bytearray and the best distance to each state in a list, rather than in a set and a
+        dictionary. Only used if size is also given.
+        The default is None.
+    size : int or NoneType, optional
+        The number of possible states, if index is given.
+        The default is None.
+
+    Yields
+    ------
+    state : object
+        Each state reached, in the order they are settled.
+    distance : int or float
+        The lowest total cost from any start state to the state.
+
+    """
+    heuristic = heuristic or (lambda state: 0)
+    # Counter to break ties in the heap, so states themselves never need to be compared
+    counter = itertools.count()
+    heap = []
+    # The loop is written out for each way of storing the states, since this is the hot path
+    if index is None or size is None:
+        best = {}
+        for start in starts:
+            best[start] = 0
+            heapq.heappush(heap, (heuristic(start), next(counter), 0, start))
+        settled = set()
+        while heap:
+            priority, tie, distance, state = heapq.heappop(heap)
+            # Skip any entries left behind when a shorter route to the state was found
+            if state in settled:
+                continue
+            settled.add(state)
+            yield state, distance
+            for next_state, cost in neighbours(state):
+                next_distance = distance + cost
+                if next_distance < best.get(next_state, next_distance + 1):
+                    best[next_state] = next_distance
+                    heapq.heappush(heap, (next_distance + heuristic(next_state), next(counter),
+                                          next_distance, next_state))
+    else:
+        # The index of each state is kept in the heap, so it is only found once per push
+        best = [None]*size
+        for start in starts:
+            i = index(start)
+            best[i] = 0
+            heapq.heappush(heap, (heuristic(start), next(counter), 0, i, start))
+        settled = bytearray(size)
+        while heap:
+            priority, tie, distance, i, state = heapq.heappop(heap)
+            if settled[i]:
+                continue
+            settled[i] = 1
+            yield state, distance
+            for next_state, cost in neighbours(state):
+                next_distance = distance + cost
+                j = index(next_state)
+                if best[j] is None or next_distance < best[j]:
+                    best[j] = next_distance
+                    heapq.heappush(heap, (next_distance + heuristic(next_state), next(counter),
+                                          next_distance, j, next_state))
+
+def astar(starts, neighbours, heuristic, index=None, size: int=None):
+    """
+    A* search from one or more start states towards a goal, which is Dijkstra's search guided by a
+    heuristic. The distance of each state is only guaranteed to be the lowest if the heuristic
+    never overestimates the remaining distance to the goal.
+
+    Parameters
+    ----------
+    starts : iterable
+        The start states, which all have a distance of 0.
+    neighbours : function
+        Function taking a state and returning an iterable of (next_state, cost) pairs.
+    heuristic : function
+        Function giving a lower bound on the remaining distance from a state to the goal.
+    index : function or NoneType, optional
+        Function numbering each state from 0 to size - 1 (see dijkstra).
+        The default is None.
+    size : int or NoneType, optional
+        The number of possible states, if index is given.
+        The default is None.
+
+    Yields
+    ------
+    state : object
+        Each state reached, in order of distance plus heuristic.
+    distance : int or float
+        The lowest total cost from any start state to the state.
+
+    """
+    return dijkstra(starts, neighbours, heuristic, index, size)
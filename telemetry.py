@@ -0,0 +1,377 @@
+"""
+Opt-in progress telemetry for the long solves (Day15_Part2, Day16, Day17, Day19, Day23_Part2...),
+so that whatever runs them can see how far along they are, estimate when they will finish and stop
+them if they run away.
+
+Solutions report into it as they go, either with absolute values or by counting:
+
+    telemetry.report(done=row, total=rows, best=best_so_far)
+    telemetry.tick('states')
+    for blueprint in telemetry.track(blueprints, unit='blueprints'):
+        ...
+
+and anything listening receives each report as an event, a flat dictionary such as
+    {"event": "progress", "run": "Day15_Part2", "time": 1671062400.0, "elapsed": 12.5,
+     "done": 1200000, "total": 4000001, "fraction": 0.3, "eta": 29.2, "best": 56000011}
+where done/total also give the fraction complete and the estimated time left in seconds. Each
+part run by aoc.run_part is a run of its own, with a "start" event before it and an "end" event
+after it (with its status and final counters), which are always delivered.
+
+Listeners are callbacks, e.g. a JsonLinesWriter writing the events out as JSON lines (see the
+--telemetry flag of aoc.py and batch.py), and each one is rate limited to at most one progress
+event per run every interval seconds, so reporting on every iteration is fine. A callback can stop
+the solve by raising, e.g. the one made by limit().
+
+    with telemetry.listen(telemetry.JsonLinesWriter(sys.stderr), interval=0.5):
+        aoc.run_part(15, '2')
+
+Nothing is listening by default, in which case report() and tick() return straight away and
+track() returns the iterable unchanged, so the solutions cost (almost) nothing extra.
+"""
+import contextlib
+import json
+import sys
+import time
+
+class Run:
+    """
+    Class holding the state of a single run (usually one part of one day): its label, when it
+    started and the latest value of each of its counters.
+    """
+
+    def __init__(self, label: str):
+        self.label = label
+        self.started = time.perf_counter()
+        self.counters = {}
+        # Time each subscription was last sent a progress event for this run
+        self.last_sent = {}
+
+class Subscription:
+    """
+    Class describing a single listener, with the minimum interval between its progress events.
+    """
+
+    def __init__(self, callback, interval: float=1.0):
+        self.callback = callback
+        self.interval = interval
+        # Number of progress events skipped by the rate limiting
+        self.dropped = 0
+
+class LimitExceeded(Exception):
+    """
+    Raised by the callbacks made by limit() to stop a run which has gone past one of its limits.
+    """
+
+class JsonLinesWriter:
+    """
+    Callback writing each event as a line of JSON to a stream or file, flushing after every line
+    so that a process following the file sees each event as soon as it is sent.
+    """
+
+    def __init__(self, target=None, append: bool=True):
+        """
+        Parameters
+        ----------
+        target : str, stream or NoneType, optional
+            Path of the file to write to, or an open text stream, if None then stderr.
+            The default is None.
+        append : bool, optional
+            Whether to append to the file rather than overwriting it, so that several processes
+            can write to the same file.
+            The default is True.
+
+        """
+        self.owned = isinstance(target, str)
+        self.stream = open(target, 'a' if append else 'w') if self.owned else \
+                      target or sys.stderr
+
+    def __call__(self, event: dict) -> None:
+        # Anything which JSON can't write directly (numpy integers...) is written as a string
+        self.stream.write(json.dumps(event, default=str) + '\n')
+        self.stream.flush()
+
+    def close(self) -> None:
+        if self.owned:
+            self.stream.close()
+
+# Every current listener
+_subscriptions = []
+# Stack of the runs currently open, and the run used for reports outside of any of them
+_runs = []
+_default_run = None
+# Extra fields added to every event, see tagged()
+_tags = {}
+
+def subscribe(callback, interval: float=1.0) -> Subscription:
+    """
+    Start sending events to a callback.
+
+    Parameters
+    ----------
+    callback : function
+        Function called with each event (a dictionary). It can raise to stop the run which sent
+        the event.
+    interval : float, optional
+        The minimum time in seconds between progress events for the same run, any reports in
+        between are skipped. Start and end events are always sent.
+        The default is 1.
+
+    Returns
+    -------
+    subscription : Subscription
+        The subscription, to pass to unsubscribe().
+
+    """
+    subscription = Subscription(callback, interval)
+    _subscriptions.append(subscription)
+
+    return subscription
+
+def unsubscribe(subscription: Subscription) -> None:
+    """
+    Stop sending events to a callback, doing nothing if it has already been stopped.
+    """
+    if subscription in _subscriptions:
+        _subscriptions.remove(subscription)
+
+@contextlib.contextmanager
+def listen(callback, interval: float=1.0):
+    """
+    Context manager sending events to a callback while it is open, see subscribe().
+
+    Yields
+    ------
+    subscription : Subscription
+        The subscription.
+
+    """
+    subscription = subscribe(callback, interval)
+    try:
+        yield subscription
+    finally:
+        unsubscribe(subscription)
+
+def is_enabled() -> bool:
+    """
+    Check whether anything is listening, in which case reports are worth making.
+    """
+    return bool(_subscriptions)
+
+@contextlib.contextmanager
+def tagged(**tags):
+    """
+    Context manager adding extra fields to every event sent while it is open, e.g. the index of
+    the job in batch.py.
+
+    Yields
+    ------
+    None
+
+    """
+    previous = dict(_tags)
+    _tags.update(tags)
+    try:
+        yield
+    finally:
+        _tags.clear()
+        _tags.update(previous)
+
+def _send(kind: str, current: Run, force: bool=False, **fields) -> None:
+    """
+    Send an event for a run to every listener, or only those whose interval has passed since they
+    were last sent a progress event for it unless force is given.
+    """
+    now = time.perf_counter()
+    event = None
+    for subscription in list(_subscriptions):
+        if not force and now - current.last_sent.get(subscription, -float('inf')) < \
+                subscription.interval:
+            subscription.dropped += 1
+            continue
+        current.last_sent[subscription] = now
+        if event is None:
+            elapsed = now - current.started
+            event = {'event': kind, 'run': current.label, 'time': time.time(), 'elapsed': elapsed}
+            event.update(_tags)
+            event.update(current.counters)
+            done, total = current.counters.get('done'), current.counters.get('total')
+            if done is not None and total:
+                event['fraction'] = done/total
+                # Assume the rest goes at the same rate as the work so far
+                event['eta'] = elapsed*(total - done)/done if done else None
+            event.update(fields)
+        subscription.callback(event)
+
+def _current() -> Run:
+    """
+    Find the innermost open run, or the run for reports made outside of any.
+    """
+    global _default_run
+    if _runs:
+        return _runs[-1]
+    if _default_run is None:
+        _default_run = Run(None)
+    return _default_run
+
+@contextlib.contextmanager
+def run(label: str):
+    """
+    Context manager marking a run, e.g. around each part run by aoc.run_part, which sends a start
+    event when it opens and an end event (with the status, any error and the final counters) when
+    it closes. Reports made inside it are sent as part of it. Does nothing if nothing is listening.
+
+    Parameters
+    ----------
+    label : str
+        Label of the run, e.g. 'Day15_Part2'.
+
+    Yields
+    ------
+    None
+
+    """
+    if not _subscriptions:
+        yield
+        return
+
+    current = Run(label)
+    _runs.append(current)
+    try:
+        _send('start', current, force=True)
+        yield
+    except BaseException as e:
+        _send('end', current, force=True, status='error', error=repr(e))
+        raise
+    else:
+        _send('end', current, force=True, status='ok')
+    finally:
+        _runs.remove(current)
+
+def report(done: int=None, total: int=None, **counters) -> None:
+    """
+    Report the progress of the current run. Does nothing if nothing is listening.
+
+    Parameters
+    ----------
+    done : int or NoneType, optional
+        The amount of work done so far, e.g. the number of rows scanned.
+        The default is None.
+    total : int or NoneType, optional
+        The total amount of work, if known, e.g. the number of rows to scan.
+        The default is None.
+    **counters
+        Any other values to report, e.g. best=1651 or rounds=100, which are kept until they are
+        next reported.
+
+    Returns
+    -------
+    None
+
+    """
+    if not _subscriptions:
+        return
+
+    current = _current()
+    if done is not None:
+        counters['done'] = done
+    if total is not None:
+        counters['total'] = total
+    current.counters.update(counters)
+    _send('progress', current)
+
+def tick(counter: str='states', n: int=1, **counters) -> None:
+    """
+    Add to a counter of the current run, e.g. once for each state expanded by a search, and report
+    the progress. Does nothing if nothing is listening.
+
+    Parameters
+    ----------
+    counter : str, optional
+        Name of the counter.
+        The default is 'states'.
+    n : int, optional
+        The amount to add.
+        The default is 1.
+    **counters
+        Any other values to report, as in report().
+
+    Returns
+    -------
+    None
+
+    """
+    if not _subscriptions:
+        return
+
+    current = _current()
+    current.counters[counter] = current.counters.get(counter, 0) + n
+    current.counters.update(counters)
+    _send('progress', current)
+
+def track(iterable, total: int=None, unit: str=None):
+    """
+    Report the progress through an iterable, as done/total, after each item. Returns the iterable
+    unchanged if nothing is listening.
+
+    Parameters
+    ----------
+    iterable : iterable
+        The items to loop over.
+    total : int or NoneType, optional
+        The number of items, if None then len(iterable) if it has one.
+        The default is None.
+    unit : str or NoneType, optional
+        What the items are, e.g. 'rows', which is reported alongside the counts.
+        The default is None.
+
+    Returns
+    -------
+    iterable : iterable
+        The items, reporting as each is reached.
+
+    """
+    if not _subscriptions:
+        return iterable
+    if total is None and hasattr(iterable, '__len__'):
+        total = len(iterable)
+
+    def tracked():
+        extra = {} if unit is None else {'unit': unit}
+        report(0, total, **extra)
+        for done, item in enumerate(iterable):
+            yield item
+            report(done + 1, total)
+
+    return tracked()
+
+def limit(seconds: float=None, **maxima):
+    """
+    Make a callback which stops any run going past a time limit, or past a maximum for any of its
+    counters, by raising LimitExceeded from inside the run. As the callback only sees the events
+    it is sent, the limits are checked at most once per interval.
+
+    Parameters
+    ----------
+    seconds : float or NoneType, optional
+        The longest a run can take, if None then no limit.
+        The default is None.
+    **maxima
+        The largest allowed value of each counter, e.g. states=10**7.
+
+    Returns
+    -------
+    callback : function
+        The callback, to pass to subscribe() or listen().
+
+    """
+    def check(event):
+        # A run which has already finished can't be stopped
+        if event['event'] != 'progress':
+            return
+        if seconds is not None and event['elapsed'] > seconds:
+            raise LimitExceeded(f'{event["run"]} took longer than {seconds} s')
+        for counter, maximum in maxima.items():
+            if event.get(counter, 0) > maximum:
+                raise LimitExceeded(f'{event["run"]} went past {counter}={maximum}')
+
+    return check
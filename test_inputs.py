@@ -0,0 +1,53 @@
+"""
+Tests for inputs.py, kept out of it since every day imports it. Run with
+    python -m unittest test_inputs
+"""
+import io
+import os
+import random
+import tempfile
+import unittest
+
+from inputs import CHUNK_SIZE, iter_chunks
+
+class TestIterChunks(unittest.TestCase):
+    """
+    Test cases for splitting inputs into pieces, which have to agree with bytes.split whichever
+    way the input is read.
+    """
+
+    CASES = [b'', b'\n', b'\n\n', b'\n\n\n', b'1\n\n\n', b'\n\n1\n1\n\n\n\n',
+             b'1\n2\n\n3\n\n\n\n\n4\n5\n\n6', b'12\n\n\n34\n\n\n\n56\n\n\n\n\n']
+
+    @staticmethod
+    def fields(data: bytes, separator: bytes) -> list:
+        # bytes.split, without the empty field after a separator at the very end
+        fields = data.split(separator)
+        return fields[:-1] if fields[-1] == b'' else fields
+
+    def check(self, data: bytes, separator: bytes):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'input.txt')
+            with open(path, 'wb') as f:
+                f.write(data)
+            for chunk_size in [1, 2, 3, 4, 5, 8, CHUNK_SIZE]:
+                mapped = [bytes(c) for c in iter_chunks(path, separator, chunk_size)]
+                streamed = list(iter_chunks(io.BytesIO(data), separator, chunk_size))
+                self.assertEqual(mapped, streamed, (data, separator, chunk_size))
+                self.assertEqual([f for piece in mapped for f in piece.split(separator)],
+                                 self.fields(data, separator), (data, separator, chunk_size))
+
+    def test_single_byte_separator(self):
+        for data in self.CASES:
+            self.check(data, b'\n')
+
+    def test_runs_of_separators(self):
+        for data in self.CASES:
+            self.check(data, b'\n\n')
+
+    def test_random(self):
+        rng = random.Random(0)
+        for i in range(200):
+            data = bytes(rng.choice(b'1\n') for j in range(rng.randint(0, 40)))
+            for separator in [b'\n', b'\n\n', b'\n\n\n', b'1\n1']:
+                self.check(data, separator)